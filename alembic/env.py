@@ -47,6 +47,8 @@ def run_migrations_online() -> None:
         )
         with context.begin_transaction():
             context.run_migrations()
+        # SET above autobegins the connection's transaction; commit it explicitly.
+        connection.commit()
 
 
 if context.is_offline_mode():
@@ -0,0 +1,36 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_revoked_tokens"
+down_revision = "0002_dedupe_books"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "revoked_tokens",
+        sa.Column("token_hash", sa.CHAR(64), primary_key=True),
+        sa.Column("user_id", sa.BigInteger, nullable=False),
+        sa.Column("expires_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column(
+            "revoked_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        schema="public",
+    )
+    op.create_index(
+        "ix_revoked_tokens_expires_at",
+        "revoked_tokens",
+        ["expires_at"],
+        schema="public",
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_revoked_tokens_expires_at", table_name="revoked_tokens", schema="public"
+    )
+    op.drop_table("revoked_tokens", schema="public")
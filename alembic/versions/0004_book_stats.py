@@ -0,0 +1,48 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_book_stats"
+down_revision = "0003_revoked_tokens"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "book_stats",
+        sa.Column("kind", sa.Text, primary_key=True),
+        sa.Column("key", sa.Text, primary_key=True),
+        sa.Column("count", sa.BigInteger, nullable=False),
+        schema="public",
+    )
+    op.create_index(
+        "ix_book_stats_kind_count",
+        "book_stats",
+        ["kind", "count"],
+        schema="public",
+    )
+    # Backfill from the existing catalog; the app keeps it current from here on.
+    op.execute(
+        """
+        INSERT INTO public.book_stats(kind, key, count)
+        SELECT 'total', 'books', COUNT(*) FROM public.books
+        UNION ALL
+        SELECT 'total', 'authors', COUNT(*) FROM public.authors
+        UNION ALL
+        SELECT 'genre', genre, COUNT(*) FROM public.books GROUP BY genre
+        UNION ALL
+        SELECT 'year', published_year::text, COUNT(*)
+        FROM public.books GROUP BY published_year
+        UNION ALL
+        SELECT 'decade', (published_year / 10 * 10)::text, COUNT(*)
+        FROM public.books GROUP BY published_year / 10
+        UNION ALL
+        SELECT 'author', author_id::text, COUNT(*)
+        FROM public.books GROUP BY author_id
+        """
+    )
+
+
+def downgrade():
+    op.drop_index("ix_book_stats_kind_count", table_name="book_stats", schema="public")
+    op.drop_table("book_stats", schema="public")
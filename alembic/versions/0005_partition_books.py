@@ -0,0 +1,162 @@
+from alembic import op
+
+revision = "0005_partition_books"
+down_revision = "0004_book_stats"
+branch_labels = None
+depends_on = None
+
+# Books are range-partitioned by published_year, one partition per decade
+# (books_p1800 ... books_p2020) plus books_default for anything not yet
+# covered. books_ensure_partitions(until_year) creates missing decades and
+# moves matching rows out of the default partition; the app calls it at
+# startup and `python -m app.cli books-partitions` runs it on demand.
+#
+# A partitioned table's primary key must contain the partition key, so the
+# key becomes (id, published_year); ids still come from books_id_seq and stay
+# unique. uniq_books_title_author_year already includes published_year and is
+# kept as a global unique index.
+
+COLUMNS = "id, title, author_id, genre, published_year, created_at, updated_at"
+
+
+def upgrade_statements(schema: str) -> list[str]:
+    return [
+        f"ALTER TABLE {schema}.books RENAME TO books_unpartitioned",
+        f"ALTER TABLE {schema}.books_unpartitioned DROP CONSTRAINT books_pkey",
+        f"DROP INDEX {schema}.idx_books_lower_title",
+        f"DROP INDEX {schema}.idx_books_published_year",
+        f"DROP INDEX {schema}.idx_books_author_id",
+        f"DROP INDEX {schema}.uniq_books_title_author_year",
+        f"""
+        CREATE TABLE {schema}.books (
+            id BIGINT NOT NULL DEFAULT nextval('{schema}.books_id_seq'),
+            title TEXT NOT NULL,
+            author_id BIGINT NOT NULL,
+            genre TEXT NOT NULL,
+            published_year INTEGER NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+            title_norm TEXT GENERATED ALWAYS AS (lower(title)) STORED,
+            CONSTRAINT books_pkey PRIMARY KEY (id, published_year),
+            CONSTRAINT books_author_id_fkey FOREIGN KEY (author_id)
+                REFERENCES {schema}.authors (id) ON DELETE RESTRICT,
+            CONSTRAINT books_genre_check
+                CHECK (genre IN ('Fiction','Non-Fiction','Science','History')),
+            CONSTRAINT books_year_check CHECK (
+                published_year BETWEEN 1800 AND EXTRACT(YEAR FROM CURRENT_DATE)::INT
+            )
+        ) PARTITION BY RANGE (published_year)
+        """,
+        f"CREATE TABLE {schema}.books_default PARTITION OF {schema}.books DEFAULT",
+        f"""
+        CREATE OR REPLACE FUNCTION {schema}.books_ensure_partitions(p_until_year INT)
+        RETURNS INT AS $$
+        DECLARE
+            v_decade INT;
+            v_name TEXT;
+            v_created INT := 0;
+        BEGIN
+            FOR v_decade IN SELECT generate_series(1800, p_until_year / 10 * 10, 10)
+            LOOP
+                v_name := 'books_p' || v_decade;
+                CONTINUE WHEN to_regclass('{schema}.' || v_name) IS NOT NULL;
+
+                -- A new range may not overlap rows held by the default partition,
+                -- so park them in a temp table while the partition is attached.
+                CREATE TEMP TABLE books_moved AS
+                SELECT {COLUMNS} FROM {schema}.books_default WITH NO DATA;
+                WITH moved AS (
+                    DELETE FROM {schema}.books_default
+                    WHERE published_year >= v_decade
+                      AND published_year < v_decade + 10
+                    RETURNING {COLUMNS}
+                )
+                INSERT INTO books_moved SELECT * FROM moved;
+                EXECUTE format(
+                    'CREATE TABLE {schema}.%I PARTITION OF {schema}.books '
+                    'FOR VALUES FROM (%s) TO (%s)',
+                    v_name, v_decade, v_decade + 10
+                );
+                INSERT INTO {schema}.books ({COLUMNS})
+                SELECT {COLUMNS} FROM books_moved;
+                DROP TABLE books_moved;
+                v_created := v_created + 1;
+            END LOOP;
+            RETURN v_created;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        f"""
+        SELECT {schema}.books_ensure_partitions(
+            EXTRACT(YEAR FROM CURRENT_DATE)::INT + 1
+        )
+        """,
+        f"CREATE INDEX idx_books_lower_title ON {schema}.books (lower(title))",
+        f"CREATE INDEX idx_books_published_year ON {schema}.books (published_year)",
+        f"CREATE INDEX idx_books_author_id ON {schema}.books (author_id)",
+        f"""
+        CREATE UNIQUE INDEX uniq_books_title_author_year
+        ON {schema}.books (title_norm, author_id, published_year)
+        """,
+        f"""
+        INSERT INTO {schema}.books ({COLUMNS})
+        SELECT {COLUMNS} FROM {schema}.books_unpartitioned
+        """,
+        f"ALTER SEQUENCE {schema}.books_id_seq OWNED BY {schema}.books.id",
+        f"DROP TABLE {schema}.books_unpartitioned",
+    ]
+
+
+def downgrade_statements(schema: str) -> list[str]:
+    return [
+        f"ALTER TABLE {schema}.books RENAME TO books_partitioned",
+        f"ALTER TABLE {schema}.books_partitioned DROP CONSTRAINT books_pkey",
+        f"DROP INDEX {schema}.idx_books_lower_title",
+        f"DROP INDEX {schema}.idx_books_published_year",
+        f"DROP INDEX {schema}.idx_books_author_id",
+        f"DROP INDEX {schema}.uniq_books_title_author_year",
+        f"""
+        CREATE TABLE {schema}.books (
+            id BIGINT NOT NULL DEFAULT nextval('{schema}.books_id_seq'),
+            title TEXT NOT NULL,
+            author_id BIGINT NOT NULL,
+            genre TEXT NOT NULL,
+            published_year INTEGER NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+            title_norm TEXT GENERATED ALWAYS AS (lower(title)) STORED,
+            CONSTRAINT books_pkey PRIMARY KEY (id),
+            CONSTRAINT books_author_id_fkey FOREIGN KEY (author_id)
+                REFERENCES {schema}.authors (id) ON DELETE RESTRICT,
+            CONSTRAINT books_genre_check
+                CHECK (genre IN ('Fiction','Non-Fiction','Science','History')),
+            CONSTRAINT books_year_check CHECK (
+                published_year BETWEEN 1800 AND EXTRACT(YEAR FROM CURRENT_DATE)::INT
+            )
+        )
+        """,
+        f"""
+        INSERT INTO {schema}.books ({COLUMNS})
+        SELECT {COLUMNS} FROM {schema}.books_partitioned
+        """,
+        f"ALTER SEQUENCE {schema}.books_id_seq OWNED BY {schema}.books.id",
+        f"DROP TABLE {schema}.books_partitioned",
+        f"DROP FUNCTION {schema}.books_ensure_partitions(INT)",
+        f"CREATE INDEX idx_books_lower_title ON {schema}.books (lower(title))",
+        f"CREATE INDEX idx_books_published_year ON {schema}.books (published_year)",
+        f"CREATE INDEX idx_books_author_id ON {schema}.books (author_id)",
+        f"""
+        CREATE UNIQUE INDEX uniq_books_title_author_year
+        ON {schema}.books (title_norm, author_id, published_year)
+        """,
+    ]
+
+
+def upgrade():
+    for statement in upgrade_statements("public"):
+        op.execute(statement)
+
+
+def downgrade():
+    for statement in downgrade_statements("public"):
+        op.execute(statement)
@@ -0,0 +1,98 @@
+from alembic import op
+
+revision = "0006_sort_indexes"
+down_revision = "0005_partition_books"
+branch_labels = None
+depends_on = None
+
+# Every list sort (title, author, published_year; ASC or DESC, with an id
+# tiebreaker in the same direction) under a genre filter becomes an ordered,
+# index-only scan of one (genre, sort key, id) index.
+#
+# Sorting by author used to join and sort the whole table, so books gets
+# author_sort, a copy of authors.name kept current by triggers: it is set
+# whenever a book is inserted or changes author, and rewritten for all of an
+# author's books when the author is renamed.
+
+INDEXES = {
+    "ix_books_genre_title": (
+        "genre, title, id",
+        "author_sort, published_year, created_at, updated_at",
+    ),
+    "ix_books_genre_author": (
+        "genre, author_sort, id",
+        "title, published_year, created_at, updated_at",
+    ),
+    "ix_books_genre_year": (
+        "genre, published_year, id",
+        "title, author_sort, created_at, updated_at",
+    ),
+}
+
+
+def upgrade_statements(schema: str) -> list[str]:
+    return [
+        f"ALTER TABLE {schema}.books ADD COLUMN author_sort TEXT",
+        f"""
+        UPDATE {schema}.books b SET author_sort = a.name
+        FROM {schema}.authors a WHERE a.id = b.author_id
+        """,
+        f"ALTER TABLE {schema}.books ALTER COLUMN author_sort SET NOT NULL",
+        f"""
+        CREATE OR REPLACE FUNCTION {schema}.books_set_author_sort()
+        RETURNS trigger AS $$
+        BEGIN
+            SELECT name INTO NEW.author_sort
+            FROM {schema}.authors WHERE id = NEW.author_id;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        f"""
+        CREATE TRIGGER books_author_sort
+        BEFORE INSERT OR UPDATE OF author_id ON {schema}.books
+        FOR EACH ROW EXECUTE FUNCTION {schema}.books_set_author_sort()
+        """,
+        f"""
+        CREATE OR REPLACE FUNCTION {schema}.authors_sync_book_sort()
+        RETURNS trigger AS $$
+        BEGIN
+            UPDATE {schema}.books SET author_sort = NEW.name
+            WHERE author_id = NEW.id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        f"""
+        CREATE TRIGGER authors_sync_book_sort
+        AFTER UPDATE OF name ON {schema}.authors
+        FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE FUNCTION {schema}.authors_sync_book_sort()
+        """,
+        *(
+            f"CREATE INDEX {name} ON {schema}.books ({key}) INCLUDE ({include})"
+            for name, (key, include) in INDEXES.items()
+        ),
+        f"ANALYZE {schema}.books",
+    ]
+
+
+def downgrade_statements(schema: str) -> list[str]:
+    return [
+        *(f"DROP INDEX {schema}.{name}" for name in INDEXES),
+        f"DROP TRIGGER authors_sync_book_sort ON {schema}.authors",
+        f"DROP FUNCTION {schema}.authors_sync_book_sort()",
+        f"DROP TRIGGER books_author_sort ON {schema}.books",
+        f"DROP FUNCTION {schema}.books_set_author_sort()",
+        f"ALTER TABLE {schema}.books DROP COLUMN author_sort",
+    ]
+
+
+def upgrade():
+    for statement in upgrade_statements("public"):
+        op.execute(statement)
+
+
+def downgrade():
+    for statement in downgrade_statements("public"):
+        op.execute(statement)
@@ -0,0 +1,36 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008_author_book_count"
+down_revision = "0007_genre_enum"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "authors",
+        sa.Column("book_count", sa.BigInteger, server_default="0", nullable=False),
+        schema="public",
+    )
+    # Backfill; repo_books keeps it current from here on (see apply_delta).
+    op.execute(
+        """
+        UPDATE public.authors a SET book_count = c.n
+        FROM (
+            SELECT author_id, COUNT(*) AS n FROM public.books GROUP BY author_id
+        ) c
+        WHERE a.id = c.author_id
+        """
+    )
+    op.create_index(
+        "ix_authors_book_count",
+        "authors",
+        ["book_count", "id"],
+        schema="public",
+    )
+
+
+def downgrade():
+    op.drop_index("ix_authors_book_count", table_name="authors", schema="public")
+    op.drop_column("authors", "book_count", schema="public")
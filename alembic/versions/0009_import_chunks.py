@@ -0,0 +1,28 @@
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0009_import_chunks"
+down_revision = "0008_author_book_count"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "import_chunks",
+        sa.Column("digest", sa.CHAR(64), primary_key=True),
+        sa.Column("rows", sa.Integer, nullable=False),
+        sa.Column("result", postgresql.JSONB, nullable=True),
+        sa.Column(
+            "imported_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("NOW()"),
+            nullable=False,
+        ),
+        schema="public",
+    )
+
+
+def downgrade():
+    op.drop_table("import_chunks", schema="public")
@@ -0,0 +1,21 @@
+from alembic import op
+
+revision = "0010_drop_author_stats"
+down_revision = "0009_import_chunks"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Per-author counts are authors.book_count (0008); drop the duplicates.
+    op.execute("DELETE FROM public.book_stats WHERE kind = 'author'")
+
+
+def downgrade():
+    op.execute(
+        """
+        INSERT INTO public.book_stats(kind, key, count)
+        SELECT 'author', id::text, book_count FROM public.authors
+        WHERE book_count > 0
+        """
+    )
@@ -0,0 +1,35 @@
+from alembic import op
+
+revision = "0011_desc_sort_indexes"
+down_revision = "0010_drop_author_stats"
+branch_labels = None
+depends_on = None
+
+# Descending list sorts break ties by ascending id, which a (genre, sort key,
+# id) index read backwards cannot give; each sort field gets a (genre, sort
+# key DESC, id) index with the same INCLUDE columns as its 0006 counterpart.
+
+INDEXES = {
+    "ix_books_genre_title_desc": (
+        "genre, title DESC, id",
+        "author_sort, published_year, created_at, updated_at",
+    ),
+    "ix_books_genre_author_desc": (
+        "genre, author_sort DESC, id",
+        "title, published_year, created_at, updated_at",
+    ),
+    "ix_books_genre_year_desc": (
+        "genre, published_year DESC, id",
+        "title, author_sort, created_at, updated_at",
+    ),
+}
+
+
+def upgrade():
+    for name, (key, include) in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON public.books ({key}) INCLUDE ({include})")
+
+
+def downgrade():
+    for name in INDEXES:
+        op.execute(f"DROP INDEX public.{name}")
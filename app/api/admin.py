@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.core.security import get_admin_user
+from app.db.instrumentation import slow_query_log
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(get_admin_user)],
+)
+
+
+@router.get(
+    "/slow-queries",
+    summary="Recent slow queries",
+    description=(
+        "Return the most recent statements slower than DB_SLOW_QUERY_MS, newest "
+        "first, with a sampled EXPLAIN (ANALYZE, BUFFERS) plan where captured."
+    ),
+)
+async def slow_queries(
+    limit: int = Query(50, ge=1, le=1000),
+    with_plan: bool = Query(False),
+):
+    entries = list(reversed(slow_query_log.entries))
+    if with_plan:
+        entries = [e for e in entries if e["plan"]]
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "sample_rate": slow_query_log.sample_rate,
+        "items": entries[:limit],
+    }
@@ -1,14 +1,20 @@
+from datetime import datetime, timezone
+
 from fastapi import APIRouter, Depends, HTTPException, status
+from jose import jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_session
 from app.db import repo_users as repo
 from app.core.security import (
-    get_password_hash,
-    verify_password,
+    hash_password_async,
+    verify_and_update_password,
     create_access_token,
     get_current_user,
+    oauth2_scheme,
+    token_cache,
 )
+from app.core.token_cache import token_digest
 from app.schemas.user import UserCreate, UserLogin, UserOut
 from pydantic import BaseModel
 
@@ -28,7 +34,7 @@ class TokenOut(BaseModel):
     description="Create a new user account with an email and password.",
 )
 async def register(payload: UserCreate, session: AsyncSession = Depends(get_session)):
-    hashed = get_password_hash(payload.password)
+    hashed = await hash_password_async(payload.password)
     try:
         row = await repo.create_user(session, payload.email.strip(), hashed)
         await session.commit()
@@ -48,10 +54,17 @@ async def register(payload: UserCreate, session: AsyncSession = Depends(get_sess
 )
 async def login(payload: UserLogin, session: AsyncSession = Depends(get_session)):
     row = await repo.get_user_by_email(session, payload.email.strip())
-    if not row or not verify_password(payload.password, row.hashed_password):
+    valid, new_hash = False, None
+    if row:
+        valid, new_hash = await verify_and_update_password(
+            payload.password, row.hashed_password
+        )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
         )
+    if new_hash:
+        await repo.update_password(session, row.id, new_hash)
     token = create_access_token({"sub": str(row.id), "email": payload.email})
     return TokenOut(access_token=token)
 
@@ -64,3 +77,34 @@ async def login(payload: UserLogin, session: AsyncSession = Depends(get_session)
 )
 async def me(current_user: UserOut = Depends(get_current_user)):
     return current_user
+
+
+@router.post(
+    "/logout",
+    summary="Log out",
+    description="Revoke the access token used for this request.",
+)
+async def logout(
+    token: str = Depends(oauth2_scheme),
+    current_user: UserOut = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    claims = jwt.get_unverified_claims(token)
+    expires_at = datetime.fromtimestamp(claims["exp"], tz=timezone.utc)
+    await repo.revoke_token(session, token_digest(token), current_user.id, expires_at)
+    token_cache.revoke_token(token)
+    return {"status": "logged_out"}
+
+
+@router.delete(
+    "/me",
+    summary="Delete current user",
+    description="Delete the authenticated user's account and revoke its tokens.",
+)
+async def delete_me(
+    current_user: UserOut = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    await repo.delete_user(session, current_user.id)
+    token_cache.revoke_user(current_user.id)
+    return {"status": "deleted", "id": current_user.id}
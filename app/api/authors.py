@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.db.session import get_session
+from app.schemas.author import AuthorDetail, AuthorsPage
+from app.db import repo_authors as repo
+from app.core.cursors import decode_cursor, encode_cursor
+from app.core.rate_limits import rate_get
+from app.core.request_timing import query_budget
+
+router = APIRouter(prefix="/authors", tags=["authors"])
+
+
+@router.get(
+    "",
+    response_model=AuthorsPage,
+    summary="List authors",
+    description="Retrieve authors with their book counts, sorted by name or "
+    "book count. Pages are keyset-paginated: pass `next_cursor` from one page "
+    "as `cursor` to get the next.",
+)
+@rate_get
+@query_budget(1)
+async def list_authors(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    sort_by: str = Query("name", regex="^(name|book_count)$"),
+    sort_order: str = Query("asc", regex="^(asc|desc)$"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+):
+    try:
+        after = decode_cursor(cursor) if cursor else None
+        items, last = await repo.list_authors(
+            session,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            limit=limit,
+            after=after,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {
+        "items": items,
+        "sort_by": sort_by,
+        "sort_order": sort_order,
+        "limit": limit,
+        "next_cursor": encode_cursor(last) if last is not None else None,
+    }
+
+
+@router.get(
+    "/{author_id}",
+    response_model=AuthorDetail,
+    summary="Get author by ID",
+    description="Retrieve an author, their book count and their books by title.",
+)
+@rate_get
+@query_budget(2)
+async def get_author(
+    request: Request,
+    author_id: int,
+    books_limit: int = Query(100, ge=1, le=1000),
+    session: AsyncSession = Depends(get_session),
+):
+    author = await repo.get_author(session, author_id, books_limit)
+    if not author:
+        raise HTTPException(status_code=404, detail="Author not found")
+    return author
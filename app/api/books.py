@@ -1,15 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from app.db.session import get_session
-from app.schemas.book import BookCreate, BookUpdate, BookOut, BooksPage
+from app.schemas.book import (
+    BookCreate,
+    BookUpdate,
+    BookOut,
+    BookPartial,
+    BooksPage,
+    BookStats,
+    DuplicateReport,
+    Suggestions,
+)
 from app.db import repo_books as repo
-from app.services import books_service
-from app.core.security import get_current_user
+from app.db import repo_stats
+from app.db.book_events import book_events
+from app.db.suggestions import suggestions
+from app.core.config import settings
+from app.core.security import get_admin_user, get_current_user
+from app.core.compression import bulk
+from app.core.constants import (
+    BATCH_MAX_IDS,
+    BOOK_FIELDS,
+    DEDUPE_THRESHOLD,
+    SUGGEST_LIMIT,
+)
 from app.core.rate_limits import rate_get, rate_mutate
+from app.core.request_timing import query_budget
+
+# app.services.books_service (CSV/JSON import and export, recommendations) and
+# app.services.dedupe (NumPy) are imported by the endpoints that use them,
+# keeping them off the cold-start path.
 
 router = APIRouter(prefix="/books", tags=["books"])
 
+FIELDS_REGEX = "^({0})(,({0}))*$".format("|".join(BOOK_FIELDS))
+FIELDS_DESCRIPTION = "Comma-separated subset of " + ", ".join(BOOK_FIELDS)
+
+
+def _fields(fields: Optional[str]) -> tuple:
+    return tuple(fields.split(",")) if fields else BOOK_FIELDS
+
 
 @router.post(
     "",
@@ -19,6 +60,7 @@ router = APIRouter(prefix="/books", tags=["books"])
     description="Add a new book record with title, author, genre, and published year.",
 )
 @rate_mutate
+@query_budget(5)
 async def create_book(
     request: Request,
     payload: BookCreate,
@@ -39,10 +81,14 @@ async def create_book(
 @router.get(
     "",
     response_model=BooksPage,
+    response_model_exclude_unset=True,
     summary="List books",
-    description="Retrieve all books with optional filters, pagination, and sorting.",
+    description="Retrieve all books with optional filters, pagination, and sorting. "
+    "With `facets=genre,decade,author` the page also carries value counts for "
+    "the current filters. `fields=id,title` returns only those fields.",
 )
 @rate_get
+@query_budget(2)
 async def list_books(
     request: Request,
     session: AsyncSession = Depends(get_session),
@@ -55,6 +101,12 @@ async def list_books(
     page_size: int = Query(10, ge=1, le=100),
     sort_by: str = Query("title"),
     sort_order: str = Query("asc"),
+    facets: Optional[str] = Query(
+        None, regex="^(genre|decade|author)(,(genre|decade|author))*$"
+    ),
+    fields: Optional[str] = Query(
+        None, regex=FIELDS_REGEX, description=FIELDS_DESCRIPTION
+    ),
 ):
     data = await repo.list_books(
         session,
@@ -67,8 +119,10 @@ async def list_books(
         page_size=page_size,
         sort_by=sort_by,
         sort_order=sort_order,
+        facets=tuple(facets.split(",")) if facets else (),
+        fields=_fields(fields),
     )
-    return {
+    page_out = {
         "items": data["items"],
         "total": data["total"],
         "page": page,
@@ -76,6 +130,9 @@ async def list_books(
         "sort_by": sort_by,
         "sort_order": sort_order.lower(),
     }
+    if "facets" in data:
+        page_out["facets"] = data["facets"]
+    return page_out
 
 
 @router.post(
@@ -90,6 +147,8 @@ async def import_books(
     file: UploadFile = File(...),
     session: AsyncSession = Depends(get_session),
 ):
+    from app.services import books_service
+
     return await books_service.import_books(file, session)
 
 
@@ -100,11 +159,15 @@ async def import_books(
     description="Export all books in JSON or CSV format.",
 )
 @rate_get
+@query_budget(2)
+@bulk
 async def export_books(
     request: Request,
     format: str = Query("json", regex="^(json|csv)$"),
     session: AsyncSession = Depends(get_session),
 ):
+    from app.services import books_service
+
     return await books_service.export_books(format, session)
 
 
@@ -115,6 +178,7 @@ async def export_books(
     description="Recommend books based on genre or author.",
 )
 @rate_get
+@query_budget(1)
 async def recommend_books(
     request: Request,
     by: str = Query(..., regex="^(genre|author)$"),
@@ -122,22 +186,147 @@ async def recommend_books(
     limit: int = Query(5, ge=1, le=50),
     session: AsyncSession = Depends(get_session),
 ):
+    from app.services import books_service
+
     return await books_service.recommend_books(by, value, limit, session)
 
 
+@router.get(
+    "/stats",
+    response_model=BookStats,
+    summary="Catalog statistics",
+    description="Book and author totals, counts by genre, year and decade, "
+    "and the authors with the most books.",
+)
+@rate_get
+@query_budget(1)
+async def book_stats(
+    request: Request,
+    top_authors: int = Query(10, ge=1, le=100),
+    session: AsyncSession = Depends(get_session),
+):
+    return await repo_stats.get_stats(session, top_authors)
+
+
+@router.get(
+    "/duplicates",
+    response_model=DuplicateReport,
+    dependencies=[Depends(get_admin_user)],
+    summary="Likely duplicate books",
+    description="Pairs of books whose titles and authors are both at least "
+    "`threshold` similar (MinHash over title trigrams, edit similarity of "
+    "authors), most similar first. Admins only; the report is recomputed "
+    "only when the catalog has changed.",
+)
+@rate_get
+@query_budget(3)
+@bulk
+async def duplicate_books(
+    request: Request,
+    threshold: float = Query(DEDUPE_THRESHOLD, ge=0.3, le=1.0),
+    limit: int = Query(100, ge=1, le=10000),
+    session: AsyncSession = Depends(get_session),
+):
+    from app.services import dedupe
+
+    return await dedupe.duplicate_report(session, threshold, limit)
+
+
+@router.get(
+    "/suggest",
+    response_model=Suggestions,
+    summary="Typeahead suggestions",
+    description="Author names or book titles starting with `q` (case- and "
+    "whitespace-insensitive), most books first. Served from a per-worker "
+    "in-memory index; books written through other workers appear within "
+    "`SUGGEST_REFRESH_SECONDS`.",
+)
+@rate_get
+async def suggest(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100),
+    kind: str = Query("title", regex="^(author|title)$"),
+    limit: int = Query(SUGGEST_LIMIT, ge=1, le=SUGGEST_LIMIT),
+    session: AsyncSession = Depends(get_session),
+):
+    await suggestions.ensure_loaded(session)
+    items = suggestions.suggest(kind, q, limit)
+    return {
+        "q": q,
+        "kind": kind,
+        "items": [{"value": value, "book_count": n} for value, n in items],
+    }
+
+
+@router.get(
+    "/events",
+    response_class=StreamingResponse,
+    summary="Stream catalog changes",
+    description="Server-Sent Events: a `create`, `update` or `delete` event with "
+    "the book id for every committed write. Reconnect with `Last-Event-ID` to "
+    "resume; a `reset` event means events were missed and the client should reload.",
+)
+@rate_get
+async def book_events_stream(
+    request: Request,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    if not settings.EVENTS_ENABLED or not await book_events.start():
+        raise HTTPException(status_code=503, detail="Event stream unavailable")
+    sub, replay = book_events.subscribe(last_event_id)
+    return StreamingResponse(
+        book_events.stream(sub, replay),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/batch",
+    response_model=list[BookPartial],
+    response_model_exclude_unset=True,
+    summary="Get books by IDs",
+    description=f"Retrieve up to {BATCH_MAX_IDS} books in one request, in the "
+    "order of `ids`. Unknown IDs are skipped.",
+)
+@rate_get
+@query_budget(1)
+@bulk
+async def get_books_batch(
+    request: Request,
+    ids: str = Query(..., regex=r"^\d+(,\d+)*$"),
+    fields: Optional[str] = Query(
+        None, regex=FIELDS_REGEX, description=FIELDS_DESCRIPTION
+    ),
+    session: AsyncSession = Depends(get_session),
+):
+    book_ids = tuple(dict.fromkeys(int(i) for i in ids.split(",")))
+    if len(book_ids) > BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=422, detail=f"At most {BATCH_MAX_IDS} ids per request"
+        )
+    return await repo.get_books_by_ids(session, book_ids, _fields(fields))
+
+
 @router.get(
     "/{book_id}",
-    response_model=BookOut,
+    response_model=BookPartial,
+    response_model_exclude_unset=True,
     summary="Get book by ID",
-    description="Retrieve a single book by its unique identifier.",
+    description="Retrieve a single book by its unique identifier. "
+    "`fields=id,title` returns only those fields.",
 )
 @rate_get
+@query_budget(1)
 async def get_book(
     request: Request,
     book_id: int,
+    fields: Optional[str] = Query(
+        None, regex=FIELDS_REGEX, description=FIELDS_DESCRIPTION
+    ),
     session: AsyncSession = Depends(get_session),
 ):
-    book = await repo.get_book_by_id(session, book_id)
+    book = await repo.get_book_by_id(session, book_id, _fields(fields))
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
     return book
@@ -151,6 +340,7 @@ async def get_book(
     description="Update an existing book's details by its ID.",
 )
 @rate_mutate
+@query_budget(6)
 async def update_book(
     request: Request,
     book_id: int,
@@ -177,6 +367,7 @@ async def update_book(
     description="Remove a book record by its ID.",
 )
 @rate_mutate
+@query_budget(3)
 async def delete_book(
     request: Request,
     book_id: int,
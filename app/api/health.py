@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get(
+    "/live",
+    summary="Liveness probe",
+    description="Answer as long as the process serves requests.",
+)
+async def live():
+    return {"status": "alive"}
+
+
+@router.get(
+    "/ready",
+    summary="Readiness probe",
+    description="503 until startup checks and warm-up have finished, then 200.",
+)
+async def ready(request: Request):
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ready"}
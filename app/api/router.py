@@ -2,8 +2,12 @@ from fastapi import APIRouter
 
 from . import books
 from . import auth
+from . import admin
+from . import authors
 
 api_router = APIRouter()
 
 api_router.include_router(books.router)
+api_router.include_router(authors.router)
 api_router.include_router(auth.router)
+api_router.include_router(admin.router)
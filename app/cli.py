@@ -0,0 +1,97 @@
+"""
+Maintenance commands.
+
+    python -m app.cli stats-check       # exit status 1 if book_stats has drifted
+    python -m app.cli stats-rebuild     # recompute book_stats from books/authors
+    python -m app.cli books-partitions  # create missing decade partitions of books
+    python -m app.cli books-duplicates  # report likely duplicate books; exit
+                                        # status 1 if any (--threshold, --limit)
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.core.constants import DEDUPE_THRESHOLD
+from app.db import repo_stats
+from app.db.partitioning import ensure_book_partitions
+from app.db.session import SessionLocal, dispose_engine
+
+
+async def stats_check(args) -> int:
+    async with SessionLocal() as session:
+        diffs = await repo_stats.check_stats(session)
+    for kind, key, stored, actual in diffs:
+        print(f"{kind}/{key}: stored {stored}, actual {actual}")
+    print("book_stats is consistent" if not diffs else f"{len(diffs)} counters differ")
+    return 1 if diffs else 0
+
+
+async def stats_rebuild(args) -> int:
+    async with SessionLocal() as session:
+        rows = await repo_stats.rebuild_stats(session)
+    print(f"book_stats rebuilt: {rows} counters")
+    return 0
+
+
+async def books_partitions(args) -> int:
+    async with SessionLocal() as session:
+        created = await ensure_book_partitions(session)
+    if created is None:
+        print("books is not partitioned; apply migration 0005_partition_books")
+        return 1
+    print(f"books partitions created: {created}")
+    return 0
+
+
+async def books_duplicates(args) -> int:
+    from app.services import dedupe  # deferred: NumPy is only needed here
+
+    async with SessionLocal() as session:
+        report = await dedupe.duplicate_report(session, args.threshold, args.limit)
+    for pair in report["pairs"]:
+        a, b = pair["books"]
+        print(
+            f"{pair['similarity']:.3f}  #{a['id']} {a['title']!r} by {a['author']}"
+            f"  ~  #{b['id']} {b['title']!r} by {b['author']}"
+        )
+    print(
+        f"{report['books']} books, {report['candidates']} candidate pairs, "
+        f"{report['duplicates']} likely duplicates at {args.threshold}"
+    )
+    return 1 if report["duplicates"] else 0
+
+
+COMMANDS = {
+    "stats-check": stats_check,
+    "stats-rebuild": stats_rebuild,
+    "books-partitions": books_partitions,
+    "books-duplicates": books_duplicates,
+}
+
+
+async def run(args) -> int:
+    try:
+        return await COMMANDS[args.command](args)
+    finally:
+        await dispose_engine()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEDUPE_THRESHOLD,
+        help="books-duplicates: minimum title and author similarity",
+    )
+    parser.add_argument(
+        "--limit", type=int, default=100, help="books-duplicates: pairs to print"
+    )
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
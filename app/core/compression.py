@@ -0,0 +1,112 @@
+import zlib
+from typing import Optional
+
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+)
+
+
+def parse_levels(spec: str) -> dict[str, int]:
+    """Parse ``"default:6,bulk:1"`` into ``{"default": 6, "bulk": 1}``."""
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = item.partition(":")
+        levels[name.strip()] = int(level)
+    return levels
+
+
+def compression_class(name: str):
+    """
+    Tag an endpoint with the compression class that picks its level.
+
+    Endpoints without a tag use the ``default`` class; the levels of each
+    class are set by ``COMPRESSION_LEVELS`` and ``COMPRESSION_BROTLI_LEVELS``.
+    """
+
+    def decorator(fn):
+        fn.__compression_class__ = name
+        return fn
+
+    return decorator
+
+
+# Large bodies produced in one go (exports, batches): favour throughput.
+bulk = compression_class("bulk")
+
+
+class GzipEncoder:
+    def __init__(self, level: int):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        """Compress ``data``; with ``flush`` emit everything fed so far."""
+        out = self._z.compress(data)
+        return out + self._z.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        return self._z.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, level: int):
+        self._c = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._c.process(data)
+        return out + self._c.flush() if flush else out
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+# In order of preference when the client accepts several equally.
+ENCODERS = {"gzip": GzipEncoder}
+if brotli is not None:
+    ENCODERS = {"br": BrotliEncoder, **ENCODERS}
+
+
+def negotiate(accept_encoding: str, available=tuple(ENCODERS)) -> Optional[str]:
+    """
+    Pick the content coding to use for an ``Accept-Encoding`` header value.
+
+    Honours q-values (``q=0`` refuses a coding) and the ``*`` wildcard; ties
+    go to the earlier entry of ``available``. Returns None for identity.
+    """
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding.lower()] = q
+
+    best, best_q = None, 0.0
+    for coding in available:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type == "text/event-stream":
+        # Events are small and must go out as they happen, not held back
+        # until the minimum size is reached.
+        return False
+    return media_type.startswith(COMPRESSIBLE_TYPES) or media_type.endswith("+json")
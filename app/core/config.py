@@ -28,12 +28,97 @@ if _V2:
         DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
         DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", 30))
         DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+        DB_POOL_ADAPTIVE: bool = (
+            os.getenv("DB_POOL_ADAPTIVE", "false").lower() == "true"
+        )
+        DB_POOL_MAX_SIZE: int = int(os.getenv("DB_POOL_MAX_SIZE", 40))
+        DB_POOL_TARGET_WAIT_MS: int = int(os.getenv("DB_POOL_TARGET_WAIT_MS", 50))
+        DB_POOL_ADJUST_INTERVAL: int = int(os.getenv("DB_POOL_ADJUST_INTERVAL", 10))
+        DB_CONNECTION_BUDGET: int = int(os.getenv("DB_CONNECTION_BUDGET", 90))
+        WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", 1))
+        # AWS Lambda: one request per instance, so the pool holds one connection.
+        SERVERLESS: bool = (
+            os.getenv(
+                "SERVERLESS", str(bool(os.getenv("AWS_LAMBDA_FUNCTION_NAME")))
+            ).lower()
+            == "true"
+        )
+
+        WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+        WARMUP_CONNECTIONS: int = int(
+            os.getenv("WARMUP_CONNECTIONS", os.getenv("DB_POOL_SIZE", 5))
+        )
+        WARMUP_AUTHORS: int = int(os.getenv("WARMUP_AUTHORS", 1000))
+        AUTHOR_CACHE_SIZE: int = int(os.getenv("AUTHOR_CACHE_SIZE", 10000))
+        SUGGEST_ENABLED: bool = os.getenv("SUGGEST_ENABLED", "true").lower() == "true"
+        SUGGEST_REFRESH_SECONDS: int = int(os.getenv("SUGGEST_REFRESH_SECONDS", 60))
+        EVENTS_ENABLED: bool = os.getenv("EVENTS_ENABLED", "true").lower() == "true"
+        EVENTS_HEARTBEAT: float = float(os.getenv("EVENTS_HEARTBEAT", 15))
+        EVENTS_REPLAY_SIZE: int = int(os.getenv("EVENTS_REPLAY_SIZE", 1000))
+        EVENTS_QUEUE_SIZE: int = int(os.getenv("EVENTS_QUEUE_SIZE", 100))
+
+        COMPRESSION_ENABLED: bool = (
+            os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+        )
+        COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+        COMPRESSION_LEVELS: str = os.getenv("COMPRESSION_LEVELS", "default:6,bulk:1")
+        COMPRESSION_BROTLI_LEVELS: str = os.getenv(
+            "COMPRESSION_BROTLI_LEVELS", "default:4,bulk:1"
+        )
+
+        METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+        DB_ECHO: bool = (
+            os.getenv("DB_ECHO", os.getenv("DEBUG", "false")).lower() == "true"
+        )
+        DB_SLOW_QUERY_MS: float = float(os.getenv("DB_SLOW_QUERY_MS", 200))
+        DB_SLOW_QUERY_EXPLAIN_SAMPLE: float = float(
+            os.getenv("DB_SLOW_QUERY_EXPLAIN_SAMPLE", 0.1)
+        )
+        DB_SLOW_QUERY_BUFFER: int = int(os.getenv("DB_SLOW_QUERY_BUFFER", 100))
+        DB_COALESCE_READS: bool = (
+            os.getenv("DB_COALESCE_READS", "true").lower() == "true"
+        )
+        SERVER_TIMING_ENABLED: bool = (
+            os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+        )
+        QUERY_BUDGET_ENFORCE: bool = (
+            os.getenv(
+                "QUERY_BUDGET_ENFORCE",
+                str(os.getenv("ENV", "dev") == "test"),
+            ).lower()
+            == "true"
+        )
+
+        TRACING_SAMPLE_RATE: float = float(os.getenv("TRACING_SAMPLE_RATE", 0.0))
+        TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "file")
+        TRACING_FILE: str = os.getenv("TRACING_FILE", "traces.jsonl")
+        TRACING_OTLP_ENDPOINT: str = os.getenv(
+            "TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+        )
 
         JWT_SECRET: str = os.getenv("JWT_SECRET", "CHANGE_ME")
         JWT_ALG: str = os.getenv("JWT_ALG", "HS256")
         ACCESS_TOKEN_EXPIRE_MINUTES: int = int(
             os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60)
         )
+        BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12))
+        AUTH_HASH_WORKERS: int = int(os.getenv("AUTH_HASH_WORKERS", 2))
+        AUTH_HASH_QUEUE: int = int(os.getenv("AUTH_HASH_QUEUE", 64))
+        TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+        TOKEN_CACHE_TTL: int = int(os.getenv("TOKEN_CACHE_TTL", 60))
+        # Comma-separated emails allowed to use the /admin endpoints.
+        ADMIN_EMAILS: str = os.getenv("ADMIN_EMAILS", "")
+
+        RATE_LIMIT_ENABLED: bool = (
+            os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+        )
+        RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+        RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+        RATE_LIMIT_SHM_PATH: str = os.getenv("RATE_LIMIT_SHM_PATH", "")
+        RATE_LIMIT_SHM_SLOTS: int = int(os.getenv("RATE_LIMIT_SHM_SLOTS", 65536))
+        RATE_LIMIT_REDIS_URL: str = os.getenv(
+            "RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0"
+        )
 
         model_config = SettingsConfigDict(
             env_file=".env",
@@ -61,12 +146,97 @@ else:
         DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
         DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", 30))
         DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+        DB_POOL_ADAPTIVE: bool = (
+            os.getenv("DB_POOL_ADAPTIVE", "false").lower() == "true"
+        )
+        DB_POOL_MAX_SIZE: int = int(os.getenv("DB_POOL_MAX_SIZE", 40))
+        DB_POOL_TARGET_WAIT_MS: int = int(os.getenv("DB_POOL_TARGET_WAIT_MS", 50))
+        DB_POOL_ADJUST_INTERVAL: int = int(os.getenv("DB_POOL_ADJUST_INTERVAL", 10))
+        DB_CONNECTION_BUDGET: int = int(os.getenv("DB_CONNECTION_BUDGET", 90))
+        WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", 1))
+        # AWS Lambda: one request per instance, so the pool holds one connection.
+        SERVERLESS: bool = (
+            os.getenv(
+                "SERVERLESS", str(bool(os.getenv("AWS_LAMBDA_FUNCTION_NAME")))
+            ).lower()
+            == "true"
+        )
+
+        WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+        WARMUP_CONNECTIONS: int = int(
+            os.getenv("WARMUP_CONNECTIONS", os.getenv("DB_POOL_SIZE", 5))
+        )
+        WARMUP_AUTHORS: int = int(os.getenv("WARMUP_AUTHORS", 1000))
+        AUTHOR_CACHE_SIZE: int = int(os.getenv("AUTHOR_CACHE_SIZE", 10000))
+        SUGGEST_ENABLED: bool = os.getenv("SUGGEST_ENABLED", "true").lower() == "true"
+        SUGGEST_REFRESH_SECONDS: int = int(os.getenv("SUGGEST_REFRESH_SECONDS", 60))
+        EVENTS_ENABLED: bool = os.getenv("EVENTS_ENABLED", "true").lower() == "true"
+        EVENTS_HEARTBEAT: float = float(os.getenv("EVENTS_HEARTBEAT", 15))
+        EVENTS_REPLAY_SIZE: int = int(os.getenv("EVENTS_REPLAY_SIZE", 1000))
+        EVENTS_QUEUE_SIZE: int = int(os.getenv("EVENTS_QUEUE_SIZE", 100))
+
+        COMPRESSION_ENABLED: bool = (
+            os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+        )
+        COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+        COMPRESSION_LEVELS: str = os.getenv("COMPRESSION_LEVELS", "default:6,bulk:1")
+        COMPRESSION_BROTLI_LEVELS: str = os.getenv(
+            "COMPRESSION_BROTLI_LEVELS", "default:4,bulk:1"
+        )
+
+        METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+        DB_ECHO: bool = (
+            os.getenv("DB_ECHO", os.getenv("DEBUG", "false")).lower() == "true"
+        )
+        DB_SLOW_QUERY_MS: float = float(os.getenv("DB_SLOW_QUERY_MS", 200))
+        DB_SLOW_QUERY_EXPLAIN_SAMPLE: float = float(
+            os.getenv("DB_SLOW_QUERY_EXPLAIN_SAMPLE", 0.1)
+        )
+        DB_SLOW_QUERY_BUFFER: int = int(os.getenv("DB_SLOW_QUERY_BUFFER", 100))
+        DB_COALESCE_READS: bool = (
+            os.getenv("DB_COALESCE_READS", "true").lower() == "true"
+        )
+        SERVER_TIMING_ENABLED: bool = (
+            os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+        )
+        QUERY_BUDGET_ENFORCE: bool = (
+            os.getenv(
+                "QUERY_BUDGET_ENFORCE",
+                str(os.getenv("ENV", "dev") == "test"),
+            ).lower()
+            == "true"
+        )
+
+        TRACING_SAMPLE_RATE: float = float(os.getenv("TRACING_SAMPLE_RATE", 0.0))
+        TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "file")
+        TRACING_FILE: str = os.getenv("TRACING_FILE", "traces.jsonl")
+        TRACING_OTLP_ENDPOINT: str = os.getenv(
+            "TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+        )
 
         JWT_SECRET: str = os.getenv("JWT_SECRET", "CHANGE_ME")
         JWT_ALG: str = os.getenv("JWT_ALG", "HS256")
         ACCESS_TOKEN_EXPIRE_MINUTES: int = int(
             os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60)
         )
+        BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12))
+        AUTH_HASH_WORKERS: int = int(os.getenv("AUTH_HASH_WORKERS", 2))
+        AUTH_HASH_QUEUE: int = int(os.getenv("AUTH_HASH_QUEUE", 64))
+        TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+        TOKEN_CACHE_TTL: int = int(os.getenv("TOKEN_CACHE_TTL", 60))
+        # Comma-separated emails allowed to use the /admin endpoints.
+        ADMIN_EMAILS: str = os.getenv("ADMIN_EMAILS", "")
+
+        RATE_LIMIT_ENABLED: bool = (
+            os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+        )
+        RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+        RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+        RATE_LIMIT_SHM_PATH: str = os.getenv("RATE_LIMIT_SHM_PATH", "")
+        RATE_LIMIT_SHM_SLOTS: int = int(os.getenv("RATE_LIMIT_SHM_SLOTS", 65536))
+        RATE_LIMIT_REDIS_URL: str = os.getenv(
+            "RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0"
+        )
 
         class Config:
             env_file = ".env"
@@ -1,2 +1,24 @@
 GENRES = ("Fiction", "Non-Fiction", "Science", "History")
 ALLOWED_SORT_FIELDS = ("title", "published_year", "author")
+# Values returned per facet, most frequent first.
+FACET_LIMIT = 20
+EXPORT_CHUNK_ROWS = 1000
+# Rows per content-hashed import chunk; a resent file skips chunks seen before.
+IMPORT_CHUNK_ROWS = 1000
+# Book fields in response order; `fields=` selects a subset of them.
+BOOK_FIELDS = (
+    "id",
+    "title",
+    "author",
+    "genre",
+    "published_year",
+    "created_at",
+    "updated_at",
+)
+BATCH_MAX_IDS = 100
+# Most suggestions returned per typeahead query.
+SUGGEST_LIMIT = 10
+# Postgres NOTIFY channel carrying book writes to the event stream.
+BOOK_EVENTS_CHANNEL = "book_events"
+# Default similarity (0-1) at which two books are reported as duplicates.
+DEDUPE_THRESHOLD = 0.6
@@ -0,0 +1,25 @@
+import base64
+import json
+
+
+def encode_cursor(values: list) -> str:
+    """Opaque, URL-safe cursor for the sort key values of a page's last row."""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """
+    Sort key values from :func:`encode_cursor`.
+
+    Raises:
+        ValueError: the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("invalid cursor") from exc
+    if not isinstance(values, list):
+        raise ValueError("invalid cursor")
+    return values
@@ -2,7 +2,9 @@ from fastapi import Request
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from slowapi.errors import RateLimitExceeded
+
+from app.core.limiter import RateLimitExceeded
+from app.core.metrics import rate_limit_rejections, route_label
 
 
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
@@ -19,6 +21,7 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     return JSONResponse(
         status_code=exc.status_code,
         content={"error": {"code": exc.status_code, "message": exc.detail}},
+        headers=getattr(exc, "headers", None),
     )
 
 
@@ -76,7 +79,9 @@ async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
     Returns:
         JSONResponse: A 429 error response indicating too many requests.
     """
+    rate_limit_rejections.inc(route_label(request.scope))
     return JSONResponse(
         status_code=429,
         content={"error": {"code": 429, "message": "Too many requests"}},
+        headers={"Retry-After": str(exc.retry_after)},
     )
@@ -1,4 +1,428 @@
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+import asyncio
+import fcntl
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+import tempfile
+import time
+from collections import OrderedDict, deque
+from typing import NamedTuple, Optional
+from urllib.parse import urlparse
 
-limiter = Limiter(key_func=get_remote_address)
+from jose import JWTError, jwt
+
+from app.core.config import settings
+from app.core.security import token_cache
+
+logger = logging.getLogger(__name__)
+
+_UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class Rate(NamedTuple):
+    limit: int
+    window: int  # seconds
+
+
+def parse_rate(spec: str) -> Rate:
+    """
+    Parse ``"30/minute"`` style limits into a :class:`Rate`.
+    """
+    count, _, unit = spec.partition("/")
+    unit = unit.strip().rstrip("s")
+    if unit not in _UNITS:
+        raise ValueError(f"Unsupported rate limit unit in {spec!r}")
+    return Rate(int(count), _UNITS[unit])
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised when a client exceeds the limit of a route.
+    """
+
+    def __init__(self, rate: Rate, retry_after: int):
+        super().__init__(f"Rate limit {rate.limit}/{rate.window}s exceeded")
+        self.rate = rate
+        self.retry_after = retry_after
+
+
+def sliding_window(
+    prev: int, curr: int, elapsed: float, rate: Rate
+) -> tuple[bool, int]:
+    """
+    Decide one hit with the sliding-window counter approximation.
+
+    The previous fixed window is weighted by how much of it still overlaps
+    the trailing ``rate.window`` seconds. Returns ``(allowed, retry_after)``;
+    ``retry_after`` is the number of seconds until a hit would be allowed.
+    """
+    weight = 1.0 - elapsed / rate.window
+    if prev * weight + curr + 1 <= rate.limit:
+        return True, 0
+    if curr + 1 > rate.limit or not prev:
+        wait = rate.window - elapsed
+    else:
+        wait = rate.window * (1.0 - (rate.limit - curr - 1) / prev) - elapsed
+    return False, max(1, math.ceil(wait))
+
+
+def _roll(window: int, prev: int, curr: int, now_window: int) -> tuple[int, int]:
+    """Shift stored counters forward to ``now_window``."""
+    if window == now_window:
+        return prev, curr
+    if window == now_window - 1:
+        return curr, 0
+    return 0, 0
+
+
+class MemoryBackend:
+    """
+    Per-process counters in a bounded LRU dict.
+
+    Each key holds its window index and two counters, so memory is O(1) per
+    key and capped at ``max_keys``; the least recently seen key is evicted
+    first. Limits are per worker with this backend.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._entries: OrderedDict[str, list] = OrderedDict()
+
+    async def hit(self, key: str, rate: Rate, now: float) -> tuple[bool, int]:
+        now_window, offset = divmod(now, rate.window)
+        now_window = int(now_window)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = [now_window, 0, 0]
+            if len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+            entry[1], entry[2] = _roll(entry[0], entry[1], entry[2], now_window)
+            entry[0] = now_window
+        allowed, retry_after = sliding_window(entry[1], entry[2], offset, rate)
+        if allowed:
+            entry[2] += 1
+        return allowed, retry_after
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def reset(self) -> None:
+        self._entries.clear()
+
+
+class SharedMemoryBackend:
+    """
+    Counters in a memory-mapped file shared by the workers of one host.
+
+    The file is a set-associative table: a key hashes to a bucket of
+    ``WAYS`` slots, and when the bucket is full the slot touched longest ago
+    is reused. Each bucket is guarded by a POSIX byte-range lock on the
+    file, so workers started by ``uvicorn --workers`` or gunicorn see the
+    same counts. Memory is fixed at ``slots * SLOT.size`` bytes.
+
+    The lock is taken without blocking: while another worker holds the
+    bucket, ``hit`` sleeps ``LOCK_RETRY`` seconds and tries again, so the
+    event loop keeps serving other requests. POSIX locks belong to the
+    process, which is why the critical section stays on the loop thread
+    rather than moving to a thread pool.
+    """
+
+    # key hash, window index, previous count, current count, last touched (ms)
+    SLOT = struct.Struct("<QqIIq")
+    WAYS = 4
+    LOCK_RETRY = 0.001
+
+    def __init__(self, path: str, slots: int):
+        self.path = path
+        self.buckets = max(1, slots // self.WAYS)
+        self.size = self.buckets * self.WAYS * self.SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < self.size:
+            os.ftruncate(self._fd, self.size)
+        self._map = mmap.mmap(self._fd, self.size)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1
+
+    async def hit(self, key: str, rate: Rate, now: float) -> tuple[bool, int]:
+        key_hash = self._hash(key)
+        now_window, offset = divmod(now, rate.window)
+        now_window = int(now_window)
+        bucket_len = self.WAYS * self.SLOT.size
+        base = (key_hash % self.buckets) * bucket_len
+
+        while True:
+            try:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB, bucket_len, base)
+                break
+            except (BlockingIOError, PermissionError):
+                await asyncio.sleep(self.LOCK_RETRY)
+        try:
+            victim, oldest = base, None
+            for pos in range(base, base + bucket_len, self.SLOT.size):
+                h, window, prev, curr, touched = self.SLOT.unpack_from(self._map, pos)
+                if h == key_hash:
+                    prev, curr = _roll(window, prev, curr, now_window)
+                    break
+                if oldest is None or touched < oldest:
+                    victim, oldest = pos, touched
+            else:
+                pos, prev, curr = victim, 0, 0
+
+            allowed, retry_after = sliding_window(prev, curr, offset, rate)
+            if allowed:
+                curr += 1
+            self.SLOT.pack_into(
+                self._map, pos, key_hash, now_window, prev, curr, int(now * 1000)
+            )
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, bucket_len, base)
+        return allowed, retry_after
+
+    def reset(self) -> None:
+        fcntl.lockf(self._fd, fcntl.LOCK_EX)
+        try:
+            self._map[:] = bytes(self.size)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+
+class RespError(Exception):
+    """Error reply from a Redis-protocol server."""
+
+
+class RedisBackend:
+    """
+    Counters in a Redis-compatible server, shared by every worker and host.
+
+    Speaks RESP directly over one pipelined connection: commands are written
+    as they come and replies are matched to callers in order. Counters live
+    under ``rl:<key>:<window>`` and expire after two windows, so idle keys
+    are evicted by the server. A rejected hit is taken back with ``DECR``.
+    """
+
+    def __init__(self, url: str):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int((parsed.path or "/0").lstrip("/") or 0)
+        self.namespace = "rl"
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pending: deque = deque()
+        self._connecting: Optional[asyncio.Lock] = None
+
+    @staticmethod
+    def _encode(*args) -> bytes:
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(out)
+
+    async def _read_reply(self, reader: asyncio.StreamReader):
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        prefix, rest = line[:1], line[1:-2]
+        if prefix == b"+":
+            return rest.decode()
+        if prefix == b"-":
+            return RespError(rest.decode())
+        if prefix == b":":
+            return int(rest)
+        if prefix == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = await reader.readexactly(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            return [await self._read_reply(reader) for _ in range(int(rest))]
+        raise ConnectionError(f"Unexpected reply {line!r}")
+
+    def _fail(
+        self, exc: BaseException, writer: Optional[asyncio.StreamWriter] = None
+    ) -> None:
+        while self._pending:
+            future, _ = self._pending.popleft()
+            if not future.done():
+                future.set_exception(ConnectionError(str(exc)))
+        for w in (self._writer, writer):
+            if w is not None:
+                w.close()
+        self._reader = self._writer = None
+
+    async def _connect(self) -> None:
+        if self._connecting is None:
+            self._connecting = asyncio.Lock()
+        async with self._connecting:
+            if self._writer is not None:
+                return
+            # Published only once AUTH/SELECT succeeded: until then other
+            # callers wait on the lock instead of pipelining onto it.
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+            setup = []
+            if self.password:
+                setup.append(("AUTH", self.password))
+            if self.db:
+                setup.append(("SELECT", self.db))
+            try:
+                for command in setup:
+                    writer.write(self._encode(*command))
+                    reply = await self._read_reply(reader)
+                    if isinstance(reply, RespError):
+                        raise reply
+            except BaseException as exc:
+                self._fail(exc, writer)
+                raise
+            self._reader, self._writer = reader, writer
+
+    async def execute(self, *commands: tuple) -> list:
+        """
+        Send ``commands`` in one pipeline and return their replies in order.
+        """
+        if self._writer is None:
+            await self._connect()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((future, len(commands)))
+        self._writer.write(b"".join(self._encode(*c) for c in commands))
+        if len(self._pending) == 1:
+            # Only the oldest caller reads; later callers wait on their future.
+            asyncio.ensure_future(self._drain(self._reader))
+        return await future
+
+    async def _drain(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while self._pending:
+                future, count = self._pending[0]
+                replies = [await self._read_reply(reader) for _ in range(count)]
+                self._pending.popleft()
+                if not future.done():
+                    future.set_result(replies)
+        except Exception as exc:
+            self._fail(exc)
+
+    async def hit(self, key: str, rate: Rate, now: float) -> tuple[bool, int]:
+        now_window, offset = divmod(now, rate.window)
+        now_window = int(now_window)
+        curr_key = f"{self.namespace}:{key}:{now_window}"
+        prev_key = f"{self.namespace}:{key}:{now_window - 1}"
+        curr, _, prev = await self.execute(
+            ("INCR", curr_key),
+            ("PEXPIRE", curr_key, rate.window * 2000),
+            ("GET", prev_key),
+        )
+        for reply in (curr, prev):
+            if isinstance(reply, RespError):
+                raise reply
+        allowed, retry_after = sliding_window(int(prev or 0), curr - 1, offset, rate)
+        if not allowed:
+            await self.execute(("DECR", curr_key))
+        return allowed, retry_after
+
+    def reset(self) -> None:
+        # Start a fresh key namespace; used by tests, affects this process only.
+        self.namespace = f"rl-{os.urandom(4).hex()}"
+
+
+def client_identity(scope: dict) -> str:
+    """
+    Rate-limit identity of a request.
+
+    Requests carrying a valid bearer token are keyed on the JWT subject, so a
+    user keeps one quota across addresses and users behind one NAT do not
+    share theirs. Everything else is keyed on the client address.
+    """
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                break
+            cached = token_cache.get(token)
+            if cached is not None:
+                return f"user:{cached.id}"
+            try:
+                payload = jwt.decode(
+                    token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG]
+                )
+            except JWTError:
+                break
+            if payload.get("sub"):
+                return f"user:{payload['sub']}"
+            break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimiter:
+    """
+    Sliding-window rate limiter with pluggable counter storage.
+
+    Routes opt in with :meth:`limit`; each decorated endpoint has its own
+    quota per client identity (see :func:`client_identity`). The check itself
+    runs in ``RateLimitMiddleware``, before the route's dependencies.
+    """
+
+    def __init__(self, backend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self.errors = 0
+
+    async def hit(self, scope: dict, name: str, rate: Rate) -> None:
+        """
+        Count one request against ``rate``; raise :class:`RateLimitExceeded`
+        when it is over the limit.
+
+        Backend failures are logged and let the request through, so an
+        unavailable shared store does not take the API down with it.
+        """
+        if not self.enabled:
+            return
+        key = f"{name}:{client_identity(scope)}"
+        try:
+            allowed, retry_after = await self.backend.hit(key, rate, time.time())
+        except Exception:
+            self.errors += 1
+            logger.exception("Rate limiter backend failed; allowing request")
+            return
+        if not allowed:
+            raise RateLimitExceeded(rate, retry_after)
+
+    def limit(self, spec: str):
+        """
+        Limit an endpoint to ``spec`` (e.g. ``"30/minute"``) per client.
+        """
+        rate = parse_rate(spec)
+
+        def decorator(fn):
+            fn.__rate_limit__ = rate
+            return fn
+
+        return decorator
+
+    def reset(self) -> None:
+        self.backend.reset()
+
+
+def _build_backend():
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisBackend(settings.RATE_LIMIT_REDIS_URL)
+    if settings.RATE_LIMIT_BACKEND == "shm":
+        path = settings.RATE_LIMIT_SHM_PATH or os.path.join(
+            "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+            "library-ratelimit",
+        )
+        return SharedMemoryBackend(path, settings.RATE_LIMIT_SHM_SLOTS)
+    return MemoryBackend(settings.RATE_LIMIT_MAX_KEYS)
+
+
+limiter = RateLimiter(_build_backend(), enabled=settings.RATE_LIMIT_ENABLED)
@@ -0,0 +1,287 @@
+from bisect import bisect_left
+from typing import Callable, Iterable, Sequence
+
+# Latency buckets in seconds, from sub-millisecond up to the pool timeout range.
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with cumulative bucket counts.
+
+    Observations are O(log buckets) and allocation free, so it is cheap
+    enough to record on every connection checkout or request.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile as the upper bound of the bucket containing it.
+
+        Returns 0.0 when nothing was observed and ``inf`` when the quantile
+        falls into the overflow bucket.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> dict:
+        """
+        Return cumulative bucket counts keyed by upper bound, plus sum and count.
+        """
+        cumulative, running = {}, 0
+        for bound, n in zip(self.buckets, self.counts):
+            running += n
+            cumulative[bound] = running
+        cumulative[float("inf")] = self.count
+        return {"buckets": cumulative, "sum": self.sum, "count": self.count}
+
+    def reset(self) -> None:
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        escaped = escaped.replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """
+    Monotonic counter with optional labels, e.g. ``c.inc("GET", "200")``.
+    ``callback`` metrics are read at scrape time.
+    """
+
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Callable[[], dict] = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: dict[tuple, float] = {}
+        self.callback = callback
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def get(self, *labels: str) -> float:
+        return self.values.get(labels, 0.0)
+
+    def render(self) -> Iterable[str]:
+        if self.callback is not None:
+            self.values = dict(self.callback())
+        for labels, value in self.values.items():
+            yield (
+                f"{self.name}{_format_labels(self.labelnames, labels)} "
+                f"{_format_value(value)}"
+            )
+
+
+class Gauge(Counter):
+    """
+    Gauge with optional labels. ``callback`` gauges are read at scrape time.
+    """
+
+    kind = "gauge"
+
+    def set(self, *labels: str, value: float) -> None:
+        self.values[labels] = value
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) - amount
+
+
+class HistogramVec:
+    """
+    Labelled family of :class:`Histogram` children sharing bucket bounds.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        children: Callable[[], dict] = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.children_callback = children
+        self.children: dict[tuple, Histogram] = {}
+
+    def labels(self, *labels: str) -> Histogram:
+        child = self.children.get(labels)
+        if child is None:
+            child = self.children[labels] = Histogram(self.buckets)
+        return child
+
+    def observe(self, value: float, *labels: str) -> None:
+        self.labels(*labels).observe(value)
+
+    def render(self) -> Iterable[str]:
+        if self.children_callback is not None:
+            self.children = dict(self.children_callback())
+        names = self.labelnames + ("le",)
+        for labels, child in self.children.items():
+            snap = child.snapshot()
+            for bound, count in snap["buckets"].items():
+                label_str = _format_labels(names, labels + (_format_value(bound),))
+                yield f"{self.name}_bucket{label_str} {count}"
+            label_str = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_str} {_format_value(snap['sum'])}"
+            yield f"{self.name}_count{label_str} {snap['count']}"
+
+
+class Registry:
+    """
+    Collection of metrics rendered in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self.metrics: dict[str, object] = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames=(), callback=None
+    ) -> Counter:
+        return self.register(Counter(name, documentation, labelnames, callback))
+
+    def gauge(self, name: str, documentation: str, labelnames=(), callback=None):
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames=(),
+        buckets=DEFAULT_BUCKETS,
+        children=None,
+    ) -> HistogramVec:
+        return self.register(
+            HistogramVec(name, documentation, labelnames, buckets, children)
+        )
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+http_requests = REGISTRY.counter(
+    "http_requests_total",
+    "HTTP requests by method, templated route and status code.",
+    ("method", "route", "status"),
+)
+http_request_duration = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method and templated route.",
+    ("method", "route"),
+)
+http_in_flight = REGISTRY.gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served.",
+)
+http_in_flight.set(value=0)
+db_queries = REGISTRY.counter(
+    "db_queries_total",
+    "SQL statements executed, by calling repository function.",
+    ("function",),
+)
+db_query_duration = REGISTRY.histogram(
+    "db_query_duration_seconds",
+    "SQL statement latency, by calling repository function.",
+    ("function",),
+)
+coalesced_calls = REGISTRY.counter(
+    "db_coalesced_calls_total",
+    "Read calls served by joining an identical in-flight call, by function.",
+    ("function",),
+)
+rate_limit_rejections = REGISTRY.counter(
+    "rate_limit_rejections_total",
+    "Requests rejected by the rate limiter, by templated route.",
+    ("route",),
+)
+import_rows = REGISTRY.counter(
+    "books_import_rows_total",
+    "Rows processed by book imports, by file format and outcome.",
+    ("format", "outcome"),
+)
+export_rows = REGISTRY.counter(
+    "books_export_rows_total",
+    "Rows written by book exports, by file format.",
+    ("format",),
+)
+
+
+def route_label(scope: dict) -> str:
+    """
+    Return the templated path of the matched route, e.g. ``/api/books/{book_id}``.
+
+    Raw paths are never used as labels so that ids do not explode cardinality.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
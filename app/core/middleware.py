@@ -0,0 +1,325 @@
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.routing import Route
+
+from app.core.compression import ENCODERS, is_compressible, negotiate
+from app.core.config import settings
+from app.core.errors import rate_limit_handler
+from app.core.limiter import RateLimiter, RateLimitExceeded
+from app.core.metrics import (
+    http_in_flight,
+    http_request_duration,
+    http_requests,
+    route_label,
+)
+from app.core.request_timing import QueryBudgetExceeded, RequestTimings, current_timings
+from app.core.tracing import current_span, tracer
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request count, latency and in-flight gauges.
+
+    Metrics are labelled with the templated route path that FastAPI stores in
+    the scope while routing, so it has to be read after the app returns.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_in_flight.dec()
+            route = route_label(scope)
+            method = scope["method"]
+            http_request_duration.observe(elapsed, method, route)
+            http_requests.inc(method, route, str(status))
+
+
+class ServerTimingMiddleware:
+    """
+    Pure ASGI middleware tracking handler, auth and DB time per request.
+
+    With ``SERVER_TIMING_ENABLED`` responses carry a ``Server-Timing`` header::
+
+        Server-Timing: app;dur=12.4, auth;dur=1.1, db;dur=6.0;desc="3 queries"
+
+    With ``QUERY_BUDGET_ENFORCE`` a route decorated with ``@query_budget(n)``
+    that issues more than ``n`` statements raises ``QueryBudgetExceeded``
+    before its response starts (after the handler has committed, so this is
+    meant for tests); otherwise the overrun is logged as a warning.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                self._check_budget(scope, timings)
+                if settings.SERVER_TIMING_ENABLED:
+                    elapsed = time.perf_counter() - start
+                    header = (
+                        f"app;dur={elapsed * 1000:.1f}, "
+                        f"auth;dur={timings.auth_time * 1000:.1f}, "
+                        f"db;dur={timings.db_time * 1000:.1f};"
+                        f'desc="{timings.db_count} queries"'
+                    )
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", header.encode("latin-1"))
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_timings.reset(token)
+
+    @staticmethod
+    def _check_budget(scope, timings: RequestTimings) -> None:
+        route = scope.get("route")
+        budget = getattr(getattr(route, "endpoint", None), "__query_budget__", None)
+        if budget is None or timings.db_count <= budget:
+            return
+        message = (
+            f"{scope['method']} {route.path} issued {timings.db_count} SQL "
+            f"statements, budget is {budget}"
+        )
+        if settings.QUERY_BUDGET_ENFORCE:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware opening the root span of sampled requests.
+
+    Continues the trace of an incoming W3C ``traceparent`` header. Child spans
+    for dependencies, services, repository calls and SQL statements attach to
+    the root through the ``current_span`` context variable.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or tracer.processor is None:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        root = tracer.start_trace(f"{scope['method']} {scope['path']}", traceparent)
+        if root is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = current_span.set(root)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_span.reset(token)
+            route = route_label(scope)
+            root.name = f"{scope['method']} {route}"
+            root.set_attribute("http.method", scope["method"])
+            root.set_attribute("http.route", route)
+            root.set_attribute("http.status_code", status)
+            if status >= 500:
+                root.status = "ERROR"
+            tracer.finish_trace(root)
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware enforcing ``@limiter.limit`` quotas.
+
+    Requests are matched against the routes up to the last limited one, in
+    router order, so a request for an unlimited route never touches the
+    limiter backend. Rejected requests get the 429 response before
+    dependencies such as the DB session or the current user are resolved.
+    """
+
+    def __init__(self, app, routes: list, limiter: RateLimiter):
+        self.app = app
+        self.routes = routes
+        self.limiter = limiter
+        self._limited = None
+
+    def _limited_routes(self) -> list:
+        if self._limited is None:
+            table = []
+            for route in self.routes:
+                if not isinstance(route, Route):
+                    continue
+                endpoint = route.endpoint
+                rate = getattr(endpoint, "__rate_limit__", None)
+                name = f"{endpoint.__module__}.{endpoint.__name__}"
+                table.append((route, name, rate))
+            while table and table[-1][2] is None:
+                table.pop()
+            self._limited = table
+        return self._limited
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.limiter.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        path, method = scope["path"], scope["method"]
+        for route, name, rate in self._limited_routes():
+            if method in route.methods and route.path_regex.match(path):
+                if rate is None:
+                    break
+                try:
+                    await self.limiter.hit(scope, name, rate)
+                except RateLimitExceeded as exc:
+                    scope["route"] = route
+                    response = await rate_limit_handler(Request(scope), exc)
+                    await response(scope, receive, send)
+                    return
+                break
+        await self.app(scope, receive, send)
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing response bodies with the coding the
+    client prefers among those available (``br`` when brotli is installed,
+    then ``gzip``), negotiated from ``Accept-Encoding``.
+
+    Bodies are held back until ``minimum_size`` bytes have been produced;
+    anything that ends below it is sent uncompressed. Streaming responses are
+    compressed chunk by chunk and flushed after each one, so clients receive
+    data as it is generated and nothing is buffered. The level comes from
+    the compression class of the matched endpoint (see
+    ``app.core.compression.compression_class``).
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int,
+        levels: dict[str, dict[str, int]],
+        encoders: dict = ENCODERS,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = levels
+        self.encoders = encoders
+
+    def _level(self, scope, coding: str) -> int:
+        endpoint = getattr(scope.get("route"), "endpoint", None)
+        name = getattr(endpoint, "__compression_class__", "default")
+        levels = self.levels[coding]
+        return levels.get(name, levels["default"])
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        accept = b""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value
+                break
+        coding = negotiate(accept.decode("latin-1"), self.encoders)
+        start = None
+        pending: list[bytes] = []
+        pending_size = 0
+        encoder = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, pending_size, encoder, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if "content-encoding" in headers or not is_compressible(
+                    headers.get("content-type", "")
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+                headers.add_vary_header("Accept-Encoding")
+                if coding is None:
+                    passthrough = True
+                    await send(message)
+                    return
+                start = message
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                pending.append(body)
+                pending_size += len(body)
+                if pending_size < self.minimum_size:
+                    if more_body:
+                        return
+                    passthrough = True
+                    await send(start)
+                    await send(
+                        {"type": "http.response.body", "body": b"".join(pending)}
+                    )
+                    return
+                encoder = self.encoders[coding](self._level(scope, coding))
+                headers = MutableHeaders(scope=start)
+                headers["Content-Encoding"] = coding
+                del headers["Content-Length"]
+                await send(start)
+                body = b"".join(pending)
+                pending.clear()
+
+            if more_body:
+                body = encoder.compress(body, flush=True)
+            else:
+                body = encoder.compress(body, flush=False) + encoder.finish()
+            await send(
+                {"type": "http.response.body", "body": body, "more_body": more_body}
+            )
+
+        await self.app(scope, receive, send_wrapper)
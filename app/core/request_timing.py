@@ -0,0 +1,57 @@
+from contextvars import ContextVar
+from typing import Optional
+
+
+class RequestTimings:
+    """
+    Per-request accumulator for auth and database time.
+
+    The same instance is shared by every task serving the request, so
+    dependencies and SQLAlchemy event hooks can add to it in place.
+    """
+
+    __slots__ = ("auth_time", "db_time", "db_count")
+
+    def __init__(self):
+        self.auth_time = 0.0
+        self.db_time = 0.0
+        self.db_count = 0
+
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "current_timings", default=None
+)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in tests when a route issues more SQL statements than budgeted."""
+
+
+def query_budget(max_queries: int):
+    """
+    Declare how many SQL statements a route may issue per request.
+
+    Enforced by ``ServerTimingMiddleware`` when ``QUERY_BUDGET_ENFORCE`` is on
+    (by default only for ``ENV=test``), so a change that adds round trips to
+    e.g. ``update_book`` fails the tests; elsewhere overruns are logged, since
+    the check runs after the handler has committed.
+    """
+
+    def decorator(fn):
+        fn.__query_budget__ = max_queries
+        return fn
+
+    return decorator
+
+
+def record_auth_time(elapsed: float) -> None:
+    timings = current_timings.get()
+    if timings is not None:
+        timings.auth_time += elapsed
+
+
+def record_db_time(elapsed: float) -> None:
+    timings = current_timings.get()
+    if timings is not None:
+        timings.db_time += elapsed
+        timings.db_count += 1
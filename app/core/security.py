@@ -1,27 +1,100 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
 from app.core.config import settings
+from app.core.request_timing import record_auth_time
+from app.core.token_cache import TokenCache, token_digest
+from app.db.instrumentation import db_function
 from app.db.session import get_session
 from app.schemas.user import UserOut
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Built on first use: only register/login hash passwords, and passlib is
+# not needed to serve the first request of a cold start.
+pwd_context = None
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
+class PasswordHasher:
+    """
+    Run bcrypt off the event loop on a bounded per-worker thread pool.
+
+    At most ``workers`` hashes run at once (bcrypt releases the GIL); up to
+    ``max_queue`` more wait in FIFO order. Beyond that, callers get a 503 with
+    ``Retry-After`` instead of piling up behind a login burst.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="bcrypt"
+        )
+
+    async def run(self, fn, *args):
+        if self.in_flight >= self.workers + self.max_queue:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent authentication requests",
+                headers={"Retry-After": "1"},
+            )
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+
+
+hasher = PasswordHasher(
+    workers=settings.AUTH_HASH_WORKERS, max_queue=settings.AUTH_HASH_QUEUE
+)
+token_cache = TokenCache(
+    max_size=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL
+)
+
+
+def _passwords():
+    global pwd_context
+    if pwd_context is None:
+        from passlib.context import CryptContext
+
+        pwd_context = CryptContext(
+            schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+        )
+    return pwd_context
+
+
 def get_password_hash(password: str) -> str:
     """Hash a plain password using bcrypt."""
-    return pwd_context.hash(password)
+    return _passwords().hash(password)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
     """Verify a plain password against its hashed version."""
-    return pwd_context.verify(plain, hashed)
+    return _passwords().verify(plain, hashed)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a plain password on the bcrypt thread pool."""
+    return await hasher.run(_passwords().hash, password)
+
+
+async def verify_and_update_password(plain: str, hashed: str) -> tuple[bool, str]:
+    """
+    Verify a password on the bcrypt thread pool.
+
+    Returns ``(valid, new_hash)``; ``new_hash`` is set when the stored hash
+    uses a different cost than ``BCRYPT_ROUNDS`` and should be replaced.
+    """
+    return await hasher.run(_passwords().verify_and_update, plain, hashed)
 
 
 def create_access_token(data: dict, expires_minutes: int = 60) -> str:
@@ -32,11 +105,18 @@ def create_access_token(data: dict, expires_minutes: int = 60) -> str:
     return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALG)
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    session: AsyncSession = Depends(get_session),
-) -> UserOut:
-    """Validate JWT token and fetch the current user from DB."""
+async def _resolve_user(token: str, session: AsyncSession) -> UserOut:
+    """
+    Decode the JWT and load the user it refers to.
+
+    Verified tokens are served from ``token_cache`` without touching the
+    database. On a miss the user lookup also checks the revoked-token
+    denylist, in the same statement.
+    """
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -51,10 +131,42 @@ async def get_current_user(
         raise credentials_exception
 
     res = await session.execute(
-        text("SELECT id, email, created_at FROM users WHERE id = :id"), {"id": user_id}
+        text(
+            """
+            SELECT id, email, created_at FROM users
+            WHERE id = :id
+              AND NOT EXISTS (
+                  SELECT 1 FROM revoked_tokens WHERE token_hash = :token_hash
+              )
+            """
+        ),
+        {"id": user_id, "token_hash": token_digest(token)},
     )
     row = res.first()
     if not row:
         raise credentials_exception
 
-    return UserOut(id=row.id, email=row.email, created_at=row.created_at)
+    user = UserOut(id=row.id, email=row.email, created_at=row.created_at)
+    token_cache.put(token, user, float(payload["exp"]))
+    return user
+
+
+@db_function
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_session),
+) -> UserOut:
+    """Validate JWT token and fetch the current user from DB."""
+    start = time.perf_counter()
+    try:
+        return await _resolve_user(token, session)
+    finally:
+        record_auth_time(time.perf_counter() - start)
+
+
+async def get_admin_user(user: UserOut = Depends(get_current_user)) -> UserOut:
+    """Allow only users listed in ``ADMIN_EMAILS``; 403 for anyone else."""
+    admins = {e.strip().lower() for e in settings.ADMIN_EMAILS.split(",")}
+    if user.email.lower() not in admins - {""}:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    return user
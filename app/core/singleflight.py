@@ -0,0 +1,94 @@
+import asyncio
+import functools
+from typing import Callable, Optional
+
+from app.core.config import settings
+from app.core.metrics import coalesced_calls
+
+
+class _LeaderCancelled(Exception):
+    """The caller executing a shared call was cancelled before it finished."""
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical read calls into one in-flight execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is still running await the same result instead of querying again.
+    Nothing is cached once the call completes.
+
+    Keys include a write generation that :meth:`invalidate` bumps whenever a
+    transaction commits (see ``app.db.session``), so a caller arriving after
+    a completed write always starts a fresh execution rather than joining
+    one that may predate it.
+    The generation is per worker: another worker's write is only reflected
+    once the reads already in flight here have finished.
+
+    Callers must not hold uncommitted writes in their session, since they may
+    be served by another caller's query.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.generation = 0
+        self._calls: dict[tuple, asyncio.Future] = {}
+
+    def invalidate(self) -> None:
+        self.generation += 1
+
+    def coalesce(self, key: Optional[Callable] = None):
+        """
+        Share concurrent calls of the decorated coroutine function.
+
+        ``key`` receives the call's arguments and returns a hashable of the
+        normalized arguments; by default it is every argument but the first
+        (the session), in repository calling convention.
+        """
+
+        def decorator(fn):
+            name = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return await fn(*args, **kwargs)
+                if key is None:
+                    call_key = (args[1:], tuple(sorted(kwargs.items())))
+                else:
+                    call_key = key(*args, **kwargs)
+                flight = (name, self.generation, call_key)
+
+                shared = self._calls.get(flight)
+                if shared is not None:
+                    coalesced_calls.inc(name)
+                    try:
+                        return await asyncio.shield(shared)
+                    except _LeaderCancelled:
+                        return await fn(*args, **kwargs)
+
+                future = asyncio.get_running_loop().create_future()
+                self._calls[flight] = future
+                try:
+                    result = await fn(*args, **kwargs)
+                except asyncio.CancelledError:
+                    future.set_exception(_LeaderCancelled())
+                    raise
+                except Exception as exc:
+                    future.set_exception(exc)
+                    raise
+                else:
+                    future.set_result(result)
+                    return result
+                finally:
+                    del self._calls[flight]
+                    # Mark the exception retrieved when nobody joined.
+                    if future.done() and not future.cancelled():
+                        future.exception()
+
+            return wrapper
+
+        return decorator
+
+
+book_reads = SingleFlight(enabled=settings.DB_COALESCE_READS)
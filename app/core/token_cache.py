@@ -0,0 +1,65 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.schemas.user import UserOut
+
+
+def token_digest(token: str) -> str:
+    """SHA-256 of a raw JWT, used as the denylist key."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of verified access tokens to the user they identify.
+
+    Entries live for ``ttl`` seconds, never past the token's own ``exp``.
+    ``revoke_token`` and ``revoke_user`` drop entries immediately in this
+    worker; other workers stop serving a revoked token within ``ttl`` because
+    the cache-miss path checks the persisted denylist and the user row.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, UserOut]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[UserOut]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, user = entry
+        if expires_at <= time.time():
+            del self._entries[token]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return user
+
+    def put(self, token: str, user: UserOut, token_exp: float) -> None:
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        self._entries[token] = (min(time.time() + self.ttl, token_exp), user)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def revoke_token(self, token: str) -> None:
+        self._entries.pop(token, None)
+
+    def revoke_user(self, user_id: int) -> None:
+        stale = [t for t, (_, user) in self._entries.items() if user.id == user_id]
+        for token in stale:
+            del self._entries[token]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,300 @@
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """
+    A timed operation within a trace, shaped after OpenTelemetry spans.
+
+    All spans of a trace share the ``finished`` list of their root span; the
+    whole trace is handed to the exporter once the root span ends.
+    """
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "status",
+        "finished",
+    )
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], finished):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: dict = {}
+        self.status = "OK"
+        self.finished: list = finished
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        self.end_ns = time.time_ns()
+        self.finished.append(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": (self.end_ns - self.start_ns) / 1e6,
+            "attributes": self.attributes,
+            "status": self.status,
+        }
+
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class MemorySpanExporter:
+    """Keep exported spans in a list (tests and local debugging)."""
+
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, spans: list) -> None:
+        self.spans.extend(spans)
+
+
+class FileSpanExporter:
+    """Append one JSON object per span to a local file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: list) -> None:
+        with open(self.path, "a", encoding="utf-8") as fh:
+            for span in spans:
+                fh.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OTLPHttpExporter:
+    """
+    POST spans as OTLP/HTTP JSON to a collector, e.g. ``http://host:4318/v1/traces``.
+    """
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def payload(self, spans: list) -> dict:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": self.service_name},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "app.core.tracing"},
+                            "spans": [
+                                {
+                                    "traceId": s.trace_id,
+                                    "spanId": s.span_id,
+                                    "parentSpanId": s.parent_id or "",
+                                    "name": s.name,
+                                    "kind": 2 if s.parent_id is None else 1,
+                                    "startTimeUnixNano": str(s.start_ns),
+                                    "endTimeUnixNano": str(s.end_ns),
+                                    "attributes": [
+                                        {"key": k, "value": _otlp_value(v)}
+                                        for k, v in s.attributes.items()
+                                    ],
+                                    "status": {"code": 1 if s.status == "OK" else 2},
+                                }
+                                for s in spans
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def export(self, spans: list) -> None:
+        body = json.dumps(self.payload(spans)).encode("utf-8")
+        req = urllib.request.Request(
+            self.endpoint,
+            data=body,
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(req, timeout=self.timeout):
+            pass
+
+
+class BatchSpanProcessor:
+    """
+    Export finished traces from a background thread.
+
+    Requests never block on export: when the queue is full the trace is
+    dropped and counted in ``dropped``.
+    """
+
+    def __init__(self, exporter, max_queue: int = 2048):
+        self.exporter = exporter
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(
+            target=self._run, name="span-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, spans: list) -> None:
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """Block until every submitted trace has been exported."""
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            spans = self._queue.get()
+            try:
+                self.exporter.export(spans)
+            except Exception:
+                logger.exception("Span export failed")
+            finally:
+                self._queue.task_done()
+
+
+class Tracer:
+    """
+    Head-sampled tracer.
+
+    The sampling decision is taken once per request by :meth:`start_trace`.
+    For unsampled requests there is no current span, and :meth:`span` costs
+    a single context variable lookup.
+    """
+
+    def __init__(self, sample_rate: float, processor: Optional[BatchSpanProcessor]):
+        self.sample_rate = sample_rate
+        self.processor = processor
+
+    def start_trace(
+        self, name: str, traceparent: Optional[str] = None
+    ) -> Optional[Span]:
+        """
+        Start a root span, honouring an incoming W3C ``traceparent`` header.
+        """
+        trace_id, parent_id, sampled = None, None, None
+        if traceparent:
+            parts = traceparent.split("-")
+            if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+                trace_id, parent_id = parts[1], parts[2]
+                sampled = parts[3] == "01"
+        if sampled is None:
+            sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        if not sampled or self.processor is None:
+            return None
+        return Span(name, trace_id or os.urandom(16).hex(), parent_id, [])
+
+    def finish_trace(self, root: Span) -> None:
+        root.end()
+        self.processor.submit(root.finished)
+
+    def start_span(self, name: str) -> Optional[Span]:
+        """
+        Start a child of the current span without making it current.
+        """
+        parent = current_span.get()
+        if parent is None:
+            return None
+        return Span(name, parent.trace_id, parent.span_id, parent.finished)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[Optional[Span]]:
+        """
+        Run a block inside a child span of the current span, if any.
+        """
+        span = self.start_span(name)
+        if span is None:
+            yield None
+            return
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.status = "ERROR"
+            span.set_attribute("error.type", type(exc).__name__)
+            raise
+        finally:
+            current_span.reset(token)
+            span.end()
+
+
+def _build_exporter():
+    if settings.TRACING_EXPORTER == "otlp":
+        return OTLPHttpExporter(settings.TRACING_OTLP_ENDPOINT, settings.APP_NAME)
+    return FileSpanExporter(settings.TRACING_FILE)
+
+
+tracer = Tracer(
+    sample_rate=settings.TRACING_SAMPLE_RATE,
+    processor=(
+        BatchSpanProcessor(_build_exporter())
+        if settings.TRACING_SAMPLE_RATE > 0
+        else None
+    ),
+)
+
+
+def traced(name: Optional[str] = None):
+    """
+    Wrap an async function in a span named ``<module>.<function>`` by default.
+    """
+
+    def decorator(fn):
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with tracer.span(span_name):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
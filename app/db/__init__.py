@@ -3,5 +3,8 @@ from .session import get_session, ping_db
 from app.db.user import User
 from app.db.book import Book
 from app.db.author import Author
+from app.db.revoked_token import RevokedToken
+from app.db.book_stat import BookStat
+from app.db.import_chunk import ImportChunk
 
 get_db = get_session
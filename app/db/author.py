@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, Text, TIMESTAMP, func
+from sqlalchemy import Column, BigInteger, Index, Text, TIMESTAMP, func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -11,7 +11,10 @@ class Author(Base):
     """
 
     __tablename__ = "authors"
-    __table_args__ = {"schema": "public"}
+    __table_args__ = (
+        Index("ix_authors_book_count", "book_count", "id"),
+        {"schema": "public"},
+    )
 
     id = Column(BigInteger, primary_key=True, index=True)
     name = Column(Text, nullable=False, unique=True, index=True)
@@ -20,6 +23,8 @@ class Author(Base):
         server_default=func.now(),
         nullable=False,
     )
+    # Number of books, kept current by the repo_books write paths.
+    book_count = Column(BigInteger, server_default="0", nullable=False)
 
     books = relationship(
         "Book",
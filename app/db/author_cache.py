@@ -0,0 +1,69 @@
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.config import settings
+
+
+class AuthorIdCache:
+    """
+    Bounded LRU map of author name (case-insensitive) to author id, consulted
+    by the get-or-create every book write performs.
+
+    Only committed ids are served. Ids found or created inside a transaction
+    are staged on the session and published by its ``after_commit`` hook
+    (see ``app.db.session``), or dropped on rollback.
+
+    Authors can be renamed outside the app (``authors_sync_book_sort``
+    keeps ``books.author_sort`` in step), possibly by another worker, so a
+    served id is only a hint: the write using it re-checks ``lower(name)``
+    in the same statement and calls :meth:`forget` when the name no longer
+    matches (see ``app.db.repo_books``). Call :meth:`clear` after deleting
+    authors out of band.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._ids: OrderedDict[str, int] = OrderedDict()
+
+    @staticmethod
+    def _key(name: str) -> str:
+        return name.strip().lower()
+
+    def get(self, name: str) -> Optional[int]:
+        key = self._key(name)
+        author_id = self._ids.get(key)
+        if author_id is not None:
+            self._ids.move_to_end(key)
+        return author_id
+
+    def put(self, name: str, author_id: int) -> None:
+        if self.max_size <= 0:
+            return
+        key = self._key(name)
+        self._ids[key] = author_id
+        self._ids.move_to_end(key)
+        while len(self._ids) > self.max_size:
+            self._ids.popitem(last=False)
+
+    def forget(self, name: str) -> None:
+        self._ids.pop(self._key(name), None)
+
+    def stage(self, session, name: str, author_id: int) -> None:
+        """Remember an id seen in ``session``'s open transaction."""
+        session.info.setdefault("author_ids", {})[name] = author_id
+
+    def publish(self, session) -> None:
+        for name, author_id in session.info.pop("author_ids", {}).items():
+            self.put(name, author_id)
+
+    def discard(self, session) -> None:
+        session.info.pop("author_ids", None)
+
+    def clear(self) -> None:
+        self._ids.clear()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+author_ids = AuthorIdCache(max_size=settings.AUTHOR_CACHE_SIZE)
@@ -0,0 +1,217 @@
+import asyncio
+import logging
+import secrets
+from collections import deque
+from contextlib import suppress
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.constants import BOOK_EVENTS_CHANNEL
+from app.core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+OPS = ("create", "update", "delete")
+HEARTBEAT = b": ping\n\n"
+# Reconnect delay EventSource clients are told to use.
+RETRY_MS = 2000
+
+dropped_subscribers = REGISTRY.counter(
+    "book_events_dropped_subscribers_total",
+    "Event stream subscribers disconnected for falling too far behind.",
+)
+
+
+def asyncpg_dsn(url: str) -> str:
+    """``url`` as a plain ``postgresql://`` DSN asyncpg accepts."""
+    return (
+        make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+    )
+
+
+class Subscriber:
+    __slots__ = ("queue", "dropped")
+
+    def __init__(self, size: int):
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(size)
+        self.dropped = False
+
+
+class BookEvents:
+    """
+    Fans committed book writes out to Server-Sent Events subscribers.
+
+    The ``repo_books`` write paths NOTIFY ``book_events`` in the statement
+    that makes the change, so only committed writes are delivered, in commit
+    order. Each worker LISTENs on one dedicated connection, opened outside
+    the pool on the first subscription, and fans every event out to its
+    subscribers, encoded once.
+
+    Event ids are ``<stream>:<seq>``, with a new random ``stream`` per
+    listener connection since notifications sent while it was down are lost.
+    The last ``replay_size`` events are kept for clients that reconnect with
+    ``Last-Event-ID``; an id from another stream, or older than the buffer,
+    gets a ``reset`` event instead, telling the client to reload. A
+    subscriber more than ``queue_size`` events behind is dropped (its stream
+    ends and it reconnects) instead of being buffered for.
+    """
+
+    def __init__(
+        self, dsn: str, *, replay_size: int, queue_size: int, heartbeat: float
+    ):
+        self.dsn = dsn
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.stream_id = secrets.token_hex(4)
+        self.seq = 0
+        self.replay: deque[tuple[int, bytes]] = deque(maxlen=replay_size)
+        self.subscribers: set[Subscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+
+    async def start(self, timeout: float = 5.0) -> bool:
+        """Start the listener if it is not running; True once it is listening."""
+        if self._task is None or self._task.done():
+            self._ready = asyncio.Event()
+            self._task = asyncio.create_task(self._listen())
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        return self._ready.is_set()
+
+    async def close(self) -> None:
+        """Stop the listener and end every subscriber's stream."""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        for sub in self.subscribers:
+            sub.dropped = True
+        self.subscribers.clear()
+
+    async def _listen(self) -> None:
+        import asyncpg  # deferred: keeps it off the cold-start path
+
+        delay = 1.0
+        while True:
+            try:
+                conn = await asyncpg.connect(self.dsn)
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as exc:
+                logger.warning(
+                    "Event listener cannot connect (%s); retrying in %.0fs", exc, delay
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+            delay = 1.0
+            try:
+                await conn.add_listener(BOOK_EVENTS_CHANNEL, self._on_notify)
+                self._new_stream()
+                self._ready.set()
+                # The ping notices a dead connection even when no writes happen.
+                while True:
+                    await asyncio.sleep(self.heartbeat)
+                    await conn.fetchval("SELECT 1")
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+                logger.warning("Event listener connection lost: %s", exc)
+            finally:
+                self._ready.clear()
+                conn.terminate()
+
+    def _new_stream(self) -> None:
+        """Start a new id sequence; subscribers may have missed events."""
+        self.stream_id, self.seq = secrets.token_hex(4), 0
+        self.replay.clear()
+        reset = self._reset()
+        for sub in list(self.subscribers):
+            self._offer(sub, reset)
+
+    def _reset(self) -> bytes:
+        return f"id: {self.stream_id}:{self.seq}\nevent: reset\ndata: {{}}\n\n".encode()
+
+    def _on_notify(self, conn, pid, channel, payload: str) -> None:
+        op, _, book_id = payload.partition(":")
+        if op not in OPS or not book_id.isdigit():
+            logger.warning("Ignoring malformed book event %r", payload)
+            return
+        self.publish(op, int(book_id))
+
+    def publish(self, op: str, book_id: int) -> None:
+        """Number, buffer and fan out one event."""
+        self.seq += 1
+        message = (
+            f"id: {self.stream_id}:{self.seq}\nevent: {op}\n"
+            f'data: {{"op": "{op}", "id": {book_id}}}\n\n'
+        ).encode()
+        self.replay.append((self.seq, message))
+        for sub in list(self.subscribers):
+            self._offer(sub, message)
+
+    def _offer(self, sub: Subscriber, message: bytes) -> None:
+        try:
+            sub.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            sub.dropped = True
+            self.subscribers.discard(sub)
+            dropped_subscribers.inc()
+
+    def subscribe(
+        self, last_event_id: Optional[str] = None
+    ) -> tuple[Subscriber, list[bytes]]:
+        """
+        Register a subscriber; also return the events to send first: those
+        after ``last_event_id``, or a ``reset`` if they are no longer known.
+        """
+        sub = Subscriber(self.queue_size)
+        self.subscribers.add(sub)
+        return sub, self._since(last_event_id)
+
+    def _since(self, last_event_id: Optional[str]) -> list[bytes]:
+        if not last_event_id:
+            return []
+        stream, _, seq = last_event_id.partition(":")
+        if stream == self.stream_id and seq.isdigit():
+            seq = int(seq)
+            first = self.replay[0][0] if self.replay else self.seq + 1
+            if first - 1 <= seq <= self.seq:
+                return [message for n, message in self.replay if n > seq]
+        return [self._reset()]
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        self.subscribers.discard(sub)
+
+    async def stream(
+        self, sub: Subscriber, replay: list[bytes]
+    ) -> AsyncIterator[bytes]:
+        """
+        The SSE body for ``sub``: replayed events, then live ones, with a
+        comment line as heartbeat whenever ``heartbeat`` seconds pass quietly.
+        """
+        try:
+            yield f"retry: {RETRY_MS}\n\n".encode()
+            for message in replay:
+                yield message
+            while not sub.dropped:
+                try:
+                    message = await asyncio.wait_for(sub.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    message = HEARTBEAT
+                yield message
+        finally:
+            self.unsubscribe(sub)
+
+
+book_events = BookEvents(
+    asyncpg_dsn(settings.DATABASE_URL),
+    replay_size=settings.EVENTS_REPLAY_SIZE,
+    queue_size=settings.EVENTS_QUEUE_SIZE,
+    heartbeat=settings.EVENTS_HEARTBEAT,
+)
+
+REGISTRY.gauge(
+    "book_events_subscribers",
+    "Open book event streams in this worker.",
+    callback=lambda: {(): len(book_events.subscribers)},
+)
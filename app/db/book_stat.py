@@ -0,0 +1,26 @@
+from sqlalchemy import Column, BigInteger, Index, Text
+from app.db.base import Base
+
+
+class BookStat(Base):
+    """
+    ORM model for catalog summary counters.
+
+    One row per ``(kind, key)``: ``total/books``, ``total/authors``,
+    ``genre/<genre>``, ``year/<year>`` and ``decade/<decade>``. Per-author
+    counts are ``authors.book_count``. Maintained by the ``repo_books``
+    write paths; see ``app.db.repo_stats``.
+    """
+
+    __tablename__ = "book_stats"
+    __table_args__ = (
+        Index("ix_book_stats_kind_count", "kind", "count"),
+        {"schema": "public"},
+    )
+
+    kind = Column(Text, primary_key=True)
+    key = Column(Text, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<BookStat({self.kind}/{self.key}={self.count})>"
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, CHAR, Integer, TIMESTAMP, func
+from sqlalchemy.dialects.postgresql import JSONB
+from app.db.base import Base
+
+
+class ImportChunk(Base):
+    """
+    ORM model for content already imported.
+
+    One row per SHA-256 digest of an imported chunk of rows, so a file sent
+    again skips the chunks it shares with an earlier one. A whole file's
+    digest also gets a row, with the response of its import in ``result``.
+    """
+
+    __tablename__ = "import_chunks"
+    __table_args__ = {"schema": "public"}
+
+    digest = Column(CHAR(64), primary_key=True)
+    rows = Column(Integer, nullable=False)
+    result = Column(JSONB, nullable=True)
+    imported_at = Column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+    def __repr__(self) -> str:
+        return f"<ImportChunk({self.digest[:12]}, rows={self.rows})>"
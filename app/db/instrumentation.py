@@ -0,0 +1,208 @@
+import functools
+import logging
+import random
+import re
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.metrics import db_queries, db_query_duration
+from app.core.request_timing import record_db_time
+from app.core.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Name of the repository function currently talking to the database.
+current_db_function: ContextVar[str] = ContextVar("current_db_function", default="")
+
+
+def db_function(fn):
+    """
+    Tag every statement issued while ``fn`` runs with its qualified name.
+
+    The name is ``<module>.<function>``, e.g. ``repo_books.list_books``. It
+    labels the DB metrics recorded by the engine event hooks below and names
+    the span wrapping the call in sampled traces.
+    """
+    name = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        token = current_db_function.set(name)
+        try:
+            with tracer.span(name):
+                return await fn(*args, **kwargs)
+        finally:
+            current_db_function.reset(token)
+
+    return wrapper
+
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+_WRITE_KEYWORDS = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+_CALL = re.compile(r"([A-Za-z_][\w.]*)\s*\(")
+# Keywords followed by "(" and built-in functions without side effects. A read
+# calling anything else (e.g. ``SELECT public.books_ensure_partitions(...)``)
+# may write, so its plan is captured without executing it.
+_PURE_CALLS = frozenset(
+    """
+    all and any array as avg between cast coalesce concat concat_ws count
+    exists filter from greatest in join least length lower max min not
+    nullif on or over row_number select sum trim unnest upper using values
+    where with
+    """.split()
+)
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Collapse whitespace and replace inline literals with ``?``.
+
+    Bound parameters already appear as ``$1``-style placeholders, so two calls
+    of the same query with different filter values normalize identically.
+    """
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def params_shape(parameters, executemany: bool) -> str:
+    """
+    Describe bound parameters by type only, never by value.
+    """
+    if executemany:
+        return f"executemany[{len(parameters)}]"
+    if not parameters:
+        return "()"
+    return "(" + ", ".join(type(p).__name__ for p in parameters) + ")"
+
+
+def _is_read_only(statement: str) -> bool:
+    head = statement.lstrip()[:6].upper()
+    if head == "SELECT":
+        return True
+    return head.startswith("WITH") and not _WRITE_KEYWORDS.search(statement)
+
+
+def _calls_only_pure_functions(statement: str) -> bool:
+    calls = _CALL.findall(_STRING_LITERAL.sub("?", statement))
+    return all(name.lower() in _PURE_CALLS for name in calls)
+
+
+class SlowQueryLog:
+    """
+    Log statements slower than ``threshold_ms`` and keep the latest in memory.
+
+    For a ``sample_rate`` fraction of slow read-only statements the plan is
+    captured with ``EXPLAIN (ANALYZE, BUFFERS)``. The plan query re-runs the
+    statement on the same connection inside a savepoint that is always rolled
+    back, so a capture neither aborts nor adds to the caller's transaction.
+    Reads calling functions other than side-effect-free built-ins get a plain
+    ``EXPLAIN``, which does not execute them.
+    """
+
+    def __init__(self, threshold_ms: float, sample_rate: float, size: int):
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.entries: deque = deque(maxlen=size)
+
+    def record(
+        self, conn, statement, parameters, executemany, elapsed: float, function: str
+    ) -> None:
+        duration_ms = elapsed * 1000
+        if duration_ms < self.threshold_ms:
+            return
+        sql = normalize_sql(statement)
+        shape = params_shape(parameters, executemany)
+        logger.warning(
+            "Slow query %.1fms in %s: %s params=%s", duration_ms, function, sql, shape
+        )
+        plan = None
+        if (
+            not executemany
+            and self.sample_rate > 0
+            and random.random() < self.sample_rate
+            and _is_read_only(statement)
+        ):
+            plan = self._explain(
+                conn, statement, parameters, _calls_only_pure_functions(statement)
+            )
+        self.entries.append(
+            {
+                "at": datetime.now(timezone.utc).isoformat(),
+                "function": function,
+                "duration_ms": round(duration_ms, 3),
+                "sql": sql,
+                "params": shape,
+                "plan": plan,
+            }
+        )
+
+    @staticmethod
+    def _explain(conn, statement, parameters, analyze: bool) -> Optional[str]:
+        cursor = conn.connection.dbapi_connection.cursor()
+        options = "(ANALYZE, BUFFERS) " if analyze else ""
+        try:
+            cursor.execute("SAVEPOINT slow_query_explain")
+            try:
+                cursor.execute(f"EXPLAIN {options}{statement}", parameters or ())
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+            except Exception:
+                logger.exception("Could not capture plan for slow query")
+                plan = None
+            # Undo whatever the re-run did, not just a failed one.
+            cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+            return plan
+        finally:
+            cursor.close()
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.DB_SLOW_QUERY_MS,
+    sample_rate=settings.DB_SLOW_QUERY_EXPLAIN_SAMPLE,
+    size=settings.DB_SLOW_QUERY_BUFFER,
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start = time.perf_counter()
+    context._span = tracer.start_span("db.query")
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_start
+    function = current_db_function.get() or "other"
+    db_queries.inc(function)
+    db_query_duration.observe(elapsed, function)
+    record_db_time(elapsed)
+    slow_query_log.record(conn, statement, parameters, executemany, elapsed, function)
+    span = context._span
+    if span is not None:
+        span.set_attribute("db.system", "postgresql")
+        span.set_attribute("db.statement", normalize_sql(statement))
+        span.set_attribute("db.rows", cursor.rowcount)
+        span.set_attribute("code.function", function)
+        span.end()
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    context = exception_context.execution_context
+    span = getattr(context, "_span", None)
+    if span is not None:
+        span.status = "ERROR"
+        span.set_attribute(
+            "error.type", type(exception_context.original_exception).__name__
+        )
+        span.end()
@@ -0,0 +1,36 @@
+import datetime
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.instrumentation import db_function
+
+
+@db_function
+async def ensure_book_partitions(
+    session: AsyncSession, until_year: Optional[int] = None
+) -> Optional[int]:
+    """
+    Create any missing decade partitions of ``books`` up to ``until_year``
+    (default: next year), moving their rows out of ``books_default``.
+
+    Returns the number of partitions created, or None when ``books`` is not
+    partitioned (migration 0005 not applied, or a schema built by
+    ``create_all``).
+    """
+    partitioned = await session.execute(
+        text(
+            "SELECT c.relkind = 'p' FROM pg_class c "
+            "WHERE c.oid = to_regclass('public.books')"
+        )
+    )
+    if not partitioned.scalar():
+        return None
+    if until_year is None:
+        until_year = datetime.date.today().year + 1
+    result = await session.execute(
+        text("SELECT public.books_ensure_partitions(:until)"), {"until": until_year}
+    )
+    await session.commit()
+    return result.scalar_one()
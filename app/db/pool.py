@@ -0,0 +1,216 @@
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """
+    Checkout telemetry for a connection pool.
+
+    Tracks how long callers waited for a connection, how many checkouts
+    timed out, and the peak number of connections in use.
+    """
+
+    def __init__(self):
+        self.wait = Histogram()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.peak_in_use = 0
+
+    def record_checkout(self, waited: float, in_use: int) -> None:
+        self.wait.observe(waited)
+        self.checkouts += 1
+        if in_use > self.peak_in_use:
+            self.peak_in_use = in_use
+
+    def record_timeout(self) -> None:
+        self.timeouts += 1
+
+
+class AdaptivePoolSizer:
+    """
+    Grow or shrink a pool's overflow capacity from observed checkout waits.
+
+    The pool keeps ``pool_size`` persistent connections; the sizer only moves
+    ``max_overflow`` so that total capacity stays within
+    ``[min_size, max_size]``. Every ``interval`` seconds it looks at the
+    checkouts seen since the last decision:
+
+    - if a timeout happened or more than 5% of checkouts waited longer than
+      ``target_wait``, capacity grows by a quarter (at least one connection);
+    - if nobody waited and peak usage stayed under half of capacity,
+      capacity shrinks by one connection.
+
+    ``max_size`` should already be capped by the per-worker share of the
+    database-wide connection budget (see :func:`worker_connection_cap`).
+    """
+
+    SLOW_FRACTION = 0.05
+
+    def __init__(
+        self,
+        *,
+        min_size: int,
+        max_size: int,
+        target_wait: float,
+        interval: float,
+    ):
+        # Never raise the cap: see clamp_pool_limits for conflicting config.
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.target_wait = target_wait
+        self.interval = interval
+        self._window_start = time.monotonic()
+        self._window_checkouts = 0
+        self._window_slow = 0
+        self._window_timeouts = 0
+        self._window_peak = 0
+
+    def observe(self, pool: "InstrumentedPool", waited: Optional[float]) -> None:
+        """
+        Feed one checkout (``waited`` in seconds) or timeout (``None``).
+        """
+        if waited is None:
+            self._window_timeouts += 1
+        else:
+            self._window_checkouts += 1
+            if waited > self.target_wait:
+                self._window_slow += 1
+        in_use = pool.checkedout()
+        if in_use > self._window_peak:
+            self._window_peak = in_use
+
+        now = time.monotonic()
+        if now - self._window_start >= self.interval:
+            self.adjust(pool)
+            self._window_start = now
+            self._window_checkouts = 0
+            self._window_slow = 0
+            self._window_timeouts = 0
+            self._window_peak = 0
+
+    def adjust(self, pool: "InstrumentedPool") -> int:
+        """
+        Apply one sizing decision and return the new total capacity.
+        """
+        capacity = pool.size() + pool.max_overflow
+        slow = self._window_checkouts and (
+            self._window_slow / self._window_checkouts > self.SLOW_FRACTION
+        )
+        if self._window_timeouts or slow:
+            target = min(self.max_size, capacity + max(1, capacity // 4))
+        elif not self._window_slow and self._window_peak < capacity // 2:
+            target = max(self.min_size, capacity - 1)
+        else:
+            target = capacity
+        target = max(target, pool.size())
+        if target != capacity:
+            logger.info("Resizing DB pool capacity from %d to %d", capacity, target)
+            pool.max_overflow = target - pool.size()
+        return target
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    ``AsyncAdaptedQueuePool`` that records checkout telemetry.
+
+    Checkout time covers waiting on the queue, opening overflow connections
+    and the pre-ping, i.e. everything a request waits for before it can run
+    its first statement. An optional :class:`AdaptivePoolSizer` is fed every
+    checkout.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+        self.sizer: Optional[AdaptivePoolSizer] = None
+
+    @property
+    def max_overflow(self) -> int:
+        return self._max_overflow
+
+    @max_overflow.setter
+    def max_overflow(self, value: int) -> None:
+        self._max_overflow = value
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            logger.warning(
+                "DB pool checkout timed out after %.1fs (size=%d, overflow=%d)",
+                time.perf_counter() - start,
+                self.size(),
+                self.overflow(),
+            )
+            if self.sizer is not None:
+                self.sizer.observe(self, None)
+            raise
+        waited = time.perf_counter() - start
+        self.stats.record_checkout(waited, self.checkedout())
+        if self.sizer is not None:
+            self.sizer.observe(self, waited)
+        return conn
+
+    def recreate(self) -> "InstrumentedPool":
+        # engine.dispose() swaps in a fresh pool; keep telemetry and sizing.
+        pool = super().recreate()
+        pool.stats = self.stats
+        pool.sizer = self.sizer
+        return pool
+
+    def snapshot(self) -> dict:
+        """
+        Return current gauges and counters for this pool.
+        """
+        wait = self.stats.wait
+        return {
+            "size": self.size(),
+            "max_overflow": self.max_overflow,
+            "in_use": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "peak_in_use": self.stats.peak_in_use,
+            "checkouts": self.stats.checkouts,
+            "timeouts": self.stats.timeouts,
+            "wait_p50": wait.quantile(0.5),
+            "wait_p95": wait.quantile(0.95),
+            "wait_p99": wait.quantile(0.99),
+            "wait": wait.snapshot(),
+        }
+
+
+def worker_connection_cap(budget: int, workers: int, max_size: int) -> int:
+    """
+    Per-worker connection ceiling from a database-wide connection budget.
+    """
+    return max(1, min(max_size, budget // max(workers, 1)))
+
+
+def clamp_pool_limits(pool_size: int, max_overflow: int, cap: int) -> tuple[int, int]:
+    """
+    Fit ``pool_size`` and the initial ``max_overflow`` within ``cap``.
+
+    A pool configured larger than the per-worker cap would overrun the
+    database-wide connection budget, so it is shrunk with a warning.
+    """
+    if pool_size + max_overflow <= cap:
+        return pool_size, max_overflow
+    logger.warning(
+        "DB_POOL_SIZE=%d plus DB_MAX_OVERFLOW=%d exceed the per-worker "
+        "connection cap of %d; clamping the pool to fit",
+        pool_size,
+        max_overflow,
+        cap,
+    )
+    pool_size = min(pool_size, cap)
+    return pool_size, cap - pool_size
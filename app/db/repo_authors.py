@@ -0,0 +1,107 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from app.db.instrumentation import db_function
+
+# Keyset columns (and their types) per sort field. Names are unique, so they
+# need no tiebreaker.
+_SORT_KEYS = {
+    "name": (("name", str),),
+    "book_count": (("book_count", int), ("id", int)),
+}
+
+
+@db_function
+async def list_authors(
+    session: AsyncSession,
+    *,
+    sort_by: str,
+    sort_order: str,
+    limit: int,
+    after: Optional[list] = None,
+) -> tuple[list[dict], Optional[list]]:
+    """
+    List authors a page at a time with keyset pagination.
+
+    Every page is one index range scan (``authors.name`` or
+    ``ix_authors_book_count``, backwards for DESC), however deep it is.
+
+    Args:
+        session (AsyncSession): Active database session.
+        sort_by (str): "name" or "book_count".
+        sort_order (str): "asc" or "desc".
+        limit (int): Number of authors per page.
+        after (list, optional): Sort key of the previous page's last author,
+            as returned with that page.
+
+    Returns:
+        tuple: the authors, and the sort key to pass as ``after`` for the next
+        page (None on the last page).
+
+    Raises:
+        ValueError: ``after`` does not match the sort key of ``sort_by``.
+    """
+    typed_keys = _SORT_KEYS.get(sort_by, _SORT_KEYS["name"])
+    keys = [key for key, _ in typed_keys]
+    if after is not None and (
+        len(after) != len(keys)
+        or not all(type(value) is kind for value, (_, kind) in zip(after, typed_keys))
+    ):
+        raise ValueError("cursor does not match the sort order")
+    desc = sort_order.lower() == "desc"
+    columns = ", ".join(f"a.{key}" for key in keys)
+    params = {"limit": limit + 1}
+    where = ""
+    if after is not None:
+        bounds = ", ".join(f":k{i}" for i in range(len(keys)))
+        where = f"WHERE ({columns}) {'<' if desc else '>'} ({bounds})"
+        params.update({f"k{i}": value for i, value in enumerate(after)})
+    direction = "DESC" if desc else "ASC"
+    order = ", ".join(f"a.{key} {direction}" for key in keys)
+
+    q = text(
+        f"""
+        SELECT a.id, a.name, a.book_count, a.created_at
+        FROM authors a
+        {where}
+        ORDER BY {order}
+        LIMIT :limit
+        """
+    )
+    rows = [dict(r) for r in (await session.execute(q, params)).mappings().all()]
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, [rows[-1][key] for key in keys]
+
+
+@db_function
+async def get_author(
+    session: AsyncSession, author_id: int, books_limit: int
+) -> Optional[dict]:
+    """
+    Fetch an author with up to ``books_limit`` of their books, by title.
+
+    Args:
+        session (AsyncSession): Active database session.
+        author_id (int): ID of the author.
+        books_limit (int): Maximum number of books to include.
+
+    Returns:
+        dict | None: Author record with a ``books`` list, or None if not found.
+    """
+    q = text("SELECT id, name, book_count, created_at FROM authors WHERE id = :id")
+    row = (await session.execute(q, {"id": author_id})).mappings().first()
+    if row is None:
+        return None
+    q_books = text(
+        """
+        SELECT id, title, genre, published_year
+        FROM books
+        WHERE author_id = :id
+        ORDER BY title, id
+        LIMIT :limit
+        """
+    )
+    books = await session.execute(q_books, {"id": author_id, "limit": books_limit})
+    return {**row, "books": [dict(b) for b in books.mappings().all()]}
@@ -1,13 +1,58 @@
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from app.core.constants import ALLOWED_SORT_FIELDS
+from app.core.config import settings
+from app.core.constants import (
+    ALLOWED_SORT_FIELDS,
+    BOOK_EVENTS_CHANNEL,
+    BOOK_FIELDS,
+    FACET_LIMIT,
+    GENRES,
+)
+from app.core.singleflight import book_reads
+from app.db.author_cache import author_ids
+from app.db.instrumentation import db_function
+from app.db.repo_stats import apply_delta, book_delta
+from app.db.suggestions import suggestions
+
+_FIELD_COLUMNS = {
+    "id": "b.id",
+    "title": "b.title",
+    "author": "b.author_sort AS author",
+    "genre": "b.genre",
+    "published_year": "b.published_year",
+    "created_at": "b.created_at::text",
+    "updated_at": "b.updated_at::text",
+}
+_AUTHOR_JOIN = "JOIN authors a ON a.id = b.author_id"
+
+
+def _fields(fields) -> tuple:
+    """Requested fields in response order, ignoring duplicates."""
+    return tuple(f for f in BOOK_FIELDS if f in fields)
+
+
+def _select_list(fields: tuple) -> str:
+    return ", ".join(_FIELD_COLUMNS[f] for f in fields)
+
+
+def _notify(op: str) -> str:
+    """
+    ``FROM`` item sending the event stream ``op`` for each row of the ``w``
+    CTE. Postgres delivers notifications only when the transaction commits.
+    """
+    if not settings.EVENTS_ENABLED:
+        return ""
+    return f", pg_notify('{BOOK_EVENTS_CHANNEL}', '{op}:' || w.id)"
 
 
 def _sort_clause(sort_by: str, sort_order: str) -> str:
     """
     Build a safe ORDER BY clause for book queries.
 
+    Ties are broken by ascending id in both directions; each order matches
+    a (genre, sort key, id) or (genre, sort key DESC, id) index.
+
     Args:
         sort_by (str): Field to sort by. Allowed: "title", "author", "published_year".
         sort_order (str): Sort direction ("asc" or "desc").
@@ -18,37 +63,64 @@ def _sort_clause(sort_by: str, sort_order: str) -> str:
     sb = sort_by if sort_by in ALLOWED_SORT_FIELDS else "title"
     so = "DESC" if sort_order.lower() == "desc" else "ASC"
     if sb == "author":
-        return f"ORDER BY a.name {so}, b.id ASC"
+        return f"ORDER BY b.author_sort {so}, b.id ASC"
     if sb == "published_year":
         return f"ORDER BY b.published_year {so}, b.id ASC"
     return f"ORDER BY b.title {so}, b.id ASC"
 
 
-async def _get_or_create_author(session: AsyncSession, name: str) -> int:
+# Guards a write using a cached author id: the author may have been renamed
+# since it was cached, in which case the write matches no rows.
+_AUTHOR_STILL_NAMED = (
+    "SELECT 1 FROM authors WHERE id = :author_id AND lower(name) = lower(:author_name)"
+)
+
+
+# Look the author up by name, inserting it when missing, in one statement.
+_GET_OR_CREATE_AUTHOR = text(
+    """
+    WITH found AS (
+        SELECT id FROM authors WHERE lower(name) = lower(:n) LIMIT 1
+    ), created AS (
+        INSERT INTO authors(name)
+        SELECT :n WHERE NOT EXISTS (SELECT 1 FROM found)
+        RETURNING id
+    )
+    SELECT id, false AS created FROM found
+    UNION ALL
+    SELECT id, true FROM created
+    """
+)
+
+
+async def _get_or_create_author(
+    session: AsyncSession, name: str, *, use_cache: bool = True
+) -> tuple[int, bool]:
     """
     Get an author's ID by name or create a new author if not exists.
 
+    A cached ID is returned without a query; writes using it must check
+    :data:`_AUTHOR_STILL_NAMED` and, when it fails, retry with
+    ``use_cache=False``. A lookup is a single statement, which keeps that
+    retry within the endpoints' query budgets.
+
     Args:
         session (AsyncSession): Active database session.
         name (str): Author name.
+        use_cache (bool): Whether a cached ID may be returned.
 
     Returns:
-        int: ID of the author.
+        tuple[int, bool]: ID of the author and whether it was created.
     """
-    res = await session.execute(
-        text("SELECT id FROM authors WHERE lower(name)=lower(:n)"),
-        {"n": name.strip()},
-    )
-    row = res.first()
-    if row:
-        return row.id
-    res = await session.execute(
-        text("INSERT INTO authors(name) VALUES(:n) RETURNING id"),
-        {"n": name.strip()},
-    )
-    return res.scalar_one()
+    cached = author_ids.get(name) if use_cache else None
+    if cached is not None:
+        return cached, False
+    row = (await session.execute(_GET_OR_CREATE_AUTHOR, {"n": name.strip()})).one()
+    author_ids.stage(session, name, row.id)
+    return row.id, row.created
 
 
+@db_function
 async def create_book(
     session: AsyncSession,
     *,
@@ -70,53 +142,66 @@ async def create_book(
     Returns:
         dict: Created book record with fields.
     """
-    author_id = await _get_or_create_author(session, author)
-
     q2 = text(
-        """
-        INSERT INTO books(title, author_id, genre, published_year)
-        VALUES (:title, :author_id, :genre, :year)
-        RETURNING id, title, :author as author, genre, published_year,
-                  created_at::text, updated_at::text
+        f"""
+        WITH w AS (
+            INSERT INTO books(title, author_id, genre, published_year)
+            SELECT :title, CAST(:author_id AS bigint), CAST(:genre AS book_genre),
+                   CAST(:year AS integer)
+            WHERE EXISTS ({_AUTHOR_STILL_NAMED})
+            RETURNING id, title, :author as author, genre, published_year,
+                      created_at::text, updated_at::text
+        )
+        SELECT w.* FROM w{_notify("create")}
         """
     )
-    row = (
-        (
-            await session.execute(
-                q2,
-                {
-                    "title": title,
-                    "author_id": author_id,
-                    "genre": genre,
-                    "year": published_year,
-                    "author": author,
-                },
-            )
+    params = {
+        "title": title,
+        "genre": genre,
+        "year": published_year,
+        "author": author,
+        "author_name": author.strip(),
+    }
+    author_id, new_author = await _get_or_create_author(session, author)
+    row = (await session.execute(q2, {**params, "author_id": author_id})).first()
+    if row is None:
+        # The cached author was renamed; look the name up again.
+        author_ids.forget(author)
+        author_id, new_author = await _get_or_create_author(
+            session, author, use_cache=False
         )
-        .mappings()
-        .one()
-    )
+        row = (await session.execute(q2, {**params, "author_id": author_id})).one()
+    row = row._mapping
+    delta = book_delta(genre, published_year, author_id, 1)
+    delta["total", "authors"] += new_author
+    await apply_delta(session, delta)
+    suggestions.stage(session, "author", author, 1)
+    suggestions.stage(session, "title", title, 1)
     await session.commit()
     return dict(row)
 
 
-async def get_book_by_id(session: AsyncSession, book_id: int) -> Optional[dict]:
+@db_function
+@book_reads.coalesce()
+async def get_book_by_id(
+    session: AsyncSession, book_id: int, fields: tuple = BOOK_FIELDS
+) -> Optional[dict]:
     """
     Fetch a book by its ID.
 
     Args:
         session (AsyncSession): Active database session.
         book_id (int): ID of the book.
+        fields (tuple, optional): Fields to return.
 
     Returns:
         dict | None: Book record if found, otherwise None.
     """
+    fields = _fields(fields)
     q = text(
-        """
-        SELECT b.id, b.title, a.name AS author, b.genre, b.published_year,
-               b.created_at::text, b.updated_at::text
+        f"""
+        SELECT {_select_list(fields)}
         FROM books b
-        JOIN authors a ON a.id = b.author_id
         WHERE b.id = :id
         """
     )
@@ -125,6 +210,36 @@ async def get_book_by_id(session: AsyncSession, book_id: int) -> Optional[dict]:
     return dict(row) if row else None
 
 
+@db_function
+@book_reads.coalesce()
+async def get_books_by_ids(
+    session: AsyncSession, ids: tuple, fields: tuple = BOOK_FIELDS
+) -> list[dict]:
+    """
+    Fetch several books by ID in one statement.
+
+    Args:
+        session (AsyncSession): Active database session.
+        ids (tuple): Book IDs, without duplicates.
+        fields (tuple, optional): Fields to return, as for get_book_by_id.
+
+    Returns:
+        list[dict]: Books found, in the order of ``ids``; unknown IDs are skipped.
+    """
+    fields = _fields(fields)
+    q = text(
+        f"""
+        SELECT {_select_list(fields)}
+        FROM unnest(CAST(:ids AS bigint[])) WITH ORDINALITY AS r(id, n)
+        JOIN books b ON b.id = r.id
+        ORDER BY r.n
+        """
+    )
+    res = await session.execute(q, {"ids": list(ids)})
+    return [dict(row) for row in res.mappings().all()]
+
+
+@db_function
 async def delete_book(session: AsyncSession, book_id: int) -> bool:
     """
     Delete a book by ID.
@@ -136,12 +251,28 @@ async def delete_book(session: AsyncSession, book_id: int) -> bool:
     Returns:
         bool: True if deleted, False if not found.
     """
-    q = text("DELETE FROM books WHERE id = :id")
-    res = await session.execute(q, {"id": book_id})
+    q = text(
+        f"""
+        WITH w AS (
+            DELETE FROM books WHERE id = :id
+            RETURNING id, genre, published_year, author_id, title, author_sort
+        )
+        SELECT w.* FROM w{_notify("delete")}
+        """
+    )
+    row = (await session.execute(q, {"id": book_id})).first()
+    if row is None:
+        return False
+    await apply_delta(
+        session, book_delta(row.genre, row.published_year, row.author_id, -1)
+    )
+    suggestions.stage(session, "author", row.author_sort, -1)
+    suggestions.stage(session, "title", row.title, -1)
     await session.commit()
-    return res.rowcount > 0
+    return True
 
 
+@db_function
 async def update_book(
     session: AsyncSession,
     book_id: int,
@@ -165,9 +296,9 @@ async def update_book(
     Returns:
         dict | None: Updated book record, or None if not found.
     """
-    author_id = None
+    author_id, new_author = None, False
     if author is not None:
-        author_id = await _get_or_create_author(session, author)
+        author_id, new_author = await _get_or_create_author(session, author)
 
     sets = []
     params = {"id": book_id}
@@ -177,6 +308,7 @@ async def update_book(
     if author_id is not None:
         sets.append("author_id = :author_id")
         params["author_id"] = author_id
+        params["author_name"] = author.strip()
     if genre is not None:
         sets.append("genre = :genre")
         params["genre"] = genre
@@ -187,22 +319,127 @@ async def update_book(
     if not sets:
         return await get_book_by_id(session, book_id)
 
+    author_check = (
+        f" AND EXISTS ({_AUTHOR_STILL_NAMED})" if author_id is not None else ""
+    )
+    # The locked self-join exposes the pre-update row for the stats delta.
     q = text(
         f"""
-        UPDATE books
-        SET {", ".join(sets)}, updated_at = NOW()
-        WHERE id = :id
-        RETURNING id
+        WITH w AS (
+            UPDATE books b
+            SET {", ".join(sets)}, updated_at = NOW()
+            FROM (
+                SELECT id, genre, published_year, author_id, title, author_sort
+                FROM books WHERE id = :id FOR UPDATE
+            ) old
+            WHERE b.id = old.id{author_check}
+            RETURNING old.genre AS old_genre, old.published_year AS old_year,
+                      old.author_id AS old_author_id, old.title AS old_title,
+                      old.author_sort AS old_author, b.id,
+                      b.genre, b.published_year, b.author_id, b.title, b.author_sort
+        )
+        SELECT w.* FROM w{_notify("update")}
         """
     )
-    res = await session.execute(q, params)
-    if res.rowcount == 0:
+    row = (await session.execute(q, params)).first()
+    if row is None and author_id is not None:
+        # Missing book, or the cached author was renamed; look the name up again.
+        author_ids.forget(author)
+        author_id, new_author = await _get_or_create_author(
+            session, author, use_cache=False
+        )
+        params["author_id"] = author_id
+        row = (await session.execute(q, params)).first()
+    if row is None:
         await session.rollback()
         return None
+    delta = book_delta(row.old_genre, row.old_year, row.old_author_id, -1)
+    delta.update(book_delta(row.genre, row.published_year, row.author_id, 1))
+    delta["total", "authors"] += new_author
+    await apply_delta(session, delta)
+    for kind, old, new in (
+        ("author", row.old_author, row.author_sort),
+        ("title", row.old_title, row.title),
+    ):
+        if old != new:
+            suggestions.stage(session, kind, old, -1)
+            suggestions.stage(session, kind, new, 1)
     await session.commit()
     return await get_book_by_id(session, book_id)
 
 
+def _list_key(
+    session,
+    *,
+    title,
+    author,
+    genre,
+    year_from,
+    year_to,
+    page,
+    page_size,
+    sort_by,
+    sort_order,
+    facets=(),
+    fields=BOOK_FIELDS,
+) -> tuple:
+    """Normalized arguments of list_books: calls with equal keys run the same SQL."""
+    return (
+        title or None,
+        author or None,
+        genre or None,
+        year_from,
+        year_to,
+        page,
+        page_size,
+        _sort_clause(sort_by, sort_order),
+        tuple(sorted(set(facets))),
+        _fields(fields),
+    )
+
+
+_FACET_EXPRESSIONS = {
+    "genre": "b.genre",
+    "decade": "(b.published_year / 10 * 10)",
+    "author": "a.name",
+}
+
+
+def _facets_query(facets: tuple, where: str, join: str) -> str:
+    """
+    Build one GROUPING SETS statement returning the filtered total and the
+    value counts of each requested facet.
+
+    Rows are ``(facet, value, count)``; the total has facet ``"total"``.
+    Each facet keeps its ``FACET_LIMIT`` most frequent values.
+    """
+    exprs = [_FACET_EXPRESSIONS[f] for f in facets]
+    facet_case = " ".join(
+        f"WHEN GROUPING({e}) = 0 THEN '{f}'" for f, e in zip(facets, exprs)
+    )
+    value_case = " ".join(f"WHEN GROUPING({e}) = 0 THEN {e}::text" for e in exprs)
+    sets = ", ".join(["()"] + [f"({e})" for e in exprs])
+    return f"""
+        SELECT facet, value, count FROM (
+            SELECT CASE {facet_case} ELSE 'total' END AS facet,
+                   CASE {value_case} END AS value,
+                   COUNT(*) AS count,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY CASE {facet_case} ELSE 'total' END
+                       ORDER BY COUNT(*) DESC
+                   ) AS rank
+            FROM books b
+            {join}
+            {where}
+            GROUP BY GROUPING SETS ({sets})
+        ) f
+        WHERE rank <= {FACET_LIMIT}
+        ORDER BY facet, count DESC, value
+    """
+
+
+@db_function
+@book_reads.coalesce(key=_list_key)
 async def list_books(
     session: AsyncSession,
     *,
@@ -215,6 +452,8 @@ async def list_books(
     page_size: int,
     sort_by: str,
     sort_order: str,
+    facets: tuple = (),
+    fields: tuple = BOOK_FIELDS,
 ) -> dict:
     """
     List books with filters, pagination, and sorting.
@@ -230,11 +469,17 @@ async def list_books(
         page_size (int): Number of records per page.
         sort_by (str): Sort field ("title", "author", "published_year").
         sort_order (str): Sort direction ("asc" or "desc").
+        facets (tuple, optional): Facets to count for the current filters
+            ("genre", "decade", "author"). Computed in the statement that
+            would otherwise only count the total.
+        fields (tuple, optional): Fields of each item. Authors are joined only
+            for the statements that filter or facet on them.
 
     Returns:
         dict: {
             "items": list of book dicts,
-            "total": total count
+            "total": total count,
+            "facets": {facet: {value: count}} (only when facets were requested)
         }
     """
     filters = []
@@ -245,9 +490,12 @@ async def list_books(
     if author:
         filters.append("lower(a.name) LIKE lower(:author)")
         params["author"] = f"%{author}%"
-    if genre:
+    if genre in GENRES:
         filters.append("b.genre = :genre")
         params["genre"] = genre
+    elif genre:
+        # Not a book_genre value, so nothing can match.
+        filters.append("FALSE")
     if year_from is not None:
         filters.append("b.published_year >= :yfrom")
         params["yfrom"] = year_from
@@ -257,15 +505,18 @@ async def list_books(
 
     where = ("WHERE " + " AND ".join(filters)) if filters else ""
     order_clause = _sort_clause(sort_by, sort_order)
+    fields = _fields(fields)
+    # books.author_id is a non-null foreign key, so the join never changes
+    # which books match; the author field and sort come from b.author_sort.
+    filter_join = _AUTHOR_JOIN if author else ""
     limit_offset = "LIMIT :limit OFFSET :offset"
     params.update({"limit": page_size, "offset": (page - 1) * page_size})
 
     q_items = text(
         f"""
-        SELECT b.id, b.title, a.name AS author, b.genre, b.published_year,
-               b.created_at::text, b.updated_at::text
+        SELECT {_select_list(fields)}
         FROM books b
-        JOIN authors a ON a.id = b.author_id
+        {filter_join}
         {where}
         {order_clause}
         {limit_offset}
@@ -273,10 +524,25 @@ async def list_books(
     )
     rows = (await session.execute(q_items, params)).mappings().all()
 
+    if facets:
+        facets = tuple(f for f in _FACET_EXPRESSIONS if f in facets)
+        result = {"items": [dict(r) for r in rows], "total": 0}
+        result["facets"] = counts = {f: {} for f in facets}
+        facets_join = _AUTHOR_JOIN if "author" in facets else filter_join
+        q_facets = text(_facets_query(facets, where, facets_join))
+        for facet, value, count in (await session.execute(q_facets, params)).all():
+            if facet == "total":
+                result["total"] = int(count)
+            else:
+                counts[facet][value] = int(count)
+        if "decade" in counts:
+            counts["decade"] = dict(sorted(counts["decade"].items()))
+        return result
+
     q_count = text(
         f"""
         SELECT COUNT(*) FROM books b
-        JOIN authors a ON a.id = b.author_id
+        {filter_join}
         {where}
         """
     )
@@ -0,0 +1,54 @@
+import json
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+
+from app.db.instrumentation import db_function
+
+
+@db_function
+async def get_import_result(
+    session: AsyncSession, digest: str
+) -> Optional[tuple[int, dict]]:
+    """
+    Fetch the row count and response of an earlier import of the file with
+    this digest.
+    """
+    q = text(
+        "SELECT rows, result FROM import_chunks "
+        "WHERE digest = :d AND result IS NOT NULL"
+    )
+    row = (await session.execute(q, {"d": digest})).first()
+    return None if row is None else (row.rows, row.result)
+
+
+@db_function
+async def imported_chunks(session: AsyncSession, digests: list[str]) -> set[str]:
+    """
+    Return the digests, among ``digests``, of chunks already imported.
+    """
+    if not digests:
+        return set()
+    q = text("SELECT digest FROM import_chunks WHERE digest = ANY(:d)")
+    return set((await session.execute(q, {"d": digests})).scalars())
+
+
+@db_function
+async def record_chunk(
+    session: AsyncSession, digest: str, rows: int, result: Optional[dict] = None
+) -> None:
+    """
+    Record an imported chunk, or with ``result`` a whole imported file.
+    """
+    await session.execute(
+        text(
+            """
+            INSERT INTO import_chunks(digest, rows, result)
+            VALUES(:d, :n, CAST(:r AS JSONB))
+            ON CONFLICT (digest) DO NOTHING
+            """
+        ),
+        {"d": digest, "n": rows, "r": None if result is None else json.dumps(result)},
+    )
+    await session.commit()
@@ -0,0 +1,212 @@
+from collections import Counter
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+
+from app.db.instrumentation import db_function
+
+# Aggregates recomputed from the base tables, in book_stats' (kind, key, count) shape.
+# Per-author counts live in authors.book_count only.
+_COMPUTED_STATS = """
+    SELECT 'total' AS kind, 'books' AS key, COUNT(*) AS count FROM books
+    UNION ALL
+    SELECT 'total', 'authors', COUNT(*) FROM authors
+    UNION ALL
+    SELECT 'genre', genre::text, COUNT(*) FROM books GROUP BY genre
+    UNION ALL
+    SELECT 'year', published_year::text, COUNT(*) FROM books GROUP BY published_year
+    UNION ALL
+    SELECT 'decade', (published_year / 10 * 10)::text, COUNT(*)
+    FROM books GROUP BY published_year / 10
+"""
+
+
+def book_delta(genre: str, year: int, author_id: int, sign: int) -> Counter:
+    """
+    Counter changes for adding (``sign=1``) or removing (``sign=-1``) a book.
+
+    The ``author`` entry moves ``authors.book_count``; the others are
+    ``book_stats`` rows.
+    """
+    return Counter(
+        {
+            ("total", "books"): sign,
+            ("genre", genre): sign,
+            ("year", str(year)): sign,
+            ("decade", str(year // 10 * 10)): sign,
+            ("author", str(author_id)): sign,
+        }
+    )
+
+
+async def apply_delta(session: AsyncSession, delta: Counter) -> None:
+    """
+    Add ``delta`` to the summary counters in the caller's transaction.
+
+    Author entries move ``authors.book_count``, in the same statement as the
+    ``book_stats`` upsert. Zero entries are dropped and rows are upserted in
+    key order, so concurrent writers lock them in the same order. Does
+    nothing (and issues no statement) when every entry is zero, e.g. for a
+    title-only update.
+    """
+    rows = sorted((k, n) for k, n in delta.items() if n)
+    if not rows:
+        return
+    authors = sorted((int(key), n) for (kind, key), n in rows if kind == "author")
+    rows = [((kind, key), n) for (kind, key), n in rows if kind != "author"]
+    await session.execute(
+        text(
+            """
+            WITH stats AS (
+                INSERT INTO book_stats(kind, key, count)
+                SELECT * FROM unnest(
+                    CAST(:kinds AS text[]),
+                    CAST(:keys AS text[]),
+                    CAST(:counts AS bigint[])
+                )
+                ON CONFLICT (kind, key)
+                DO UPDATE SET count = book_stats.count + EXCLUDED.count
+            )
+            UPDATE authors a SET book_count = a.book_count + d.n
+            FROM unnest(
+                CAST(:author_ids AS bigint[]), CAST(:author_counts AS bigint[])
+            ) AS d(id, n)
+            WHERE a.id = d.id
+            """
+        ),
+        {
+            "kinds": [kind for (kind, _), _ in rows],
+            "keys": [key for (_, key), _ in rows],
+            "counts": [n for _, n in rows],
+            "author_ids": [author_id for author_id, _ in authors],
+            "author_counts": [n for _, n in authors],
+        },
+    )
+
+
+@db_function
+async def get_stats(session: AsyncSession, top_authors: int = 10) -> dict:
+    """
+    Read catalog statistics from the summary table.
+
+    Cost depends on the number of genres, distinct years and ``top_authors``
+    (read through ``ix_authors_book_count``), not on the number of books.
+
+    Returns:
+        dict: totals, counts by genre, year and decade, and the top authors.
+    """
+    q = text(
+        """
+        SELECT kind, key, count, NULL AS name
+        FROM book_stats
+        WHERE kind IN ('total', 'genre', 'year', 'decade') AND count > 0
+        UNION ALL
+        (
+            SELECT 'author', id::text, book_count, name
+            FROM authors
+            WHERE book_count > 0
+            ORDER BY book_count DESC, name ASC
+            LIMIT :top
+        )
+        """
+    )
+    rows = (await session.execute(q, {"top": top_authors})).all()
+
+    stats = {
+        "total_books": 0,
+        "total_authors": 0,
+        "by_genre": {},
+        "by_year": {},
+        "by_decade": {},
+        "top_authors": [],
+    }
+    for kind, key, count, name in rows:
+        if kind == "total":
+            stats[f"total_{key}"] = count
+        elif kind == "genre":
+            stats["by_genre"][key] = count
+        elif kind == "author":
+            stats["top_authors"].append(
+                {"id": int(key), "name": name, "book_count": count}
+            )
+        else:
+            stats[f"by_{kind}"][int(key)] = count
+    stats["by_year"] = dict(sorted(stats["by_year"].items()))
+    stats["by_decade"] = dict(sorted(stats["by_decade"].items()))
+    return stats
+
+
+@db_function
+async def top_authors(session: AsyncSession, limit: int) -> list[tuple[int, str]]:
+    """
+    ``(id, name)`` of the authors with the most books, busiest first.
+    """
+    q = text(
+        """
+        SELECT id, name
+        FROM authors
+        WHERE book_count > 0
+        ORDER BY book_count DESC, id DESC
+        LIMIT :limit
+        """
+    )
+    return [tuple(row) for row in await session.execute(q, {"limit": limit})]
+
+
+@db_function
+async def check_stats(session: AsyncSession) -> list[tuple[str, str, int, int]]:
+    """
+    Compare the summary table and ``authors.book_count`` with aggregates
+    computed from the base tables.
+
+    Returns:
+        list: ``(kind, key, stored, actual)`` for every counter that differs;
+        ``authors.book_count`` mismatches have kind ``"book_count"``.
+    """
+    q = text(
+        f"""
+        WITH actual AS ({_COMPUTED_STATS})
+        SELECT COALESCE(s.kind, a.kind) AS kind, COALESCE(s.key, a.key) AS key,
+               COALESCE(s.count, 0) AS stored, COALESCE(a.count, 0) AS actual
+        FROM book_stats s
+        FULL JOIN actual a ON a.kind = s.kind AND a.key = s.key
+        WHERE COALESCE(s.count, 0) <> COALESCE(a.count, 0)
+        UNION ALL
+        SELECT 'book_count', a.id::text, a.book_count, COUNT(b.id)
+        FROM authors a
+        LEFT JOIN books b ON b.author_id = a.id
+        GROUP BY a.id
+        HAVING a.book_count <> COUNT(b.id)
+        ORDER BY 1, 2
+        """
+    )
+    return [tuple(r) for r in (await session.execute(q)).all()]
+
+
+@db_function
+async def rebuild_stats(session: AsyncSession) -> int:
+    """
+    Recompute the summary table and ``authors.book_count`` from scratch.
+
+    Books and authors are locked against writes for the duration, so the
+    result is exact. Returns the number of counter rows written.
+    """
+    await session.execute(text("LOCK TABLE authors, books IN SHARE MODE"))
+    await session.execute(text("DELETE FROM book_stats"))
+    res = await session.execute(
+        text(f"INSERT INTO book_stats(kind, key, count) {_COMPUTED_STATS}")
+    )
+    await session.execute(
+        text(
+            """
+            UPDATE authors a SET book_count = COALESCE(c.n, 0)
+            FROM authors x
+            LEFT JOIN (
+                SELECT author_id, COUNT(*) AS n FROM books GROUP BY author_id
+            ) c ON c.author_id = x.id
+            WHERE a.id = x.id AND a.book_count <> COALESCE(c.n, 0)
+            """
+        )
+    )
+    await session.commit()
+    return res.rowcount
@@ -1,7 +1,12 @@
+from datetime import datetime
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
+from app.db.instrumentation import db_function
+
 
+@db_function
 async def create_user(session: AsyncSession, email: str, hashed_password: str):
     """
     Create a new user in the database.
@@ -18,6 +23,7 @@ async def create_user(session: AsyncSession, email: str, hashed_password: str):
     return result.first()
 
 
+@db_function
 async def get_user_by_email(session: AsyncSession, email: str):
     """
     Fetch a user by email.
@@ -31,3 +37,51 @@ async def get_user_by_email(session: AsyncSession, email: str):
     )
     result = await session.execute(q, {"e": email})
     return result.first()
+
+
+@db_function
+async def update_password(session: AsyncSession, user_id: int, hashed_password: str):
+    """
+    Replace a user's password hash.
+    """
+    q = text("UPDATE users SET hashed_password = :p WHERE id = :id")
+    await session.execute(q, {"p": hashed_password, "id": user_id})
+    await session.commit()
+
+
+@db_function
+async def revoke_token(
+    session: AsyncSession, token_hash: str, user_id: int, expires_at: datetime
+):
+    """
+    Add a token digest to the denylist and purge entries that have expired.
+    """
+    await session.execute(
+        text("DELETE FROM revoked_tokens WHERE expires_at < NOW()"),
+    )
+    await session.execute(
+        text(
+            """
+            INSERT INTO revoked_tokens(token_hash, user_id, expires_at)
+            VALUES(:h, :u, :e)
+            ON CONFLICT (token_hash) DO NOTHING
+            """
+        ),
+        {"h": token_hash, "u": user_id, "e": expires_at},
+    )
+    await session.commit()
+
+
+@db_function
+async def delete_user(session: AsyncSession, user_id: int) -> bool:
+    """
+    Delete a user and their denylist entries.
+    """
+    await session.execute(
+        text("DELETE FROM revoked_tokens WHERE user_id = :id"), {"id": user_id}
+    )
+    res = await session.execute(
+        text("DELETE FROM users WHERE id = :id"), {"id": user_id}
+    )
+    await session.commit()
+    return res.rowcount > 0
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, BigInteger, CHAR, TIMESTAMP, func
+from app.db.base import Base
+
+
+class RevokedToken(Base):
+    """
+    ORM model for revoked access tokens.
+
+    Stores the SHA-256 digest of a logged-out JWT until the token would
+    have expired anyway.
+    """
+
+    __tablename__ = "revoked_tokens"
+    __table_args__ = {"schema": "public"}
+
+    token_hash = Column(CHAR(64), primary_key=True)
+    user_id = Column(BigInteger, nullable=False)
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
+    revoked_at = Column(
+        TIMESTAMP(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+    def __repr__(self) -> str:
+        return f"<RevokedToken(user_id={self.user_id}, expires_at={self.expires_at})>"
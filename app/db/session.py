@@ -1,35 +1,167 @@
 from collections.abc import AsyncGenerator
+from typing import Optional
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy import text
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
 from app.core.config import settings
-
-engine: AsyncEngine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_size=settings.DB_POOL_SIZE,
-    max_overflow=settings.DB_MAX_OVERFLOW,
-    pool_timeout=settings.DB_POOL_TIMEOUT,
-    pool_recycle=settings.DB_POOL_RECYCLE,
-    future=True,
+from app.core.metrics import REGISTRY
+from app.core.singleflight import book_reads
+from app.db.author_cache import author_ids
+from app.db.suggestions import suggestions
+from app.db import instrumentation  # noqa: F401  (registers engine event hooks)
+from app.db.pool import (
+    AdaptivePoolSizer,
+    InstrumentedPool,
+    clamp_pool_limits,
+    worker_connection_cap,
 )
 
-SessionLocal = async_sessionmaker(
-    bind=engine, class_=AsyncSession, expire_on_commit=False
+_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[async_sessionmaker] = None
+
+
+def _pool_limits() -> tuple[int, int]:
+    if settings.SERVERLESS:
+        # One request per instance at a time: a single connection, kept
+        # across warm invocations.
+        return 1, 0
+    return settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+
+
+def _create_engine() -> AsyncEngine:
+    pool_size, max_overflow = _pool_limits()
+    adaptive = settings.DB_POOL_ADAPTIVE and not settings.SERVERLESS
+    if adaptive:
+        cap = worker_connection_cap(
+            settings.DB_CONNECTION_BUDGET,
+            settings.WEB_CONCURRENCY,
+            settings.DB_POOL_MAX_SIZE,
+        )
+        pool_size, max_overflow = clamp_pool_limits(pool_size, max_overflow, cap)
+    engine = create_async_engine(
+        settings.DATABASE_URL,
+        echo=settings.DB_ECHO,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        poolclass=InstrumentedPool,
+        future=True,
+    )
+    if adaptive:
+        engine.pool.sizer = AdaptivePoolSizer(
+            min_size=pool_size,
+            max_size=cap,
+            target_wait=settings.DB_POOL_TARGET_WAIT_MS / 1000,
+            interval=settings.DB_POOL_ADJUST_INTERVAL,
+        )
+    return engine
+
+
+def get_engine() -> AsyncEngine:
+    """
+    The application engine, created on first use.
+
+    Building it loads the asyncpg dialect, so importing the app stays cheap
+    until something actually talks to the database.
+    """
+    global _engine
+    if _engine is None:
+        _engine = _create_engine()
+    return _engine
+
+
+def get_sessionmaker() -> async_sessionmaker:
+    global _sessionmaker
+    if _sessionmaker is None:
+        _sessionmaker = async_sessionmaker(
+            bind=get_engine(), class_=AsyncSession, expire_on_commit=False
+        )
+    return _sessionmaker
+
+
+async def dispose_engine() -> None:
+    """Close pooled connections, if the engine was ever created."""
+    if _engine is not None:
+        await _engine.dispose()
+
+
+def __getattr__(name: str):
+    # ``from app.db.session import engine`` keeps working, lazily.
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        return get_sessionmaker()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_coalesced_reads(session):
+    # Reads already in flight may predate this write; later callers must not join them.
+    book_reads.invalidate()
+    author_ids.publish(session)
+    suggestions.publish(session)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_staged_changes(session):
+    author_ids.discard(session)
+    suggestions.discard(session)
+
+
+def _pool_connections() -> dict:
+    if _engine is None:
+        pool_size, max_overflow = _pool_limits()
+        return {
+            ("in_use",): 0,
+            ("idle",): 0,
+            ("overflow",): 0,
+            ("capacity",): pool_size + max_overflow,
+        }
+    pool = _engine.pool
+    return {
+        ("in_use",): pool.checkedout(),
+        ("idle",): pool.checkedin(),
+        ("overflow",): max(pool.overflow(), 0),
+        ("capacity",): pool.size() + pool.max_overflow,
+    }
+
+
+REGISTRY.gauge(
+    "db_pool_connections",
+    "Application pool connections by state.",
+    ("state",),
+    callback=_pool_connections,
+)
+REGISTRY.counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT.",
+    callback=lambda: {(): _engine.pool.stats.timeouts} if _engine else {},
+)
+REGISTRY.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+    children=lambda: {(): _engine.pool.stats.wait} if _engine else {},
 )
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async with SessionLocal() as session:
+    async with get_sessionmaker()() as session:
         yield session
 
 
+def pool_snapshot() -> dict:
+    """Return checkout telemetry and gauges for the application pool."""
+    return get_engine().pool.snapshot()
+
+
 async def ping_db() -> bool:
-    async with engine.connect() as conn:
+    async with get_engine().connect() as conn:
         result = await conn.execute(text("SELECT 1"))
         return result.scalar_one() == 1
@@ -0,0 +1,41 @@
+"""
+AWS Lambda entry point (handler: ``app.lambda_handler.handler``).
+
+Mangum's lifespan support is off: it would run startup and shutdown around
+every invocation, pinging the database and disposing the pool each time.
+The engine is instead created by the first request that needs it, and its
+single pooled connection (``SERVERLESS``) is reused while the instance stays
+warm. Scheduled warm-up events open that connection ahead of traffic, and
+only when none is pooled yet. The suggestion indexes are loaded by the
+first ``/api/books/suggest`` request. Decade partitions for ``books`` are
+not created here; schedule ``python -m app.cli books-partitions`` instead.
+"""
+
+import asyncio
+
+from mangum import Mangum
+
+from app.db.session import get_engine, ping_db
+from app.main import app
+
+# Event sources of scheduled keep-warm invocations (EventBridge rules and
+# serverless-plugin-warmup).
+WARMUP_SOURCES = frozenset({"aws.events", "serverless-plugin-warmup"})
+
+asgi_handler = Mangum(app, lifespan="off")
+
+
+def warm_up() -> bool:
+    """
+    Ensure a database connection is pooled, pinging only when none is.
+    """
+    if get_engine().pool.checkedin():
+        return True
+    # Mangum runs requests on this same loop, so the connection stays usable.
+    return asyncio.get_event_loop().run_until_complete(ping_db())
+
+
+def handler(event: dict, context) -> dict:
+    if event.get("source") in WARMUP_SOURCES:
+        return {"warm": warm_up()}
+    return asgi_handler(event, context)
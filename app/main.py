@@ -1,35 +1,106 @@
-from contextlib import asynccontextmanager
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
 
+from app.api import health, metrics
 from app.api.router import api_router
 from app.core.config import settings
-from app.db.session import engine, ping_db
+from app.db.book_events import book_events
+from app.db.partitioning import ensure_book_partitions
+from app.db.session import dispose_engine, get_engine, get_sessionmaker, ping_db
+from app.db.suggestions import load_suggestions
+from app.db.warmup import warm_up
 from app.core.errors import (
     http_exception_handler,
     validation_exception_handler,
     generic_exception_handler,
     rate_limit_handler,
 )
-from app.core.limiter import limiter
+from app.core.limiter import RateLimitExceeded, limiter
+from app.core.compression import parse_levels
+from app.core.middleware import (
+    CompressionMiddleware,
+    MetricsMiddleware,
+    RateLimitMiddleware,
+    ServerTimingMiddleware,
+    TracingMiddleware,
+)
+from app.core.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+async def startup(app: FastAPI) -> None:
+    """
+    Wait for the database, load the suggestion indexes, then warm up;
+    ``app.state.ready`` flips to True at the end, which is what
+    ``/health/ready`` reports.
+
+    Runs in the background so liveness probes are answered meanwhile, and
+    retries with backoff while the database is unreachable.
+    """
+    delay = 1.0
+    while True:
+        try:
+            await ping_db()
+            break
+        except Exception:
+            logger.warning("Database not reachable; retrying in %.0fs", delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    try:
+        async with get_sessionmaker()() as session:
+            created = await ensure_book_partitions(session)
+        if created:
+            logger.info("Created %d books partitions", created)
+    except Exception:
+        logger.exception("Could not create books partitions")
+
+    if settings.SUGGEST_ENABLED:
+        try:
+            async with get_sessionmaker()() as session:
+                loaded = await load_suggestions(session)
+            logger.info("Suggestions: %(author)d authors, %(title)d titles", loaded)
+        except Exception:
+            logger.exception("Could not load suggestions")
+
+    if settings.WARMUP_ENABLED:
+        try:
+            summary = await warm_up(
+                get_engine(),
+                connections=settings.WARMUP_CONNECTIONS,
+                authors=settings.WARMUP_AUTHORS,
+            )
+            logger.info(
+                "Warm-up: %(connections)d connections, %(authors)d authors cached "
+                "in %(seconds).2fs",
+                summary,
+            )
+        except Exception:
+            logger.exception("Warm-up failed; serving cold")
+    app.state.ready = True
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    try:
-        ok = await ping_db()
-        app.state.db_ready = bool(ok)
-    except Exception:
-        app.state.db_ready = False
+    app.state.ready = False
+    starting = asyncio.create_task(startup(app))
 
     yield
 
     # Shutdown
-    await engine.dispose()
+    starting.cancel()
+    with suppress(asyncio.CancelledError):
+        await starting
+    await book_events.close()
+    await dispose_engine()
+    if tracer.processor is not None:
+        tracer.processor.flush()
 
 
 app = FastAPI(
@@ -39,8 +110,20 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-app.state.limiter = limiter
-app.add_middleware(SlowAPIMiddleware)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        levels={
+            "gzip": parse_levels(settings.COMPRESSION_LEVELS),
+            "br": parse_levels(settings.COMPRESSION_BROTLI_LEVELS),
+        },
+    )
+app.add_middleware(RateLimitMiddleware, routes=app.router.routes, limiter=limiter)
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(TracingMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
@@ -49,3 +132,5 @@ app.add_exception_handler(Exception, generic_exception_handler)
 app.add_exception_handler(RateLimitExceeded, rate_limit_handler)
 
 app.include_router(api_router, prefix="/api")
+app.include_router(metrics.router)
+app.include_router(health.router)
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel, field_validator
 from datetime import datetime
 
@@ -42,6 +43,35 @@ class AuthorOut(AuthorBase):
 
     id: int
     created_at: datetime
+    book_count: int = 0
 
     class Config:
         from_attributes = True
+
+
+class AuthorBook(BaseModel):
+    id: int
+    title: str
+    genre: str
+    published_year: int
+
+
+class AuthorDetail(AuthorOut):
+    """
+    Schema for a single author with (up to ``books_limit`` of) their books.
+    """
+
+    books: list[AuthorBook]
+
+
+class AuthorsPage(BaseModel):
+    """
+    Schema for keyset-paginated author listings.
+    ``next_cursor`` fetches the following page; it is null on the last one.
+    """
+
+    items: list[AuthorOut]
+    sort_by: str
+    sort_order: str
+    limit: int
+    next_cursor: Optional[str] = None
@@ -1,9 +1,10 @@
 from typing import Optional, Literal
 from pydantic import BaseModel, field_validator
 from datetime import datetime
+from app.core.constants import GENRES
 from app.schemas.author import AuthorOut
 
-GenreLiteral = Literal["Fiction", "Non-Fiction", "Science", "History"]
+GenreLiteral = Literal[GENRES]
 
 
 class BookBase(BaseModel):
@@ -102,14 +103,88 @@ class BookOut(BaseModel):
     updated_at: str
 
 
+class BookPartial(BaseModel):
+    """
+    Schema for book reads that take ``fields=``.
+    Only the requested fields are set and returned.
+    """
+
+    id: Optional[int] = None
+    title: Optional[str] = None
+    author: Optional[str] = None
+    genre: Optional[GenreLiteral] = None
+    published_year: Optional[int] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+
 class BooksPage(BaseModel):
     """
     Schema for paginated book listings.
     """
 
-    items: list[BookOut]
+    items: list[BookPartial]
     total: int
     page: int
     page_size: int
     sort_by: str
     sort_order: str
+    facets: Optional[dict[str, dict[str, int]]] = None
+
+
+class Suggestion(BaseModel):
+    value: str
+    book_count: int
+
+
+class Suggestions(BaseModel):
+    """
+    Schema for typeahead suggestions, most books first.
+    """
+
+    q: str
+    kind: str
+    items: list[Suggestion]
+
+
+class AuthorBookCount(BaseModel):
+    id: int
+    name: str
+    book_count: int
+
+
+class BookStats(BaseModel):
+    """
+    Schema for catalog statistics.
+    """
+
+    total_books: int
+    total_authors: int
+    by_genre: dict[str, int]
+    by_year: dict[int, int]
+    by_decade: dict[int, int]
+    top_authors: list[AuthorBookCount]
+
+
+class DuplicateBook(BaseModel):
+    id: int
+    title: str
+    author: str
+
+
+class DuplicatePair(BaseModel):
+    similarity: float
+    books: list[DuplicateBook]
+
+
+class DuplicateReport(BaseModel):
+    """
+    Schema for the near-duplicate report: books scanned, candidate pairs
+    compared, pairs at or above ``threshold``, and the most similar of them.
+    """
+
+    books: int
+    candidates: int
+    duplicates: int
+    threshold: float
+    pairs: list[DuplicatePair]
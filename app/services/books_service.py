@@ -1,13 +1,30 @@
-import csv, io, json
+import asyncio, csv, hashlib, io, json
+import numpy as np
+import pandas as pd
 from fastapi import UploadFile, HTTPException
 from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy import select, func, String
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 from app.db.book import Book
 from app.db.author import Author
 from app.schemas.book import BookOut
 from app.db import repo_books as repo
-from app.core.constants import GENRES
+from app.db import repo_imports
+from app.core.constants import (
+    DEDUPE_THRESHOLD,
+    EXPORT_CHUNK_ROWS,
+    GENRES,
+    IMPORT_CHUNK_ROWS,
+)
+from app.core.metrics import export_rows, import_rows
+from app.core.singleflight import book_reads
+from app.core.tracing import traced
+from app.db.instrumentation import db_function
+from app.services.dedupe import find_duplicates
+
+
+BOOK_KEYS = frozenset({"title", "author", "genre", "published_year"})
 
 
 def record_ok(rec: dict) -> bool:
@@ -17,20 +34,54 @@ def record_ok(rec: dict) -> bool:
     Ensures required fields exist, genre is valid,
     and published_year is an integer >= 1800.
     """
-    base_keys = {"title", "author", "genre", "published_year"}
-    if not base_keys.issubset(rec.keys()):
-        return False
-    if rec["genre"] not in GENRES:
+    if not BOOK_KEYS.issubset(rec.keys()):
         return False
+    return genre_ok(rec["genre"]) and year_ok(rec["published_year"])
+
+
+def genre_ok(value) -> bool:
+    return value in GENRES
+
+
+def year_ok(value) -> bool:
     try:
-        y = int(rec["published_year"])
-        if y < 1800:
-            return False
+        return int(value) >= 1800
     except Exception:
         return False
-    return True
 
 
+def records_ok(records: list) -> np.ndarray:
+    """
+    Validate a batch of book records at once: ``record_ok`` for each record,
+    as a boolean array.
+
+    The genre and year columns are factorized with pandas, so ``genre_ok``
+    and ``year_ok`` run once per distinct value rather than once per row;
+    a column holding unhashable values is checked row by row. Raises what
+    ``record_ok`` would for a record that is not a dict.
+    """
+    for rec in records:
+        if not isinstance(rec, dict):
+            record_ok(rec)
+    n = len(records)
+    # A missing genre or year reads as None, which fails its check below.
+    ok = np.fromiter(
+        ("title" in rec and "author" in rec for rec in records), bool, count=n
+    )
+    for key, check in (("genre", genre_ok), ("published_year", year_ok)):
+        column = np.fromiter((rec.get(key) for rec in records), object, count=n)
+        try:
+            codes, values = pd.factorize(column)
+        except TypeError:
+            ok &= np.fromiter(map(check, column), bool, count=n)
+            continue
+        # Missing values (None, NaN) get code -1: the appended False.
+        verdicts = np.fromiter(map(check, values), bool, count=len(values))
+        ok &= np.append(verdicts, False)[codes]
+    return ok
+
+
+@traced()
 async def import_books(file: UploadFile, session):
     """
     Import books from a JSON or CSV file.
@@ -38,59 +89,128 @@ async def import_books(file: UploadFile, session):
     - JSON: expects an array of objects {title, author, genre, published_year}
     - CSV: expects headers [title, author, genre, published_year]
 
+    Imports are content-addressed: a file identical to one imported before
+    gets that import's response back, and rows are taken in chunks of
+    IMPORT_CHUNK_ROWS, each skipped if a chunk with the same content was
+    imported before (e.g. a resent file with rows appended). A chunk is
+    recorded once each of its rows was imported or rejected for its data;
+    one that hit another error is retried when sent again.
+
     Returns:
         dict: {
             "imported": <number of successfully imported books>,
-            "errors": [list of error messages per row]
+            "skipped": <rows in chunks imported before>,
+            "errors": [list of error messages per row],
+            "duplicates_in_file": [imported rows that look like an earlier
+                row of the same file: {row, duplicate_of_row, similarity};
+                books already in the catalog are not compared, see
+                ``dedupe.duplicate_report`` for that]
         }
     """
     content = await file.read()
-    created, errors = 0, []
+    fmt = "json" if file.filename.endswith(".json") else "csv"
+    file_digest = hashlib.sha256(f"{fmt}:".encode() + content).hexdigest()
+    earlier = await repo_imports.get_import_result(session, file_digest)
+    if earlier is not None:
+        rows, result = earlier
+        import_rows.inc(fmt, "skipped", amount=rows)
+        return result
 
     try:
-        if file.filename.endswith(".json"):
+        if fmt == "json":
             data = json.loads(content.decode("utf-8"))
             if not isinstance(data, list):
                 raise ValueError("JSON must be an array of records")
-            for i, rec in enumerate(data, 1):
-                if not record_ok(rec):
-                    errors.append(f"row {i}: invalid record")
-                    continue
-                try:
-                    await repo.create_book(
-                        session,
-                        title=rec["title"],
-                        author=rec["author"],
-                        genre=rec["genre"],
-                        published_year=int(rec["published_year"]),
-                    )
-                    created += 1
-                except Exception as e:
-                    errors.append(f"row {i}: {e}")
         else:
-            reader = csv.DictReader(io.StringIO(content.decode("utf-8")))
-            for i, rec in enumerate(reader, 1):
-                if not record_ok(rec):
-                    errors.append(f"row {i}: invalid record")
-                    continue
-                try:
-                    await repo.create_book(
-                        session,
-                        title=rec["title"],
-                        author=rec["author"],
-                        genre=rec["genre"],
-                        published_year=int(rec["published_year"]),
-                    )
-                    created += 1
-                except Exception as e:
-                    errors.append(f"row {i}: {e}")
-
+            data = list(csv.DictReader(io.StringIO(content.decode("utf-8"))))
+        valid = records_ok(data)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Import failed: {str(e)}")
 
-    return {"imported": created, "errors": errors}
+    starts = range(0, len(data), IMPORT_CHUNK_ROWS)
+    digests = [chunk_digest(data[lo : lo + IMPORT_CHUNK_ROWS]) for lo in starts]
+    done = await repo_imports.imported_chunks(session, digests)
+    created, skipped, errors, rows = 0, 0, [], []
+    complete = True
+    for lo, digest in zip(starts, digests):
+        chunk = data[lo : lo + IMPORT_CHUNK_ROWS]
+        if digest in done:
+            skipped += len(chunk)
+            continue
+        settled = True
+        for i, rec in enumerate(chunk, lo + 1):
+            if not valid[i - 1]:
+                errors.append(f"row {i}: invalid record")
+                continue
+            try:
+                await repo.create_book(
+                    session,
+                    title=rec["title"],
+                    author=rec["author"],
+                    genre=rec["genre"],
+                    published_year=int(rec["published_year"]),
+                )
+                created += 1
+                rows.append((i, rec["title"], rec["author"]))
+            except Exception as e:
+                errors.append(f"row {i}: {e}")
+                # Keep the session usable for the rows that follow.
+                await session.rollback()
+                # A row the catalog rejects (e.g. already there) fails the
+                # same way every time; anything else is worth retrying.
+                settled = settled and isinstance(e, IntegrityError)
+        if settled:
+            await repo_imports.record_chunk(session, digest, len(chunk))
+        complete = complete and settled
 
+    import_rows.inc(fmt, "imported", amount=created)
+    import_rows.inc(fmt, "skipped", amount=skipped)
+    import_rows.inc(fmt, "failed", amount=len(errors))
+    result = {
+        "imported": created,
+        "skipped": skipped,
+        "errors": errors,
+        "duplicates_in_file": await duplicates_in_file(rows),
+    }
+    if complete:
+        await repo_imports.record_chunk(session, file_digest, len(data), result)
+    return result
 
+
+def chunk_digest(records: list) -> str:
+    """
+    SHA-256 of a chunk's book fields, column by column and independent of
+    file formatting; a missing field hashes as ``...``, which no JSON or
+    CSV value can be.
+    """
+    digest = hashlib.sha256()
+    for key in sorted(BOOK_KEYS):
+        digest.update(repr([rec.get(key, ...) for rec in records]).encode())
+    return digest.hexdigest()
+
+
+async def duplicates_in_file(rows: list) -> list:
+    """
+    Pairs of imported ``(row, title, author)`` rows that are likely the same
+    book, most similar first; each names the later row and the earlier one.
+    Only rows of one file are compared with each other.
+    """
+    found = await asyncio.to_thread(
+        find_duplicates,
+        [(title, author) for _, title, author in rows],
+        DEDUPE_THRESHOLD,
+    )
+    return [
+        {
+            "row": rows[j][0],
+            "duplicate_of_row": rows[i][0],
+            "similarity": round(float(s), 3),
+        }
+        for i, j, s in zip(found.left, found.right, found.similarity)
+    ]
+
+
+@db_function
 async def export_books(format: str, session):
     """
     Export books in JSON or CSV format.
@@ -113,26 +233,43 @@ async def export_books(format: str, session):
         ).join(Author, Book.author_id == Author.id)
     )
     books = result.mappings().all()
+    export_rows.inc(format, amount=len(books))
 
     if format == "json":
         return JSONResponse(content=[dict(row) for row in books])
-    else:
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["title", "author", "genre", "published_year"])
-        for row in books:
-            writer.writerow([row.title, row.author, row.genre, row.published_year])
-        output.seek(0)
-        filename = f"books_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        return StreamingResponse(
-            output,
-            media_type="text/csv",
-            headers={"Content-Disposition": f"attachment; filename={filename}"},
-        )
+    filename = f"books_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    return StreamingResponse(
+        _csv_chunks(books),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+async def _csv_chunks(rows, chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Yield the CSV export ``chunk_rows`` rows at a time."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(["title", "author", "genre", "published_year"])
+    for i, row in enumerate(rows, 1):
+        writer.writerow([row.title, row.author, row.genre, row.published_year])
+        if i % chunk_rows == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+    yield output.getvalue()
+
+
+def _recommend_key(by: str, value: str, limit: int, session) -> tuple:
+    # Author matching is case-insensitive, genre matching is exact.
+    return by, value.lower() if by == "author" else value, limit
 
 
+@db_function
+@book_reads.coalesce(key=_recommend_key)
 async def recommend_books(by: str, value: str, limit: int, session):
     if by == "genre":
+        if value not in GENRES:
+            raise HTTPException(status_code=404, detail="No recommendations found")
         query = (
             select(
                 Book.id,
@@ -0,0 +1,277 @@
+"""
+Near-duplicate detection over book titles and authors.
+
+Titles are reduced to the character trigrams of their normalized words, and
+each gets a MinHash signature of ``PERMUTATIONS`` values, computed with
+vectorized NumPy. The fraction of equal values in two signatures estimates
+the Jaccard similarity of the trigram sets, so "The Hobbit" and "Hobbit,
+The" come out close.
+
+Candidate pairs come from LSH banding of the signatures: each is cut into
+``BANDS`` bands of ``ROWS`` values, and books sharing a band's values land
+in the same bucket. Within a bucket, ordered by author, each book is paired
+with at most ``BUCKET_NEIGHBOURS`` others, so the work stays linear in the
+number of books (plus a sort per band) even when many books share a bucket.
+
+Candidates whose titles reach the threshold are then compared on author,
+by edit similarity of the name's sorted words, which tolerates typos
+("Tolkien", "Tolkein") better than trigrams of a short name. A pair scores
+the lower of its title and author similarities, so different books by one
+author ("Dune", "Dune Messiah") and same-titled books by different authors
+do not match.
+"""
+
+import asyncio
+import re
+from difflib import SequenceMatcher
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import text
+
+from app.db.instrumentation import db_function
+
+PERMUTATIONS = 64
+# 21 bands of 3 values: titles at 0.6 similarity become candidates with
+# probability 0.99, titles at 0.3 with 0.44.
+ROWS = 3
+BANDS = PERMUTATIONS // ROWS
+BUCKET_NEIGHBOURS = 16
+# Texts hashed per batch; bounds the trigram arrays to a few tens of MB.
+CHUNK = 50000
+
+_NON_WORD = re.compile(r"[\W_]+")
+# Dropped from titles: they move around ("Hobbit, The") and, being in so many
+# titles, would otherwise put unrelated books in the same LSH buckets.
+STOP_WORDS = frozenset("a an and at by for in of on or the to with".split())
+# Fixed seed: signatures from different runs must be comparable.
+_rng = np.random.default_rng(20240611)
+_MULT = _rng.integers(1, 2**63, size=PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_ADD = _rng.integers(0, 2**63, size=PERMUTATIONS, dtype=np.uint64)
+_BAND_MULT = _rng.integers(1, 2**63, size=ROWS, dtype=np.uint64)
+
+# Order-independent checksum of exactly the columns the report reads, so any
+# insert, delete, title edit or author rename (from any worker) changes it.
+_CATALOG_VERSION = text(
+    "SELECT count(*) AS books, coalesce(sum(hashtext("
+    "concat_ws(chr(31), id, title, author_sort))::bigint), 0) AS digest "
+    "FROM books"
+)
+# (catalog version, threshold, limit) of the last report, and the report.
+_last_report: Optional[tuple[tuple, dict]] = None
+
+
+class Duplicates(NamedTuple):
+    left: np.ndarray
+    right: np.ndarray
+    similarity: np.ndarray
+    candidates: int
+
+
+def normalize(value: str) -> str:
+    """
+    Case-folded title words without punctuation or stop words, padded for
+    edge trigrams.
+    """
+    words = [
+        w for w in _NON_WORD.sub(" ", value.casefold()).split() if w not in STOP_WORDS
+    ]
+    return f" {' '.join(words)} " if words else "   "
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer: spreads nearby trigram codes over 64 bits."""
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _signatures(texts: Sequence[str]) -> np.ndarray:
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    codes = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32)
+    codes = codes.astype(np.uint64)
+    # Trigram i is codes[i:i + 3]; keep those that lie inside one text.
+    last = np.repeat(np.cumsum(lengths) - 3, lengths)[:-2]
+    keep = np.arange(len(codes) - 2) <= last
+    grams = (codes[:-2] << np.uint64(42)) | (codes[1:-1] << np.uint64(21)) | codes[2:]
+    grams = _mix(grams[keep])
+    starts = np.concatenate(([0], np.cumsum(lengths - 2)[:-1]))
+
+    out = np.empty((len(texts), PERMUTATIONS), dtype=np.uint32)
+    for j in range(PERMUTATIONS):
+        hashed = (grams * _MULT[j] + _ADD[j]) >> np.uint64(32)
+        out[:, j] = np.minimum.reduceat(hashed, starts)
+    return out
+
+
+def signatures(texts: Sequence[str]) -> np.ndarray:
+    """
+    MinHash signatures of ``normalize``d texts, one ``uint32`` row of
+    ``PERMUTATIONS`` values per text.
+    """
+    out = np.empty((len(texts), PERMUTATIONS), dtype=np.uint32)
+    for lo in range(0, len(texts), CHUNK):
+        out[lo : lo + CHUNK] = _signatures(texts[lo : lo + CHUNK])
+    return out
+
+
+def candidate_pairs(
+    sigs: np.ndarray, tiebreak: Optional[np.ndarray] = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Row index pairs ``(i, j)``, ``i < j``, sharing at least one LSH bucket.
+
+    Within a bucket rows are ordered by ``tiebreak``, so the neighbours each
+    row is paired with are its closest by that key.
+    """
+    n = len(sigs)
+    found = []
+    for band in range(BANDS):
+        block = sigs[:, band * ROWS : (band + 1) * ROWS].astype(np.uint64)
+        keys = (block * _BAND_MULT).sum(axis=1, dtype=np.uint64)
+        if tiebreak is None:
+            order = np.argsort(keys, kind="stable")
+        else:
+            order = np.lexsort((tiebreak, keys))
+        keys = keys[order]
+        # Buckets are runs of equal keys: pair each book with the next few.
+        for d in range(1, BUCKET_NEIGHBOURS + 1):
+            same = keys[d:] == keys[:-d]
+            if not same.any():
+                break
+            a, b = order[:-d][same], order[d:][same]
+            found.append(np.minimum(a, b) * n + np.maximum(a, b))
+    if not found:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    codes = np.unique(np.concatenate(found))
+    return codes // n, codes % n
+
+
+def similarity(sigs: np.ndarray, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Estimated Jaccard similarity of each ``(left, right)`` pair of rows."""
+    out = np.empty(len(left), dtype=np.float32)
+    step = 100000
+    for lo in range(0, len(left), step):
+        a, b = left[lo : lo + step], right[lo : lo + step]
+        out[lo : lo + step] = (sigs[a] == sigs[b]).mean(axis=1)
+    return out
+
+
+def author_key(author: str) -> str:
+    """Case-folded words of an author's name in sorted order."""
+    return " ".join(sorted(_NON_WORD.sub(" ", author.casefold()).split()))
+
+
+def author_similarity(
+    names: Sequence[str], a: np.ndarray, b: np.ndarray, floor: float = 0.0
+) -> np.ndarray:
+    """
+    Edit similarity (0-1) of ``names[a]`` and ``names[b]`` for each pair.
+
+    Values below ``floor`` are only upper bounds: those pairs are rejected
+    on a vectorized estimate without computing the exact ratio.
+    """
+    # Compare each distinct pair of names once.
+    pairs, index = np.unique(
+        np.minimum(a, b) * len(names) + np.maximum(a, b), return_inverse=True
+    )
+    x, y = divmod(pairs, len(names))
+    used = np.unique(np.concatenate((x, y)))
+    counts, lengths = _char_counts([names[i] for i in used.tolist()])
+    cx, cy = np.searchsorted(used, x), np.searchsorted(used, y)
+    # difflib's quick_ratio, an upper bound of ratio, from character counts;
+    # folding code points mod 64 can only raise it.
+    shared = np.minimum(counts[cx], counts[cy]).sum(axis=1)
+    ratios = (2 * shared / np.maximum(lengths[cx] + lengths[cy], 1)).astype(np.float32)
+    for n in np.flatnonzero((ratios >= floor) & (x != y)).tolist():
+        ratios[n] = SequenceMatcher(None, names[x[n]], names[y[n]]).ratio()
+    ratios[x == y] = 1.0
+    return ratios[index]
+
+
+def _char_counts(names: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    lengths = np.fromiter(map(len, names), dtype=np.int64, count=len(names))
+    codes = np.frombuffer("".join(names).encode("utf-32-le"), dtype=np.uint32)
+    owner = np.repeat(np.arange(len(names)), lengths)
+    counts = np.bincount(owner * 64 + codes % 64, minlength=len(names) * 64)
+    return counts.reshape(len(names), 64), lengths
+
+
+def find_duplicates(records: Sequence[tuple[str, str]], threshold: float) -> Duplicates:
+    """
+    Pairs of ``(title, author)`` records whose titles and authors are both at
+    least ``threshold`` similar, as record indexes, most similar first;
+    ``candidates`` counts the pairs LSH proposed.
+    """
+    if len(records) < 2:
+        empty = np.empty(0, dtype=np.int64)
+        return Duplicates(empty, empty, np.empty(0, dtype=np.float32), 0)
+    # Authors by rank of their key: equal for the same name, and close for
+    # names that differ late, which keeps them together inside big buckets.
+    keys = [author_key(author) for _, author in records]
+    names = sorted(set(keys))
+    rank = {name: i for i, name in enumerate(names)}
+    authors = np.fromiter(map(rank.__getitem__, keys), dtype=np.int64, count=len(keys))
+
+    titles = signatures([normalize(title) for title, _ in records])
+    left, right = candidate_pairs(titles, tiebreak=authors)
+    candidates = len(left)
+    sim = similarity(titles, left, right)
+    keep = sim >= threshold
+    left, right, sim = left[keep], right[keep], sim[keep]
+
+    sim = np.minimum(
+        sim, author_similarity(names, authors[left], authors[right], threshold)
+    )
+    keep = sim >= threshold
+    left, right, sim = left[keep], right[keep], sim[keep]
+    order = np.lexsort((right, left, -sim))
+    return Duplicates(left[order], right[order], sim[order], candidates)
+
+
+@db_function
+async def duplicate_report(session, threshold: float, limit: int) -> dict:
+    """
+    Likely duplicate pairs among all books.
+
+    Hashing runs in a worker thread so the event loop keeps serving. The last
+    report is kept and served again until the catalog changes.
+
+    Returns:
+        dict: books scanned, LSH candidate pairs, pairs at or above
+        ``threshold``, and the ``limit`` most similar of them.
+    """
+    global _last_report
+    version = tuple((await session.execute(_CATALOG_VERSION)).one())
+    key = (version, threshold, limit)
+    if _last_report is not None and _last_report[0] == key:
+        return _last_report[1]
+
+    rows = (
+        await session.execute(text("SELECT id, title, author_sort FROM books"))
+    ).all()
+    found = await asyncio.to_thread(
+        find_duplicates, [(row.title, row.author_sort) for row in rows], threshold
+    )
+
+    def book(i):
+        row = rows[i]
+        return {"id": row.id, "title": row.title, "author": row.author_sort}
+
+    report = {
+        "books": len(rows),
+        "candidates": found.candidates,
+        "duplicates": len(found.similarity),
+        "threshold": threshold,
+        "pairs": [
+            {"similarity": round(float(s), 3), "books": [book(i), book(j)]}
+            for i, j, s in zip(
+                found.left[:limit], found.right[:limit], found.similarity[:limit]
+            )
+        ],
+    }
+    _last_report = (key, report)
+    return report
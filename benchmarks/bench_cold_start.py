@@ -0,0 +1,140 @@
+"""
+Measure Lambda cold starts: handler import time plus the first request.
+
+Each sample is a fresh interpreter that imports ``app.lambda_handler`` and
+sends one API Gateway (HTTP API) event for ``GET /api/books/{book_id}``
+through ``handler``, so the first request pays for the engine, the asyncpg
+dialect and the first connection. Medians are compared against
+``benchmarks/cold_start_budget.json``; with ``--check`` the script exits 1
+when a median exceeds its budget or when a module kept off the import path
+(see ``DEFERRED_MODULES``) is loaded at import time. CI runs it that way.
+
+    DATABASE_URL=postgresql+asyncpg://... python benchmarks/bench_cold_start.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+BUDGET_FILE = Path(__file__).with_name("cold_start_budget.json")
+
+# Modules the handler must not import before the first request needs them.
+DEFERRED_MODULES = ("asyncpg", "passlib", "app.services.books_service")
+
+
+def event(path: str) -> dict:
+    return {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": path,
+        "rawQueryString": "",
+        "headers": {"host": "bench", "user-agent": "bench-cold-start"},
+        "requestContext": {
+            "http": {
+                "method": "GET",
+                "path": path,
+                "protocol": "HTTP/1.1",
+                "sourceIp": "127.0.0.1",
+            },
+            "stage": "$default",
+        },
+        "isBase64Encoded": False,
+    }
+
+
+def child(book_id: int) -> None:
+    """Run inside a fresh interpreter; print one JSON sample."""
+    start = time.perf_counter()
+    from app.lambda_handler import handler
+
+    imported = time.perf_counter()
+    loaded = [m for m in DEFERRED_MODULES if m in sys.modules]
+    response = handler(event(f"/api/books/{book_id}"), None)
+    done = time.perf_counter()
+    print(
+        json.dumps(
+            {
+                "import_ms": (imported - start) * 1000,
+                "first_request_ms": (done - imported) * 1000,
+                "status": response["statusCode"],
+                "modules": len(sys.modules),
+                "deferred_loaded": loaded,
+            }
+        )
+    )
+
+
+def sample(book_id: int) -> dict:
+    env = dict(os.environ, AWS_LAMBDA_FUNCTION_NAME="bench-cold-start")
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", str(book_id)],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=ROOT,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+async def with_engine(fn, *args):
+    from app.db.session import engine
+
+    try:
+        return await fn(*args)
+    finally:
+        await engine.dispose()
+
+
+def main(args) -> int:
+    sys.path.insert(0, str(ROOT))
+    from benchmarks.common import delete_book, seed_book
+
+    book_id = asyncio.run(with_engine(seed_book))
+    try:
+        samples = [sample(book_id) for _ in range(args.runs)]
+    finally:
+        asyncio.run(with_engine(delete_book, book_id))
+
+    budget = json.loads(BUDGET_FILE.read_text())
+    failures = []
+    print(f"{args.runs} cold starts, GET /api/books/{{book_id}}")
+    for key in ("import_ms", "first_request_ms"):
+        median = statistics.median(s[key] for s in samples)
+        verdict = "ok" if median <= budget[key] else "OVER BUDGET"
+        print(
+            f"  {key:17s} median {median:7.1f} ms  (budget {budget[key]} ms) {verdict}"
+        )
+        if median > budget[key]:
+            failures.append(key)
+    print(f"  modules loaded     {samples[-1]['modules']}")
+
+    statuses = {s["status"] for s in samples}
+    if statuses != {200}:
+        print(f"  unexpected status codes: {sorted(statuses)}")
+        failures.append("status")
+    loaded = sorted({m for s in samples for m in s["deferred_loaded"]})
+    if loaded:
+        print(f"  imported before first request: {', '.join(loaded)}")
+        failures.append("deferred_modules")
+    return 1 if failures and args.check else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--check", action="store_true", help="exit 1 on regression")
+    parser.add_argument("--child", type=int, metavar="BOOK_ID", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child is not None:
+        sys.path.insert(0, str(ROOT))
+        child(args.child)
+    else:
+        sys.exit(main(args))
@@ -0,0 +1,173 @@
+"""
+Bandwidth vs CPU of response compression per coding and level.
+
+Captures two real bodies: a 100-item ``BooksPage`` (``GET /api/books``) and
+the full CSV export, in the chunks ``export_books`` streams. Each is replayed
+through ``CompressionMiddleware`` with every coding and level, reporting
+bytes on the wire, compression ratio, CPU time per response and the total
+time to deliver at a few link speeds (CPU plus transfer). Seeded rows are
+removed afterwards.
+
+    DATABASE_URL=postgresql+asyncpg://... python benchmarks/bench_compression.py
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.core.compression import ENCODERS  # noqa: E402
+from app.core.constants import GENRES  # noqa: E402
+from app.core.limiter import limiter  # noqa: E402
+from app.core.middleware import CompressionMiddleware  # noqa: E402
+from app.db import Base  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services import books_service  # noqa: E402
+
+PREFIX = "gzipbench"
+SETTINGS = [("identity", 0)] + [
+    (coding, level)
+    for coding, levels in (("gzip", (1, 6, 9)), ("br", (1, 4, 6, 11)))
+    if coding in ENCODERS
+    for level in levels
+]
+LINKS_MBIT = (10, 100, 1000)
+
+
+async def seed(books: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            text(
+                "INSERT INTO authors(name) "
+                "SELECT :p || ' author ' || i FROM generate_series(1, 500) i"
+            ),
+            {"p": PREFIX},
+        )
+        await conn.execute(
+            text(
+                """
+                INSERT INTO books(title, author_id, genre, published_year)
+                SELECT :p || ' book ' || i || ' ' || md5(i::text),
+                       (SELECT id FROM authors
+                        WHERE name = :p || ' author ' || (i % 500 + 1)),
+                       (CAST(:genres AS book_genre[]))[i % 4 + 1],
+                       1900 + (i * 7919) % 125
+                FROM generate_series(1, :n) i
+                """
+            ),
+            {"p": PREFIX, "n": books, "genres": list(GENRES)},
+        )
+
+
+async def cleanup() -> None:
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("DELETE FROM books WHERE title LIKE :p"), {"p": f"{PREFIX} book %"}
+        )
+        await conn.execute(
+            text("DELETE FROM authors WHERE name LIKE :p"),
+            {"p": f"{PREFIX} author %"},
+        )
+
+
+async def capture_bodies() -> dict[str, tuple[bytes, list[bytes]]]:
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        resp = await client.get(
+            f"/api/books?title={PREFIX}&page_size=100",
+            headers={"Accept-Encoding": "identity"},
+        )
+        assert len(resp.json()["items"]) == 100
+        page = [resp.content]
+    async with SessionLocal() as session:
+        export = await books_service.export_books("csv", session)
+        csv_chunks = [chunk.encode() async for chunk in export.body_iterator]
+    return {
+        "BooksPage (100 items)": (b"application/json", page),
+        "CSV export": (b"text/csv", csv_chunks),
+    }
+
+
+async def replay(content_type: bytes, chunks: list[bytes], coding: str, level: int):
+    async def inner(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", content_type)],
+            }
+        )
+        for i, chunk in enumerate(chunks):
+            more = i < len(chunks) - 1
+            await send({"type": "http.response.body", "body": chunk, "more_body": more})
+
+    middleware = CompressionMiddleware(
+        inner,
+        minimum_size=1024,
+        levels={coding: {"default": level}} if coding != "identity" else {},
+    )
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", coding.encode())],
+    }
+    size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        nonlocal size
+        size += len(message.get("body", b""))
+
+    start = time.perf_counter()
+    await middleware(scope, receive, send)
+    return size, time.perf_counter() - start
+
+
+async def main(args) -> None:
+    limiter.enabled = False
+    await seed(args.books)
+    try:
+        bodies = await capture_bodies()
+    finally:
+        await cleanup()
+        await engine.dispose()
+
+    for name, (content_type, chunks) in bodies.items():
+        raw = sum(map(len, chunks))
+        print(f"{name}: {raw / 1024:.1f} KiB in {len(chunks)} chunk(s)")
+        header = "  ".join(f"{mbit:>5} Mbit/s" for mbit in LINKS_MBIT)
+        print(f"  {'coding':12s} {'bytes':>10s} {'ratio':>6s} {'cpu ms':>8s}  {header}")
+        for coding, level in SETTINGS:
+            samples = [
+                await replay(content_type, chunks, coding, level)
+                for _ in range(args.repeat)
+            ]
+            size = samples[0][0]
+            cpu = statistics.median(s[1] for s in samples)
+            label = coding if coding == "identity" else f"{coding}-{level}"
+            totals = "  ".join(
+                f"{(cpu + size * 8 / (mbit * 1e6)) * 1000:9.2f} ms"
+                for mbit in LINKS_MBIT
+            )
+            print(
+                f"  {label:12s} {size:10d} {raw / size:6.1f} {cpu * 1000:8.2f}  {totals}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--books", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,129 @@
+"""
+Near-duplicate detection time and recall over synthetic catalogs.
+
+Generates a catalog of titles and authors from random words (no database
+needed), then
+copies 1% of the books with the edits imports produce: the leading article
+moved to the end ("Hobbit, The"), two letters of the author swapped, or
+changed case and punctuation. Runs ``find_duplicates`` on growing catalogs
+and reports the MinHash and LSH stages on their own, the whole
+``find_duplicates`` call and its time per book (flat when the work is
+linear), LSH candidates, and how many planted pairs were found versus other
+pairs reported.
+
+    python benchmarks/bench_dedupe.py --books 1000000
+"""
+
+import argparse
+import itertools
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.constants import DEDUPE_THRESHOLD  # noqa: E402
+from app.services import dedupe  # noqa: E402
+
+CONSONANTS = "bcdfghjklmnprstvwyz"
+VOWELS = "aeiou"
+
+
+def make_catalog(n: int, rng: random.Random) -> tuple[list, set]:
+    """``n`` books, the last 1% of them edited copies of earlier ones."""
+
+    def word():
+        letters = [
+            rng.choice(VOWELS if k % 2 else CONSONANTS)
+            for k in range(rng.randint(3, 9))
+        ]
+        return "".join(letters).title()
+
+    # Title words follow a Zipf-like law; the commonest is 0.2% of all words.
+    vocabulary = [word() for _ in range(50000)]
+    cum_weights = list(
+        itertools.accumulate(1 / (rank + 100) for rank in range(len(vocabulary)))
+    )
+    first_names = [word() for _ in range(2000)]
+    last_names = [word() for _ in range(20000)]
+    authors = [
+        f"{rng.choice(first_names)} {rng.choice(last_names)}"
+        for _ in range(max(n // 20, 1))
+    ]
+    originals = n - n // 100
+    books = []
+    for _ in range(originals):
+        title = " ".join(
+            rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(1, 5))
+        )
+        if rng.random() < 0.3:
+            title = "The " + title
+        books.append((title, rng.choice(authors)))
+
+    planted = set()
+    for _ in range(n - originals):
+        i = rng.randrange(originals)
+        title, author = books[i]
+        edit = rng.randrange(3)
+        if edit == 0 and title.startswith("The "):
+            title = f"{title[4:]}, The"
+        elif edit == 1:
+            k = rng.choice(
+                [k for k in range(1, len(author) - 1) if " " not in author[k : k + 2]]
+            )
+            author = author[:k] + author[k + 1] + author[k] + author[k + 2 :]
+        else:
+            title, author = title.upper() + ".", author.lower()
+        planted.add((i, len(books)))
+        books.append((title, author))
+    return books, planted
+
+
+def run(books: list, planted: set, threshold: float) -> None:
+    t0 = time.perf_counter()
+    sigs = dedupe.signatures([dedupe.normalize(title) for title, _ in books])
+    t1 = time.perf_counter()
+    left, right = dedupe.candidate_pairs(sigs)
+    t2 = time.perf_counter()
+    found = dedupe.find_duplicates(books, threshold)
+    t3 = time.perf_counter()
+
+    pairs = set(zip(found.left.tolist(), found.right.tolist()))
+    hits = len(pairs & planted)
+    print(
+        f"  {len(books):9d} {t1 - t0:8.2f}s {t2 - t1:7.2f}s {t3 - t2:7.2f}s "
+        f"{(t3 - t2) / len(books) * 1e6:8.2f}µs {len(left):10d} "
+        f"{hits:6d}/{len(planted):<6d} {len(pairs) - hits:7d}"
+    )
+
+
+def main(args) -> None:
+    rng = random.Random(11)
+    books, planted = make_catalog(args.books, rng)
+    print(
+        f"threshold {args.threshold}, {dedupe.PERMUTATIONS} permutations, "
+        f"{dedupe.BANDS} bands x {dedupe.ROWS} rows"
+    )
+    print(
+        f"  {'books':>9s} {'minhash':>9s} {'lsh':>8s} {'total':>8s} "
+        f"{'per book':>10s} {'candidates':>10s} {'planted found':>13s} {'other':>7s}"
+    )
+    for fraction in (0.25, 0.5, 1.0):
+        n = int(len(books) * fraction)
+        # Planted copies sit at the end; keep the same share in each prefix.
+        subset = books[: n - n // 100] + books[len(books) - n // 100 :]
+        offset = len(books) - n // 100 - (n - n // 100)
+        kept = {
+            (i, j - offset)
+            for i, j in planted
+            if i < n - n // 100 and j >= len(books) - n // 100
+        }
+        run(subset, kept, args.threshold)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--books", type=int, default=1000000)
+    parser.add_argument("--threshold", type=float, default=DEDUPE_THRESHOLD)
+    main(parser.parse_args())
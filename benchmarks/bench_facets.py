@@ -0,0 +1,136 @@
+"""
+Compare faceted listing against the separate requests the UI used to send.
+
+Seeds a synthetic catalog, then renders one result page with genre and decade
+facet counts in two ways:
+
+* ``separate``: the page, plus one ``page_size=1`` listing per genre and per
+  decade, reading each ``total``;
+* ``facets``: a single ``GET /api/books?facets=genre,decade``.
+
+Reports latency per page view and SQL statements per page view. The seeded
+rows are removed afterwards.
+
+    DATABASE_URL=postgresql+asyncpg://... python benchmarks/bench_facets.py
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.core.constants import GENRES  # noqa: E402
+from app.core.limiter import limiter  # noqa: E402
+from app.core.metrics import db_queries  # noqa: E402
+from app.db import Base  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+PREFIX = "facetbench"
+DECADES = range(1900, 2030, 10)
+
+
+async def seed(books: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            text(
+                "INSERT INTO authors(name) "
+                "SELECT :p || ' author ' || i FROM generate_series(1, 200) i"
+            ),
+            {"p": PREFIX},
+        )
+        await conn.execute(
+            text(
+                """
+                INSERT INTO books(title, author_id, genre, published_year)
+                SELECT :p || ' book ' || i,
+                       (SELECT id FROM authors
+                        WHERE name = :p || ' author ' || (i % 200 + 1)),
+                       (CAST(:genres AS book_genre[]))[i % 4 + 1],
+                       1900 + (i * 7919) % 125
+                FROM generate_series(1, :n) i
+                """
+            ),
+            {"p": PREFIX, "n": books, "genres": list(GENRES)},
+        )
+        await conn.execute(text("ANALYZE books"))
+
+
+async def cleanup() -> None:
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("DELETE FROM books WHERE title LIKE :p"), {"p": f"{PREFIX} book %"}
+        )
+        await conn.execute(
+            text("DELETE FROM authors WHERE name LIKE :p"),
+            {"p": f"{PREFIX} author %"},
+        )
+
+
+async def separate(client: AsyncClient, base: str) -> dict:
+    page = (await client.get(base)).json()
+    counts = {"genre": {}, "decade": {}}
+    for genre in GENRES:
+        resp = await client.get(f"{base}&genre={genre}&page_size=1")
+        counts["genre"][genre] = resp.json()["total"]
+    for decade in DECADES:
+        resp = await client.get(
+            f"{base}&year_from={max(decade, 1800)}&year_to={decade + 9}&page_size=1"
+        )
+        counts["decade"][str(decade)] = resp.json()["total"]
+    page["facets"] = counts
+    return page
+
+
+async def faceted(client: AsyncClient, base: str) -> dict:
+    return (await client.get(f"{base}&facets=genre,decade")).json()
+
+
+async def measure(fn, client, base: str, views: int) -> tuple[float, float]:
+    before = db_queries.get("repo_books.list_books")
+    samples = []
+    for _ in range(views):
+        start = time.perf_counter()
+        await fn(client, base)
+        samples.append(time.perf_counter() - start)
+    statements = (db_queries.get("repo_books.list_books") - before) / views
+    return statistics.median(samples), statements
+
+
+async def main(args) -> None:
+    limiter.enabled = False
+    await seed(args.books)
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            base = f"/api/books?title={PREFIX}&page_size=20"
+            a, b = await separate(client, base), await faceted(client, base)
+            nonzero = {k: v for k, v in a["facets"]["decade"].items() if v}
+            assert a["facets"]["genre"] == b["facets"]["genre"]
+            assert nonzero == b["facets"]["decade"], (nonzero, b["facets"]["decade"])
+
+            print(f"{args.books} books, {args.views} page views per mode")
+            for name, fn in (("separate", separate), ("facets", faceted)):
+                latency, statements = await measure(fn, client, base, args.views)
+                print(
+                    f"  {name:8s} {latency * 1000:8.1f} ms/view  "
+                    f"{statements:5.1f} statements/view"
+                )
+    finally:
+        await cleanup()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--books", type=int, default=50000)
+    parser.add_argument("--views", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,159 @@
+"""
+Storage and filtered-list latency of books.genre as text vs the book_genre enum.
+
+Builds two copies of the books table in a scratch schema, identical except
+for the genre column: ``text`` with the old CHECK constraint, or a
+``book_genre`` enum. Both hold the same rows and the same (genre, sort key, id)
+covering indexes. The script reports table and index sizes, then the
+latency of the two genre + year-range reads the list endpoint issues: a
+20-row page and its count. The schema is dropped afterwards.
+
+    DATABASE_URL=postgresql+asyncpg://... python benchmarks/bench_genre_encoding.py
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.core.constants import GENRES  # noqa: E402
+from app.db.session import engine  # noqa: E402
+
+SCHEMA = "genre_bench"
+VALUES = ", ".join(f"'{genre}'" for genre in GENRES)
+GENRE_TYPES = {"text": "TEXT", "enum": f"{SCHEMA}.book_genre"}
+INDEXES = {
+    "title": ("title", "author_sort, published_year, created_at, updated_at"),
+    "author": ("author_sort", "title, published_year, created_at, updated_at"),
+    "year": ("published_year", "title, author_sort, created_at, updated_at"),
+}
+PAGE = """
+    SELECT id, title, author_sort AS author, genre, published_year,
+           created_at::text, updated_at::text
+    FROM {table}
+    WHERE genre = :genre AND published_year BETWEEN :lo AND :hi
+    ORDER BY title, id
+    LIMIT 20
+"""
+COUNT = """
+    SELECT COUNT(*) FROM {table}
+    WHERE genre = :genre AND published_year BETWEEN :lo AND :hi
+"""
+
+
+async def build(books: int) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.execute(text(f"CREATE TYPE {SCHEMA}.book_genre AS ENUM ({VALUES})"))
+        for name, genre_type in GENRE_TYPES.items():
+            table = f"{SCHEMA}.books_{name}"
+            check = f"CHECK (genre IN ({VALUES}))" if name == "text" else ""
+            await conn.execute(
+                text(
+                    f"""
+                    CREATE TABLE {table} (
+                        id BIGINT PRIMARY KEY,
+                        title TEXT NOT NULL,
+                        author_id BIGINT NOT NULL,
+                        author_sort TEXT NOT NULL,
+                        genre {genre_type} NOT NULL {check},
+                        published_year INTEGER NOT NULL,
+                        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                        updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+                    )
+                    """
+                )
+            )
+            await conn.execute(
+                text(
+                    f"""
+                    INSERT INTO {table}
+                        (id, title, author_id, author_sort, genre, published_year)
+                    SELECT i, 'book ' || md5(i::text), i % 5000,
+                           'author ' || (i % 5000),
+                           CAST((ARRAY[{VALUES}])[i % 4 + 1] AS {genre_type}),
+                           1800 + (i::bigint * 7919) % 225
+                    FROM generate_series(1, :n) i
+                    """
+                ),
+                {"n": books},
+            )
+            for index, (key, include) in INDEXES.items():
+                await conn.execute(
+                    text(
+                        f"CREATE INDEX books_{name}_genre_{index} ON {table} "
+                        f"(genre, {key}, id) INCLUDE ({include})"
+                    )
+                )
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for name in GENRE_TYPES:
+            await conn.execute(text(f"VACUUM ANALYZE {SCHEMA}.books_{name}"))
+
+
+async def sizes(name: str) -> tuple[int, int]:
+    async with engine.connect() as conn:
+        row = (
+            await conn.execute(
+                text(
+                    "SELECT pg_table_size(CAST(:t AS regclass)), "
+                    "pg_indexes_size(CAST(:t AS regclass))"
+                ),
+                {"t": f"{SCHEMA}.books_{name}"},
+            )
+        ).one()
+    return row[0], row[1]
+
+
+async def latency(sql: str, name: str, runs: int) -> tuple[float, float]:
+    statement = text(sql.format(table=f"{SCHEMA}.books_{name}"))
+    rng = random.Random(42)
+    samples = []
+    async with engine.connect() as conn:
+        for i in range(runs + 10):
+            lo = rng.randrange(1800, 2000)
+            params = {"genre": rng.choice(GENRES), "lo": lo, "hi": lo + 25}
+            start = time.perf_counter()
+            (await conn.execute(statement, params)).all()
+            if i >= 10:
+                samples.append(time.perf_counter() - start)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95)]
+
+
+async def main(args) -> None:
+    await build(args.books)
+    try:
+        print(f"{args.books} books, {args.runs} filtered reads per query")
+        print(
+            f"  {'genre':6s} {'table MB':>9s} {'index MB':>9s} "
+            f"{'page p50':>9s} {'page p95':>9s} {'count p50':>10s} {'count p95':>10s}"
+        )
+        for name in GENRE_TYPES:
+            table_size, index_size = await sizes(name)
+            page = await latency(PAGE, name, args.runs)
+            count = await latency(COUNT, name, args.runs)
+            print(
+                f"  {name:6s} {table_size / 2**20:9.1f} {index_size / 2**20:9.1f} "
+                f"{page[0] * 1000:7.2f}ms {page[1] * 1000:7.2f}ms "
+                f"{count[0] * 1000:8.2f}ms {count[1] * 1000:8.2f}ms"
+            )
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--books", type=int, default=500000)
+    parser.add_argument("--runs", type=int, default=300)
+    asyncio.run(main(parser.parse_args()))
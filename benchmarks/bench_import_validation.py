@@ -0,0 +1,102 @@
+"""
+Row-by-row versus batched validation of import records.
+
+Writes a CSV file of ``--rows`` book records (no database needed), about 5%
+of them invalid in different ways (unknown genre, year before 1800 or not a
+number, empty fields), parses it as ``import_books`` does, and times
+``record_ok`` over every row against ``records_ok`` over the whole batch,
+checking that both give the same verdicts. The same records with integer
+years, as a JSON import yields them, are timed too.
+
+    python benchmarks/bench_import_validation.py --rows 1000000
+"""
+
+import argparse
+import csv
+import io
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.constants import GENRES  # noqa: E402
+from app.services.books_service import record_ok, records_ok  # noqa: E402
+
+INVALID = (
+    ("genre", "Poetry"),
+    ("genre", ""),
+    ("published_year", "1750"),
+    ("published_year", "19x9"),
+    ("published_year", ""),
+)
+
+
+def write_file(path: Path, n: int, rng: random.Random) -> None:
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["title", "author", "genre", "published_year"])
+        for i in range(n):
+            row = {
+                "title": f"Title {i}",
+                "author": f"Author {rng.randrange(n // 20 + 1)}",
+                "genre": rng.choice(GENRES),
+                "published_year": str(rng.randint(1800, 2024)),
+            }
+            if rng.random() < 0.05:
+                key, value = rng.choice(INVALID)
+                row[key] = value
+            writer.writerow(row.values())
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def compare(label: str, records: list, repeat: int) -> None:
+    expected = [record_ok(rec) for rec in records]
+    assert records_ok(records).tolist() == expected, "verdicts differ"
+    loop = timed(lambda: [record_ok(rec) for rec in records], repeat)
+    batch = timed(lambda: records_ok(records), repeat)
+    print(
+        f"  {label:5s} {len(records):9d} {len(records) - sum(expected):8d} "
+        f"{loop * 1e3:9.0f}ms {batch * 1e3:9.0f}ms {loop / batch:7.1f}x"
+    )
+
+
+def main(args) -> None:
+    rng = random.Random(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "books.csv"
+        write_file(path, args.rows, rng)
+        size = path.stat().st_size
+        content = path.read_bytes()
+    t0 = time.perf_counter()
+    records = list(csv.DictReader(io.StringIO(content.decode("utf-8"))))
+    parse_s = time.perf_counter() - t0
+    print(f"{len(records)} rows, {size / 2**20:.0f} MiB, parsed in {parse_s:.2f}s")
+
+    print(
+        f"  {'file':5s} {'rows':>9s} {'invalid':>8s} {'record_ok':>11s} "
+        f"{'records_ok':>11s} {'speedup':>8s}"
+    )
+    compare("csv", records, args.repeat)
+    for rec in records:
+        if rec["published_year"].isdigit():
+            rec["published_year"] = int(rec["published_year"])
+    compare("json", records, args.repeat)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
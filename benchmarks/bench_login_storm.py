@@ -0,0 +1,96 @@
+"""
+p99 latency of GET /api/books while a login storm is running.
+
+Runs the app in-process against the database in DATABASE_URL. Compares
+bcrypt on the event loop (the previous behaviour, emulated by running the
+hasher inline) against the bounded hashing thread pool.
+
+    DATABASE_URL=postgresql+asyncpg://... python benchmarks/bench_login_storm.py
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+
+from app.core import security  # noqa: E402
+from app.core.limiter import limiter  # noqa: E402
+from app.db import Base  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+async def run_inline(fn, *args):
+    return fn(*args)
+
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def storm(client: AsyncClient, creds: dict, logins: int, duration: float):
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async def login_loop():
+        while time.perf_counter() < deadline:
+            resp = await client.post("/api/auth/login", json=creds)
+            assert resp.status_code in (200, 503), resp.text
+
+    async def reader():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            resp = await client.get("/api/books?page_size=10")
+            latencies.append(time.perf_counter() - start)
+            assert resp.status_code == 200, resp.text
+            await asyncio.sleep(0.005)
+
+    await asyncio.gather(reader(), *(login_loop() for _ in range(logins)))
+    return latencies
+
+
+async def main(args) -> None:
+    limiter.enabled = False
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        creds = {
+            "email": f"storm_{uuid.uuid4().hex[:8]}@example.com",
+            "password": "password123",
+        }
+        resp = await client.post("/api/auth/register", json=creds)
+        assert resp.status_code == 201, resp.text
+
+        print(
+            f"{args.logins} concurrent login loops, {args.duration:.0f}s per mode, "
+            f"bcrypt rounds={security.settings.BCRYPT_ROUNDS}, "
+            f"hash workers={security.hasher.workers}"
+        )
+        pooled_run = security.hasher.run
+        for mode in ("inline", "pooled"):
+            security.hasher.run = run_inline if mode == "inline" else pooled_run
+            samples = await storm(client, creds, args.logins, args.duration)
+            print(
+                f"  {mode:7s} GET /api/books: n={len(samples):5d} "
+                f"p50={statistics.median(samples) * 1000:8.1f}ms "
+                f"p99={percentile(samples, 0.99) * 1000:8.1f}ms"
+            )
+        security.hasher.run = pooled_run
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,115 @@
+"""
+Measure the per-request overhead of MetricsMiddleware.
+
+Drives ``GET /api/books/{book_id}`` through the real router and database,
+with and without the middleware, by calling the ASGI app directly (no HTTP
+server or client in the loop). Rounds alternate between the two variants and
+the median round is reported. Because end-to-end numbers are noisy at the
+microsecond level, the middleware is also timed in isolation around a no-op
+app, and that cost relative to the real request latency is checked against
+the budget.
+
+    DATABASE_URL=postgresql+asyncpg://... python benchmarks/bench_metrics_overhead.py
+
+Exits non-zero when the overhead exceeds ``--budget`` percent.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import FastAPI  # noqa: E402
+
+from app.api.router import api_router  # noqa: E402
+from app.core.limiter import limiter  # noqa: E402
+from app.core.middleware import MetricsMiddleware  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from benchmarks.common import call, delete_book, noop_app, seed_book  # noqa: E402
+
+
+def build_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware)
+    app.include_router(api_router, prefix="/api")
+    return app
+
+
+async def isolated_cost(path: str, requests: int) -> float:
+    """
+    Seconds per request added by the middleware itself.
+    """
+    wrapped = MetricsMiddleware(noop_app)
+    route = next(r for r in api_router.routes if r.path == "/books/{book_id}")
+    scope = {"type": "http", "method": "GET", "path": path, "route": route}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    timings = {}
+    for name, app in (("bare", noop_app), ("wrapped", wrapped)):
+        start = time.perf_counter()
+        for _ in range(requests):
+            await app(dict(scope), receive, send)
+        timings[name] = (time.perf_counter() - start) / requests
+    return timings["wrapped"] - timings["bare"]
+
+
+async def run_round(app: FastAPI, path: str, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        status = await call(app, path)
+        assert status == 200, status
+    return (time.perf_counter() - start) / requests
+
+
+async def main(args) -> int:
+    limiter.enabled = False
+    book_id = await seed_book()
+    path = f"/api/books/{book_id}"
+    plain, instrumented = build_app(False), build_app(True)
+
+    await run_round(plain, path, 200)
+    await run_round(instrumented, path, 200)
+
+    plain_rounds, instrumented_rounds = [], []
+    for _ in range(args.rounds):
+        plain_rounds.append(await run_round(plain, path, args.requests))
+        instrumented_rounds.append(await run_round(instrumented, path, args.requests))
+
+    base = statistics.median(plain_rounds)
+    with_metrics = statistics.median(instrumented_rounds)
+    end_to_end = (with_metrics - base) / base * 100
+    cost = statistics.median([await isolated_cost(path, 20000) for _ in range(5)])
+    overhead = cost / base * 100
+    print(f"GET {path}: {args.rounds} rounds x {args.requests} requests")
+    print(f"  without metrics: {base * 1e6:9.1f} us/req ({1 / base:8.0f} req/s)")
+    print(
+        f"  with metrics:    {with_metrics * 1e6:9.1f} us/req "
+        f"({1 / with_metrics:8.0f} req/s)"
+    )
+    print(f"  end-to-end diff: {end_to_end:+.2f}% (includes run-to-run noise)")
+    print(f"  middleware cost: {cost * 1e6:9.2f} us/req in isolation")
+    print(
+        f"  overhead:        {overhead:.2f}% of request latency (budget {args.budget:.1f}%)"
+    )
+
+    await delete_book(book_id)
+    await engine.dispose()
+    return 0 if overhead <= args.budget else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=15)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--budget", type=float, default=2.0)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,160 @@
+"""
+Report what each middleware layer costs on GET /api/books/{book_id}.
+
+Builds the application stack one layer at a time, in the order used by
+``app.main`` (rate limiting innermost, metrics outermost), and drives the
+real router and database through the ASGI interface. Rounds alternate
+between the stacks and the median round is reported as requests per second.
+Each layer is also timed in isolation around a no-op app, next to a no-op
+``BaseHTTPMiddleware`` for reference.
+
+    DATABASE_URL=postgresql+asyncpg://... python benchmarks/bench_middleware_layers.py
+"""
+
+import argparse
+import asyncio
+import itertools
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.exceptions import RequestValidationError  # noqa: E402
+from starlette.exceptions import HTTPException as StarletteHTTPException  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.api.router import api_router  # noqa: E402
+from app.core.errors import (  # noqa: E402
+    generic_exception_handler,
+    http_exception_handler,
+    rate_limit_handler,
+    validation_exception_handler,
+)
+from app.core.limiter import MemoryBackend, RateLimiter, RateLimitExceeded  # noqa: E402
+from app.core.middleware import (  # noqa: E402
+    MetricsMiddleware,
+    RateLimitMiddleware,
+    ServerTimingMiddleware,
+    TracingMiddleware,
+)
+from app.db.session import engine  # noqa: E402
+from benchmarks.common import call, delete_book, noop_app, seed_book  # noqa: E402
+
+limiter = RateLimiter(MemoryBackend(max_keys=100000))
+LAYERS = [
+    ("rate limit", RateLimitMiddleware),
+    ("server timing", ServerTimingMiddleware),
+    ("tracing", TracingMiddleware),
+    ("metrics", MetricsMiddleware),
+]
+# Every request comes from a fresh address so the 30/minute quota never trips.
+clients = (f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in itertools.count())
+
+
+def build_app(layers: int) -> FastAPI:
+    app = FastAPI()
+    for _, middleware in LAYERS[:layers]:
+        if middleware is RateLimitMiddleware:
+            app.add_middleware(middleware, routes=app.router.routes, limiter=limiter)
+        else:
+            app.add_middleware(middleware)
+    app.add_exception_handler(StarletteHTTPException, http_exception_handler)
+    app.add_exception_handler(RequestValidationError, validation_exception_handler)
+    app.add_exception_handler(Exception, generic_exception_handler)
+    app.add_exception_handler(RateLimitExceeded, rate_limit_handler)
+    app.include_router(api_router, prefix="/api")
+    return app
+
+
+async def run_round(app: FastAPI, path: str, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        status = await call(app, path, next(clients))
+        assert status == 200, status
+    return (time.perf_counter() - start) / requests
+
+
+class NoopBaseHTTPMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        return await call_next(request)
+
+
+async def isolated_costs(path: str, requests: int) -> dict:
+    """
+    Seconds per request added by each middleware around a no-op app.
+    """
+    route = next(r for r in api_router.routes if r.path == "/books/{book_id}")
+    routes = [type(route)("/api" + route.path, route.endpoint, methods=["GET"])]
+    wrapped = {
+        "rate limit": RateLimitMiddleware(noop_app, routes=routes, limiter=limiter),
+        "server timing": ServerTimingMiddleware(noop_app),
+        "tracing": TracingMiddleware(noop_app),
+        "metrics": MetricsMiddleware(noop_app),
+        "BaseHTTPMiddleware (no-op)": NoopBaseHTTPMiddleware(noop_app),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    async def per_request(app) -> float:
+        start = time.perf_counter()
+        for _ in range(requests):
+            scope = {
+                "type": "http",
+                "method": "GET",
+                "path": path,
+                "headers": [],
+                "client": (next(clients), 1),
+                "route": route,
+            }
+            await app(scope, receive, send)
+        return (time.perf_counter() - start) / requests
+
+    bare = await per_request(noop_app)
+    return {name: await per_request(app) - bare for name, app in wrapped.items()}
+
+
+async def main(args) -> None:
+    book_id = await seed_book()
+    path = f"/api/books/{book_id}"
+    stacks = [build_app(n) for n in range(len(LAYERS) + 1)]
+    for app in stacks:
+        await run_round(app, path, 100)
+
+    rounds = [[] for _ in stacks]
+    for _ in range(args.rounds):
+        for i, app in enumerate(stacks):
+            rounds[i].append(await run_round(app, path, args.requests))
+    medians = [statistics.median(r) for r in rounds]
+
+    print(f"GET {path}: {args.rounds} rounds x {args.requests} requests per stack")
+    names = ["router only"] + [f"+ {name}" for name, _ in LAYERS]
+    for i, (name, seconds) in enumerate(zip(names, medians)):
+        delta = "" if i == 0 else f"  ({(seconds - medians[i - 1]) * 1e6:+7.1f} us)"
+        print(
+            f"  {name:16s} {1 / seconds:8.0f} req/s  {seconds * 1e6:8.1f} us/req{delta}"
+        )
+
+    costs = {}
+    for _ in range(5):
+        for name, cost in (await isolated_costs(path, 5000)).items():
+            costs.setdefault(name, []).append(cost)
+    print("  isolated cost per layer:")
+    for name, samples in costs.items():
+        print(f"    {name:28s} {statistics.median(samples) * 1e6:7.2f} us/req")
+
+    await delete_book(book_id)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=300)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,92 @@
+"""
+Measure the per-request cost of the rate limiter.
+
+Times ``RateLimiter.hit`` for each counter backend, once for anonymous
+requests (keyed on the client address) and once for bearer-token requests
+(keyed on the JWT subject, with the verified-token cache cold and warm).
+Also checks that the in-memory backend stays bounded under a key flood.
+
+    DATABASE_URL=postgresql+asyncpg://... python benchmarks/bench_rate_limiter.py
+    python benchmarks/bench_rate_limiter.py --redis-url redis://localhost:6379/0
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.limiter import (  # noqa: E402
+    MemoryBackend,
+    Rate,
+    RateLimiter,
+    RedisBackend,
+    SharedMemoryBackend,
+)
+from app.core.security import create_access_token, token_cache  # noqa: E402
+from app.schemas.user import UserOut  # noqa: E402
+
+RATE = Rate(10**9, 60)
+
+
+def scope(token: str = None) -> dict:
+    headers = [(b"host", b"bench")]
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    return {"type": "http", "headers": headers, "client": ("10.0.0.1", 5000)}
+
+
+async def per_hit(limiter: RateLimiter, request: dict, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        await limiter.hit(request, "bench", RATE)
+    return (time.perf_counter() - start) / n
+
+
+async def main(args) -> None:
+    backends = {
+        "memory": MemoryBackend(args.max_keys),
+        "shm": SharedMemoryBackend(
+            str(Path(tempfile.gettempdir()) / "bench-ratelimit"), 65536
+        ),
+    }
+    if args.redis_url:
+        backends["redis"] = RedisBackend(args.redis_url)
+
+    token = create_access_token({"sub": "42"})
+    user = UserOut(
+        id=42, email="bench@example.com", created_at=datetime.now(timezone.utc)
+    )
+    print(f"{args.requests} checks per case")
+    for name, backend in backends.items():
+        limiter = RateLimiter(backend)
+        n = args.requests if name != "redis" else max(1, args.requests // 20)
+        token_cache.clear()
+        anon = await per_hit(limiter, scope(), n)
+        cold = await per_hit(limiter, scope(token), n)
+        token_cache.put(token, user, time.time() + 3600)
+        warm = await per_hit(limiter, scope(token), n)
+        print(
+            f"  {name:6s} anonymous {anon * 1e6:7.2f} us  "
+            f"jwt {cold * 1e6:7.2f} us  jwt cached {warm * 1e6:7.2f} us"
+        )
+
+    flood = MemoryBackend(args.max_keys)
+    for i in range(args.max_keys * 5):
+        await flood.hit(f"ip:{i}", RATE, 0.0)
+    print(
+        f"  memory backend after {args.max_keys * 5} distinct keys: "
+        f"{len(flood)} entries (max {args.max_keys})"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--max-keys", type=int, default=10000)
+    parser.add_argument("--redis-url", default=None)
+    asyncio.run(main(parser.parse_args()))
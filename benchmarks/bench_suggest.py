@@ -0,0 +1,103 @@
+"""
+Memory and latency of the in-memory typeahead index.
+
+Builds a ``PrefixIndex`` of synthetic title-like keys (no database needed)
+and reports retained memory per key and per million keys, lookup latency
+by prefix length (cold, and repeated lookups, which hit the ranking cache
+for busy prefixes), and the cost of an incremental add/remove once the
+one- and two-letter rankings are cached.
+
+    python benchmarks/bench_suggest.py --keys 1000000
+"""
+
+import argparse
+import gc
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.db.suggestions import PrefixIndex  # noqa: E402
+
+SYLLABLES = ("ka ri mo ne sa to lu vi da pe or an el is un ber gor tha mil wen").split()
+
+
+def make_rows(n: int, rng: random.Random) -> list[tuple[str, int]]:
+    """``n`` distinct title-like values with a 1-20 book count each."""
+    words = list(
+        {
+            "".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))).title()
+            for _ in range(20000)
+        }
+    )
+    rows = []
+    for i in range(n):
+        title = " ".join(rng.choices(words, k=rng.randint(2, 4)))
+        rows.append((f"{title} {i}", rng.randint(1, 20)))
+    return rows
+
+
+def percentiles(samples: list[float]) -> tuple[float, float]:
+    samples = sorted(samples)
+    return statistics.median(samples), samples[int(len(samples) * 0.99)]
+
+
+def main(args) -> None:
+    rng = random.Random(7)
+    gc.collect()
+    tracemalloc.start()
+    rows = make_rows(args.keys, rng)
+    index = PrefixIndex()
+    start = time.perf_counter()
+    index.load(rows)
+    load_s = time.perf_counter() - start
+    sample_keys = [value for value, _ in rng.sample(rows, 2000)]
+    del rows
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    avg_key = statistics.mean(len(k) for k in sample_keys)
+    print(f"{len(index)} keys (avg {avg_key:.0f} chars), loaded in {load_s:.2f}s")
+    print(
+        f"  memory: {retained / len(index):.0f} B/key, "
+        f"{retained / len(index) * 1e6 / 2**20:.0f} MiB per million keys"
+    )
+
+    print(f"  {'prefix':>6s} {'cold p50':>10s} {'cold p99':>10s} {'warm p50':>9s}")
+    for length in range(1, 7):
+        prefixes = [key[:length] for key in rng.sample(sample_keys, 200)]
+        first, warm = [], []
+        for prefix in prefixes:
+            index._top.clear()
+            t0 = time.perf_counter()
+            index.suggest(prefix, 10)
+            t1 = time.perf_counter()
+            for _ in range(20):
+                index.suggest(prefix, 10)
+            t2 = time.perf_counter()
+            first.append(t1 - t0)
+            warm.append((t2 - t1) / 20)
+        (f50, f99), (w50, _) = percentiles(first), percentiles(warm)
+        print(f"  {length:6d} {f50 * 1e6:8.1f}µs {f99 * 1e6:8.1f}µs {w50 * 1e6:7.1f}µs")
+
+    samples = []
+    for i in range(500):
+        value = rng.choice(sample_keys)[:-1] + f"x{i}"
+        index.suggest(value[:1], 10), index.suggest(value[:2], 10)
+        t0 = time.perf_counter()
+        index.add(value, 1)
+        index.add(value, -1)
+        samples.append((time.perf_counter() - t0) / 2)
+    p50, p99 = percentiles(samples)
+    print(f"  add/remove: p50 {p50 * 1e6:.1f}µs, p99 {p99 * 1e6:.1f}µs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keys", type=int, default=1000000)
+    main(parser.parse_args())
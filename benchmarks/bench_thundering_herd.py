@@ -0,0 +1,94 @@
+"""
+Load test: DB query rate under a thundering herd of identical reads.
+
+Waves of concurrent clients request the same first page of
+``GET /api/books?genre=Fiction``, the same book and the same
+recommendations, with read coalescing off and on. For each mode it reports
+requests served, SQL statements issued, statements per request and the
+database query rate. A write between waves checks that no response served
+after it shows the old data.
+
+    DATABASE_URL=postgresql+asyncpg://... python benchmarks/bench_thundering_herd.py
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.core.limiter import limiter  # noqa: E402
+from app.core.metrics import db_queries  # noqa: E402
+from app.core.singleflight import book_reads  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from benchmarks.common import delete_book, seed_book  # noqa: E402
+
+FUNCTIONS = (
+    "repo_books.list_books",
+    "repo_books.get_book_by_id",
+    "books_service.recommend_books",
+)
+
+
+def queries() -> float:
+    return sum(db_queries.get(name) for name in FUNCTIONS)
+
+
+async def herd(client: AsyncClient, book_id: int, args) -> tuple[int, float]:
+    paths = [
+        "/api/books?genre=Fiction&page=1&page_size=10",
+        f"/api/books/{book_id}",
+        "/api/books/recommendations?by=genre&value=Fiction&limit=5",
+    ]
+    served, start = 0, time.perf_counter()
+    for wave in range(args.waves):
+        responses = await asyncio.gather(
+            *(client.get(paths[i % len(paths)]) for i in range(args.clients))
+        )
+        assert all(r.status_code == 200 for r in responses), responses[0].text
+        served += len(responses)
+        if wave == args.waves // 2:
+            title = f"Herd {wave}"
+            async with engine.begin() as conn:
+                await conn.execute(
+                    text("UPDATE books SET title = :t WHERE id = :id"),
+                    {"t": title, "id": book_id},
+                )
+            # Raw engine writes bypass the ORM session commit hook.
+            book_reads.invalidate()
+            resp = await client.get(paths[1])
+            assert resp.json()["title"] == title
+    return served, time.perf_counter() - start
+
+
+async def main(args) -> None:
+    limiter.enabled = False
+    book_id = await seed_book()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{args.waves} waves x {args.clients} concurrent clients")
+        for enabled in (False, True):
+            book_reads.enabled = enabled
+            before = queries()
+            served, elapsed = await herd(client, book_id, args)
+            issued = queries() - before
+            print(
+                f"  coalescing {'on ' if enabled else 'off'}: {served} requests, "
+                f"{issued:.0f} statements ({issued / served:.2f}/req), "
+                f"{issued / elapsed:7.0f} statements/s, {served / elapsed:6.0f} req/s"
+            )
+    await delete_book(book_id)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--waves", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,76 @@
+"""
+Helpers shared by the benchmark scripts.
+"""
+
+from fastapi import FastAPI
+from sqlalchemy import text
+
+from app.db import Base
+from app.db.session import engine
+
+
+async def seed_book() -> int:
+    """Create the schema if needed and insert one book; return its id."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        author_id = (
+            await conn.execute(
+                text(
+                    "INSERT INTO authors(name) VALUES ('Bench Author') "
+                    "ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name "
+                    "RETURNING id"
+                )
+            )
+        ).scalar_one()
+        return (
+            await conn.execute(
+                text(
+                    "INSERT INTO books(title, author_id, genre, published_year) "
+                    "VALUES ('Bench Book ' || md5(random()::text), :a, "
+                    "'Fiction', 2000) RETURNING id"
+                ),
+                {"a": author_id},
+            )
+        ).scalar_one()
+
+
+async def delete_book(book_id: int) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text("DELETE FROM books WHERE id = :id"), {"id": book_id})
+
+
+async def call(app: FastAPI, path: str, client: str = "127.0.0.1") -> int:
+    """
+    Run one GET through an ASGI app directly and return the status code.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": (client, 12345),
+        "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
@@ -9,9 +9,16 @@ from sqlalchemy.pool import NullPool
 from app.main import app
 from app.db import Base, get_db
 from app.core.config import settings
+from app.core.limiter import limiter
+from app.core.security import token_cache
+from app.db.author_cache import author_ids
+from app.db.book_events import asyncpg_dsn, book_events
+from app.db.suggestions import suggestions
 
 
 TEST_DB_URL = settings.TEST_DB_URL
+# Fail tests on @query_budget overruns whatever ENV the suite runs under.
+settings.QUERY_BUDGET_ENFORCE = True
 
 sync_engine = create_engine(TEST_DB_URL.replace("+asyncpg", ""))
 
@@ -45,6 +52,16 @@ async def clean_database():
     yield
 
 
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """Start every test with empty rate-limit windows and caches."""
+    limiter.reset()
+    token_cache.clear()
+    author_ids.clear()
+    suggestions.clear()
+    yield
+
+
 async def override_get_db():
     """Provide a test database session with rollback on failure."""
     async with TestingSessionLocal() as session:
@@ -59,6 +76,8 @@ async def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+# NOTIFY is per database: listen where the tests write.
+book_events.dsn = asyncpg_dsn(TEST_DB_URL)
 
 
 @pytest.fixture
@@ -69,9 +88,8 @@ async def client():
         yield ac
 
 
-@pytest.fixture
-async def auth_token(client):
-    """Generate a valid JWT token for a unique test user."""
+async def _register(client) -> tuple[str, str]:
+    """Register and log in a unique test user; return its email and token."""
     email = f"test_{uuid.uuid4().hex[:8]}@example.com"
     await client.post(
         "/api/auth/register", json={"email": email, "password": "password123"}
@@ -79,4 +97,19 @@ async def auth_token(client):
     resp = await client.post(
         "/api/auth/login", json={"email": email, "password": "password123"}
     )
-    return resp.json()["access_token"]
+    return email, resp.json()["access_token"]
+
+
+@pytest.fixture
+async def auth_token(client):
+    """Generate a valid JWT token for a unique test user."""
+    _, token = await _register(client)
+    return token
+
+
+@pytest.fixture
+async def admin_token(client, monkeypatch):
+    """Generate a valid JWT token for a unique user listed in ADMIN_EMAILS."""
+    email, token = await _register(client)
+    monkeypatch.setattr(settings, "ADMIN_EMAILS", f"ops@example.com, {email.upper()}")
+    return token
@@ -1,4 +1,14 @@
+import asyncio
+import time
+
 import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from sqlalchemy import text
+
+from app.core import security
+from app.core.security import PasswordHasher
+from tests.conftest import TestingSessionLocal
 
 
 @pytest.mark.asyncio
@@ -78,3 +88,126 @@ async def test_login_invalid(client):
     data = resp.json()
     assert data["error"]["code"] == 401
     assert "Invalid credentials" in data["error"]["message"]
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_when_cost_changes(client, monkeypatch):
+    """
+    Register with one bcrypt cost, then log in after the cost changed.
+    Expect: login succeeds and the stored hash is upgraded to the new cost.
+    """
+    monkeypatch.setattr(
+        security, "pwd_context", CryptContext(schemes=["bcrypt"], bcrypt__rounds=5)
+    )
+    creds = {"email": "rehash@example.com", "password": "password123"}
+    await client.post("/api/auth/register", json=creds)
+
+    monkeypatch.setattr(
+        security, "pwd_context", CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    )
+    resp = await client.post("/api/auth/login", json=creds)
+    assert resp.status_code == 200
+
+    async with TestingSessionLocal() as session:
+        stored = (
+            await session.execute(
+                text("SELECT hashed_password FROM users WHERE email = :e"),
+                {"e": creds["email"]},
+            )
+        ).scalar_one()
+    assert stored.startswith("$2b$04$")
+
+    resp = await client.post("/api/auth/login", json=creds)
+    assert resp.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_sheds_load_beyond_queue():
+    """
+    One hashing thread with room for one queued job, three concurrent calls.
+    Expect: two run in order, the third is rejected with 503 + Retry-After,
+    and the event loop stays responsive meanwhile.
+    """
+    hasher = PasswordHasher(workers=1, max_queue=1)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticking = asyncio.create_task(ticker())
+    results = await asyncio.gather(
+        hasher.run(time.sleep, 0.2),
+        hasher.run(time.sleep, 0.2),
+        hasher.run(time.sleep, 0.2),
+        return_exceptions=True,
+    )
+    ticking.cancel()
+
+    assert results[:2] == [None, None]
+    assert isinstance(results[2], HTTPException)
+    assert results[2].status_code == 503
+    assert results[2].headers["Retry-After"] == "1"
+    assert hasher.in_flight == 0
+    assert ticks >= 20
+
+
+async def _login(client, email: str) -> dict:
+    creds = {"email": email, "password": "password123"}
+    await client.post("/api/auth/register", json=creds)
+    resp = await client.post("/api/auth/login", json=creds)
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_verified_token_is_served_from_cache(client):
+    """
+    Call /me twice with the same token.
+    Expect: only the first call queries the database.
+    """
+    from app.core.metrics import db_queries
+
+    headers = await _login(client, "cached@example.com")
+    before = db_queries.get("security.get_current_user")
+    resp = await client.get("/api/auth/me", headers=headers)
+    assert resp.status_code == 200
+    after_first = db_queries.get("security.get_current_user")
+    resp = await client.get("/api/auth/me", headers=headers)
+    assert resp.status_code == 200
+
+    assert after_first == before + 1
+    assert db_queries.get("security.get_current_user") == after_first
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_token(client):
+    """
+    Log out, then reuse the token, also with an empty cache (another worker).
+    Expect: 401 in both cases.
+    """
+    headers = await _login(client, "logout@example.com")
+    assert (await client.get("/api/auth/me", headers=headers)).status_code == 200
+
+    resp = await client.post("/api/auth/logout", headers=headers)
+    assert resp.status_code == 200
+    assert (await client.get("/api/auth/me", headers=headers)).status_code == 401
+
+    security.token_cache.clear()
+    assert (await client.get("/api/auth/me", headers=headers)).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_deleted_user_token_is_rejected(client):
+    """
+    Delete the account of a user whose token is cached.
+    Expect: the token stops working immediately.
+    """
+    headers = await _login(client, "deleteme@example.com")
+    assert (await client.get("/api/auth/me", headers=headers)).status_code == 200
+
+    resp = await client.delete("/api/auth/me", headers=headers)
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "deleted"
+    assert (await client.get("/api/auth/me", headers=headers)).status_code == 401
@@ -0,0 +1,110 @@
+import pytest
+
+
+async def _create(client, headers, title, author, year=2000):
+    resp = await client.post(
+        "/api/books",
+        json={
+            "title": title,
+            "author": author,
+            "genre": "Fiction",
+            "published_year": year,
+        },
+        headers=headers,
+    )
+    assert resp.status_code == 200
+    return resp.json()["id"]
+
+
+async def _pages(client, query):
+    """Follow next_cursor until the last page; return the pages' items."""
+    pages, cursor = [], None
+    while True:
+        url = f"/api/authors?{query}" + (f"&cursor={cursor}" if cursor else "")
+        data = (await client.get(url)).json()
+        pages.append(data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.asyncio
+async def test_book_count_follows_book_writes(client, auth_token):
+    """
+    Create books for two authors, move one to the other author, then delete one.
+    Expect: each author's book_count tracks every write.
+    """
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    first = await _create(client, headers, "Foundation", "Asimov", 1951)
+    await _create(client, headers, "I, Robot", "Asimov", 1950)
+    other = await _create(client, headers, "Dune", "Herbert", 1965)
+
+    async def counts():
+        items = (await client.get("/api/authors")).json()["items"]
+        return {a["name"]: a["book_count"] for a in items}
+
+    assert await counts() == {"Asimov": 2, "Herbert": 1}
+    await client.put(f"/api/books/{other}", json={"author": "Asimov"}, headers=headers)
+    assert await counts() == {"Asimov": 3, "Herbert": 0}
+    await client.delete(f"/api/books/{first}", headers=headers)
+    assert await counts() == {"Asimov": 2, "Herbert": 0}
+
+
+@pytest.mark.asyncio
+async def test_authors_keyset_pagination_by_name_and_book_count(client, auth_token):
+    """
+    Create five authors with 0-2 books each and page through them two at a
+    time by name, and by book count descending.
+    Expect: pages cover every author once in sort order, ties on book_count
+    broken by id in the same direction, and the last page has no cursor.
+    """
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for i, (author, books) in enumerate(
+        [("Eco", 2), ("Borges", 1), ("Calvino", 2), ("Atwood", 1), ("Dick", 1)]
+    ):
+        for j in range(books):
+            await _create(client, headers, f"Book {i}-{j}", author)
+
+    pages = await _pages(client, "sort_by=name&limit=2")
+    assert [len(p) for p in pages] == [2, 2, 1]
+    names = [a["name"] for p in pages for a in p]
+    assert names == ["Atwood", "Borges", "Calvino", "Dick", "Eco"]
+
+    pages = await _pages(client, "sort_by=book_count&sort_order=desc&limit=2")
+    items = [a for p in pages for a in p]
+    keys = [(a["book_count"], a["id"]) for a in items]
+    assert len(keys) == 5 and keys == sorted(keys, reverse=True)
+    assert [a["name"] for a in items[:2]] == ["Calvino", "Eco"]
+
+
+@pytest.mark.asyncio
+async def test_author_detail_and_errors(client, auth_token):
+    """
+    Get an author with their books, an unknown author, and a listing with a
+    malformed or mismatched cursor.
+    Expect: books by title with the count; 404 for the unknown author; 400
+    for both cursors.
+    """
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    await _create(client, headers, "Ubik", "Dick", 1969)
+    await _create(client, headers, "Valis", "Dick", 1981)
+    await _create(client, headers, "Solaris", "Lem", 1961)
+
+    listed = (await client.get("/api/authors?sort_by=name&limit=1")).json()
+    author_id = listed["items"][0]["id"]
+    resp = await client.get(f"/api/authors/{author_id}?books_limit=1")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["name"] == "Dick" and data["book_count"] == 2
+    assert [b["title"] for b in data["books"]] == ["Ubik"]
+    assert set(data["books"][0]) == {"id", "title", "genre", "published_year"}
+
+    resp = await client.get("/api/authors/999999")
+    assert resp.status_code == 404
+
+    resp = await client.get("/api/authors?cursor=not-a-cursor")
+    assert resp.status_code == 400
+    resp = await client.get(
+        f"/api/authors?sort_by=book_count&cursor={listed['next_cursor']}"
+    )
+    assert resp.status_code == 400
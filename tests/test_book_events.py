@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from app.db.book_events import BookEvents, book_events
+from app.main import app
+
+
+def _events(chunks: list[bytes]) -> list[dict]:
+    """Parse SSE messages with an ``event:`` line out of the received chunks."""
+    events = []
+    for block in b"".join(chunks).decode().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if line)
+        if "event" in fields:
+            events.append(fields)
+    return events
+
+
+@pytest.mark.asyncio
+async def test_replay_resume_and_slow_subscriber_drop():
+    """
+    Publish events past the replay buffer and one subscriber's queue.
+    Expect: resuming within the buffer replays the missed events, an older
+    or foreign id gets a reset, a full subscriber is dropped while others
+    keep receiving, and a quiet stream sends heartbeats.
+    """
+    events = BookEvents("", replay_size=3, queue_size=2, heartbeat=0.01)
+    slow, _ = events.subscribe()
+    for book_id in range(1, 6):
+        events.publish("create", book_id)
+    assert slow.dropped and slow not in events.subscribers
+
+    stream_id = events.stream_id
+    _, replay = events.subscribe(f"{stream_id}:3")
+    assert [e["id"] for e in _events(replay)] == [f"{stream_id}:4", f"{stream_id}:5"]
+    assert _events(replay)[0]["data"] == '{"op": "create", "id": 4}'
+    for stale in (f"{stream_id}:1", "other:4", "garbage"):
+        _, replay = events.subscribe(stale)
+        assert [e["event"] for e in _events(replay)] == ["reset"]
+    _, replay = events.subscribe(f"{stream_id}:5")
+    assert replay == []
+
+    live, replay = events.subscribe()
+    body = events.stream(live, replay)
+    assert (await anext(body)).startswith(b"retry:")
+    events.publish("delete", 2)
+    assert b"event: delete" in await anext(body)
+    assert await anext(body) == b": ping\n\n"
+    await body.aclose()
+    assert live not in events.subscribers
+
+
+@pytest.mark.asyncio
+async def test_event_stream_delivers_committed_writes(client, auth_token):
+    """
+    Open GET /api/books/events, then create, update and delete a book.
+    Expect: create, update and delete events for the book in order with
+    increasing ids, and a reconnect from the first id replays the others.
+    """
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    chunks, disconnect = [], asyncio.Event()
+
+    async def receive():
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200
+        elif message.get("body"):
+            chunks.append(message["body"])
+
+    async def wait_for_events(n):
+        for _ in range(200):
+            if len(_events(chunks)) >= n:
+                return _events(chunks)
+            await asyncio.sleep(0.01)
+        raise AssertionError(f"expected {n} events, got {_events(chunks)}")
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/books/events",
+        "raw_path": b"/api/books/events",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"test")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("test", 80),
+    }
+    streaming = asyncio.create_task(app(scope, receive, send))
+    try:
+        for _ in range(200):
+            if chunks:
+                break
+            await asyncio.sleep(0.01)
+        assert chunks and chunks[0].startswith(b"retry:")
+
+        resp = await client.post(
+            "/api/books",
+            json={
+                "title": "Kindred",
+                "author": "Butler",
+                "genre": "Fiction",
+                "published_year": 1979,
+            },
+            headers=headers,
+        )
+        book_id = resp.json()["id"]
+        await client.put(
+            f"/api/books/{book_id}", json={"title": "Dawn"}, headers=headers
+        )
+        await client.delete(f"/api/books/{book_id}", headers=headers)
+
+        events = await wait_for_events(3)
+        assert [e["event"] for e in events] == ["create", "update", "delete"]
+        assert all(f'"id": {book_id}' in e["data"] for e in events)
+        seqs = [int(e["id"].split(":")[1]) for e in events]
+        assert seqs == sorted(seqs) and len(set(seqs)) == 3
+
+        _, replay = book_events.subscribe(events[0]["id"])
+        assert [e["event"] for e in _events(replay)] == ["update", "delete"]
+    finally:
+        disconnect.set()
+        await asyncio.wait_for(streaming, 5)
+        await book_events.close()
@@ -139,6 +139,141 @@ async def test_list_books_with_filters(client, auth_token):
     assert all(item["genre"] == "Fiction" for item in data["items"])
 
 
+@pytest.mark.asyncio
+async def test_list_books_with_unknown_genre_is_empty(client, auth_token):
+    """
+    Filter the listing by a genre that is not one of GENRES.
+    Expect: 200 OK with no items, as before genres became a Postgres enum.
+    """
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    await client.post(
+        "/api/books",
+        json={
+            "title": "Enum Book",
+            "author": "Author1",
+            "genre": "Science",
+            "published_year": 2001,
+        },
+        headers=headers,
+    )
+
+    resp = await client.get("/api/books?genre=Poetry&facets=genre")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["items"] == [] and data["total"] == 0
+    assert data["facets"] == {"genre": {}}
+
+    resp = await client.get("/api/books?genre=Science")
+    assert [item["genre"] for item in resp.json()["items"]] == ["Science"]
+
+
+@pytest.mark.asyncio
+async def test_list_books_with_facets(client, auth_token):
+    """
+    List books filtered by year with genre, decade and author facets.
+    Expect: counts cover the filtered set, the page is unchanged, and
+    everything comes back in the two statements of a plain listing.
+    """
+    from app.core.metrics import db_queries
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for title, author, genre, year in [
+        ("Facet A", "Writer1", "Fiction", 1991),
+        ("Facet B", "Writer1", "Fiction", 2004),
+        ("Facet C", "Writer2", "History", 2008),
+        ("Facet D", "Writer2", "Science", 1975),
+    ]:
+        await client.post(
+            "/api/books",
+            json={
+                "title": title,
+                "author": author,
+                "genre": genre,
+                "published_year": year,
+            },
+            headers=headers,
+        )
+
+    plain = await client.get("/api/books?year_from=1990&page_size=2")
+    assert "facets" not in plain.json()
+
+    before = db_queries.get("repo_books.list_books")
+    resp = await client.get(
+        "/api/books?year_from=1990&page_size=2&facets=genre,decade,author"
+    )
+    assert resp.status_code == 200
+    assert db_queries.get("repo_books.list_books") == before + 2
+    data = resp.json()
+    assert data["items"] == plain.json()["items"]
+    assert data["total"] == 3
+    assert data["facets"] == {
+        "genre": {"Fiction": 2, "History": 1},
+        "decade": {"1990": 1, "2000": 2},
+        "author": {"Writer1": 2, "Writer2": 1},
+    }
+
+    resp = await client.get("/api/books?facets=genre,price")
+    assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_sparse_fields_skip_unneeded_columns_and_join(client, auth_token):
+    """
+    List, get and batch-read books with fields=id,title, then list them with
+    an author filter.
+    Expect: items carry only id and title, and authors are joined only when
+    the author filter needs them.
+    """
+    from app.db.instrumentation import slow_query_log
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    ids = []
+    for title in ("Sparse A", "Sparse B"):
+        resp = await client.post(
+            "/api/books",
+            json={
+                "title": title,
+                "author": "Trimmer",
+                "genre": "Science",
+                "published_year": 2001,
+            },
+            headers=headers,
+        )
+        ids.append(resp.json()["id"])
+
+    threshold = slow_query_log.threshold_ms
+    slow_query_log.threshold_ms = 0
+    slow_query_log.entries.clear()
+    try:
+        resp = await client.get("/api/books?fields=id,title")
+        assert resp.json()["items"] == [
+            {"id": ids[0], "title": "Sparse A"},
+            {"id": ids[1], "title": "Sparse B"},
+        ]
+        resp = await client.get(f"/api/books/{ids[0]}?fields=title,id,title")
+        assert resp.json() == {"id": ids[0], "title": "Sparse A"}
+        resp = await client.get(f"/api/books/batch?ids={ids[1]},0,{ids[0]}&fields=id")
+        assert resp.json() == [{"id": ids[1]}, {"id": ids[0]}]
+        sparse = [e["sql"] for e in slow_query_log.entries]
+
+        slow_query_log.entries.clear()
+        resp = await client.get("/api/books?fields=title&author=trim")
+        assert resp.json()["total"] == 2
+        filtered = [e["sql"] for e in slow_query_log.entries]
+    finally:
+        slow_query_log.threshold_ms = threshold
+        slow_query_log.entries.clear()
+
+    assert len(sparse) == 4
+    assert not any("authors" in sql or "created_at" in sql for sql in sparse)
+    assert len(filtered) == 2 and all("JOIN authors" in sql for sql in filtered)
+
+    resp = await client.get("/api/books?fields=id,price")
+    assert resp.status_code == 422
+    resp = await client.get("/api/books/batch?ids=" + ",".join(map(str, range(101))))
+    assert resp.status_code == 422
+
+
 @pytest.mark.asyncio
 async def test_update_book_success(client, auth_token):
     """
@@ -0,0 +1,179 @@
+import gzip
+import zlib
+
+import pytest
+
+from app.core.compression import GzipEncoder, bulk, negotiate
+from app.core.middleware import CompressionMiddleware
+
+LEVELS = {"gzip": {"default": 6, "bulk": 1}, "br": {"default": 4, "bulk": 1}}
+
+
+def _app(chunks, content_type=b"text/csv", endpoint=None):
+    async def app(scope, receive, send):
+        if endpoint is not None:
+            scope["route"] = type("Route", (), {"endpoint": endpoint})()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", content_type)],
+            }
+        )
+        for i, chunk in enumerate(chunks):
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": i < len(chunks) - 1,
+                }
+            )
+
+    return app
+
+
+async def _run(app, accept="gzip", **kwargs):
+    kwargs.setdefault("minimum_size", 1024)
+    kwargs.setdefault("levels", LEVELS)
+    middleware = CompressionMiddleware(app, **kwargs)
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", accept.encode())],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    headers = dict(messages[0]["headers"])
+    return headers, [m["body"] for m in messages[1:]]
+
+
+def test_negotiate_honours_q_values_and_wildcard():
+    """
+    Negotiate several Accept-Encoding headers against br and gzip.
+    Expect: highest q wins, ties prefer br, q=0 refuses, * covers the rest.
+    """
+    assert negotiate("gzip, br", ("br", "gzip")) == "br"
+    assert negotiate("gzip, br;q=0.5", ("br", "gzip")) == "gzip"
+    assert negotiate("br;q=0, *", ("br", "gzip")) == "gzip"
+    assert negotiate("identity", ("br", "gzip")) is None
+    assert negotiate("", ("br", "gzip")) is None
+    assert negotiate("GZIP;q=0.8", ("gzip",)) == "gzip"
+
+
+@pytest.mark.asyncio
+async def test_streaming_body_is_compressed_chunk_by_chunk():
+    """
+    Stream three 4 KB CSV chunks through the middleware with gzip accepted.
+    Expect: one compressed message per chunk, each decodable as soon as it
+    arrives, and the whole stream decompressing to the original.
+    """
+    chunks = [(f"row {i},Fiction,1999\n" * 200).encode() for i in range(3)]
+    headers, bodies = await _run(_app(chunks))
+
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert len(bodies) == 3
+    decoder = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    for chunk, body in zip(chunks, bodies):
+        assert len(body) < len(chunk)
+        assert decoder.decompress(body) == chunk
+    assert gzip.decompress(b"".join(bodies)) == b"".join(chunks)
+
+
+@pytest.mark.asyncio
+async def test_small_and_non_text_responses_are_not_compressed():
+    """
+    Send a short JSON body, a large PNG body, and a large body to a client
+    accepting only identity.
+    Expect: all three pass through unchanged.
+    """
+    headers, bodies = await _run(_app([b'{"status":"alive"}'], b"application/json"))
+    assert b"content-encoding" not in headers
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert bodies == [b'{"status":"alive"}']
+
+    png = b"\x89PNG" + bytes(4096)
+    headers, bodies = await _run(_app([png], b"image/png"))
+    assert b"content-encoding" not in headers
+    assert bodies == [png]
+
+    headers, bodies = await _run(_app([b"x" * 4096]), accept="identity")
+    assert b"content-encoding" not in headers
+    assert bodies == [b"x" * 4096]
+
+
+@pytest.mark.asyncio
+async def test_level_follows_route_compression_class():
+    """
+    Compress the same body for an untagged endpoint and a @bulk endpoint.
+    Expect: the default class uses level 6 and the bulk class level 1.
+    """
+    used = []
+
+    class RecordingGzip(GzipEncoder):
+        def __init__(self, level):
+            used.append(level)
+            super().__init__(level)
+
+    @bulk
+    async def export():
+        pass
+
+    async def page():
+        pass
+
+    body = [b"a,b,c\n" * 1000]
+    for endpoint in (page, export):
+        await _run(_app(body, endpoint=endpoint), encoders={"gzip": RecordingGzip})
+    assert used == [6, 1]
+
+
+@pytest.mark.asyncio
+async def test_brotli_preferred_when_available():
+    """
+    Accept both br and gzip for a large JSON body.
+    Expect: the response is brotli-encoded and decodes to the original.
+    """
+    brotli = pytest.importorskip("brotli")
+    body = b'{"items": [' + b'{"title": "Dune"},' * 500 + b"{}]}"
+    headers, bodies = await _run(_app([body], b"application/json"), accept="gzip, br")
+    assert headers[b"content-encoding"] == b"br"
+    assert brotli.decompress(b"".join(bodies)) == body
+
+
+@pytest.mark.asyncio
+async def test_csv_export_is_streamed_compressed(client, auth_token):
+    """
+    Create a book and export CSV with gzip accepted.
+    Expect: a gzip-encoded streamed response with the CSV header and row.
+    """
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    resp = await client.post(
+        "/api/books",
+        json={
+            "title": "Dune " + "x" * 2000,
+            "author": "Herbert",
+            "genre": "Fiction",
+            "published_year": 1965,
+        },
+        headers=headers,
+    )
+    assert resp.status_code == 200
+    resp = await client.get(
+        "/api/books/export?format=csv",
+        headers={**headers, "Accept-Encoding": "gzip"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "content-length" not in resp.headers
+    lines = resp.text.splitlines()
+    assert lines[0] == "title,author,genre,published_year"
+    assert lines[1].endswith(",Herbert,Fiction,1965")
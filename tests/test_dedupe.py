@@ -0,0 +1,135 @@
+import io
+import random
+
+import pytest
+
+from app.services.dedupe import find_duplicates
+
+
+def test_find_duplicates_matches_edited_copies_only():
+    """
+    Run on known near-duplicates, look-alikes and random filler books.
+    Expect: moved articles, case and punctuation changes and author typos
+    match; sequels, same titles by other authors and filler do not.
+    """
+    rng = random.Random(3)
+    filler = [
+        (
+            " ".join(
+                "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=6))
+                for _ in range(3)
+            ),
+            f"Author {i}",
+        )
+        for i in range(500)
+    ]
+    records = [
+        ("The Hobbit", "J. R. R. Tolkien"),
+        ("Hobbit, The", "Tolkein, J.R.R."),
+        ("Dune", "Frank Herbert"),
+        ("Dune Messiah", "Frank Herbert"),
+        ("DUNE.", "frank herbert"),
+        ("Collected Poems", "Sylvia Plath"),
+        ("Collected Poems", "Philip Larkin"),
+    ] + filler
+    found = find_duplicates(records, 0.6)
+    pairs = {
+        (int(i), int(j)): float(s)
+        for i, j, s in zip(found.left, found.right, found.similarity)
+    }
+    assert set(pairs) == {(0, 1), (2, 4)}
+    assert pairs[(2, 4)] == 1.0 and 0.6 <= pairs[(0, 1)] < 1.0
+    assert found.candidates >= len(pairs)
+    assert find_duplicates(records[:1], 0.6).candidates == 0
+
+
+@pytest.mark.asyncio
+async def test_duplicate_report_and_import_flags(client, auth_token, admin_token):
+    """
+    Import a CSV with an edited copy of one of its rows, then get the report.
+    Expect: the import flags the copy against the earlier row, and
+    GET /api/books/duplicates lists the pair with both books; admins only.
+    """
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    books_csv = io.BytesIO(
+        b"title,author,genre,published_year\n"
+        b"The Left Hand of Darkness,Ursula K. Le Guin,Fiction,1969\n"
+        b"Kindred,Octavia E. Butler,Fiction,1979\n"
+        b'"Left Hand of Darkness, The",Ursula K. LeGuin,Fiction,1969\n'
+    )
+    resp = await client.post(
+        "/api/books/import",
+        headers=headers,
+        files={"file": ("books.csv", books_csv, "text/csv")},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["imported"] == 3
+    [flag] = data["duplicates_in_file"]
+    assert flag["row"] == 3 and flag["duplicate_of_row"] == 1
+    assert flag["similarity"] >= 0.6
+
+    assert (await client.get("/api/books/duplicates")).status_code == 401
+    resp = await client.get("/api/books/duplicates", headers=headers)
+    assert resp.status_code == 403
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    resp = await client.get("/api/books/duplicates", headers=headers)
+    assert resp.status_code == 200
+    report = resp.json()
+    assert report["books"] == 3 and report["duplicates"] == 1
+    [pair] = report["pairs"]
+    assert {b["title"] for b in pair["books"]} == {
+        "The Left Hand of Darkness",
+        "Left Hand of Darkness, The",
+    }
+    assert pair["similarity"] == flag["similarity"]
+
+    resp = await client.get(
+        "/api/books/duplicates", params={"threshold": 1.0}, headers=headers
+    )
+    assert resp.json()["duplicates"] == 0
+
+
+@pytest.mark.asyncio
+async def test_duplicate_report_cached_until_catalog_changes(
+    client, auth_token, admin_token, monkeypatch
+):
+    """
+    Get the report twice, rename one book of the pair, then get it again.
+    Expect: the second request reuses the first report; the rename makes
+    the third recompute and drop the pair.
+    """
+    from app.services import dedupe
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    ids = []
+    for title in ("The Dispossessed", "Dispossessed, The"):
+        resp = await client.post(
+            "/api/books",
+            headers=headers,
+            json={
+                "title": title,
+                "author": "Ursula K. Le Guin",
+                "genre": "Fiction",
+                "published_year": 1974,
+            },
+        )
+        ids.append(resp.json()["id"])
+
+    runs = []
+    find = dedupe.find_duplicates
+    monkeypatch.setattr(
+        dedupe, "find_duplicates", lambda *args: runs.append(1) or find(*args)
+    )
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    first = (await client.get("/api/books/duplicates", headers=admin)).json()
+    second = (await client.get("/api/books/duplicates", headers=admin)).json()
+    assert first == second and first["duplicates"] == 1
+    assert len(runs) == 1
+
+    resp = await client.put(
+        f"/api/books/{ids[1]}", headers=headers, json={"title": "Always Coming Home"}
+    )
+    assert resp.status_code == 200
+    third = (await client.get("/api/books/duplicates", headers=admin)).json()
+    assert len(runs) == 2 and third["duplicates"] == 0
@@ -0,0 +1,148 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.db.author_cache import AuthorIdCache, author_ids
+from app.db.pool import InstrumentedPool
+from app.db.warmup import warm_up
+from app.main import app, lifespan
+from tests.conftest import sync_engine
+
+
+@pytest.mark.asyncio
+async def test_ready_reports_starting_until_warm_up_finishes(client):
+    """
+    Probe liveness and readiness before startup has run, then run the lifespan.
+    Expect: live is 200 throughout; ready is 503 until warm-up completes, 200 after.
+    """
+    app.state.ready = False
+    assert (await client.get("/health/live")).json() == {"status": "alive"}
+    resp = await client.get("/health/ready")
+    assert resp.status_code == 503
+    assert resp.json() == {"status": "starting"}
+
+    async with lifespan(app):
+        for _ in range(100):
+            if (await client.get("/health/ready")).status_code == 200:
+                break
+            await asyncio.sleep(0.05)
+        resp = await client.get("/health/ready")
+        assert resp.status_code == 200
+        assert resp.json() == {"status": "ready"}
+
+
+@pytest.mark.asyncio
+async def test_warm_up_fills_pool_and_author_cache(client, auth_token):
+    """
+    Create two books by different authors, then warm up a fresh size-3 pool.
+    Expect: three idle connections with the hot reads prepared on each, and
+    both authors in the author id cache.
+    """
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for title, author in (("Dune", "Herbert"), ("Emma", "Austen")):
+        resp = await client.post(
+            "/api/books",
+            json={
+                "title": title,
+                "author": author,
+                "genre": "Fiction",
+                "published_year": 1965,
+            },
+            headers=headers,
+        )
+        assert resp.status_code == 200
+    author_ids.clear()
+
+    engine = create_async_engine(
+        settings.TEST_DB_URL, poolclass=InstrumentedPool, pool_size=3, max_overflow=0
+    )
+    try:
+        summary = await warm_up(engine, connections=10, authors=10)
+        assert summary["connections"] == 3
+        assert summary["authors"] == 2
+        assert engine.pool.checkedin() == 3
+        async with engine.connect() as conn:
+            prepared = await conn.execute(
+                text("SELECT statement FROM pg_prepared_statements")
+            )
+            statements = " ".join(prepared.scalars())
+            assert "FROM books" in statements and "COUNT" in statements.upper()
+    finally:
+        await engine.dispose()
+    assert author_ids.get(" herbert ") is not None
+    assert author_ids.get("Austen") is not None
+
+
+def test_author_cache_serves_committed_ids_only():
+    """
+    Stage ids on a session, then roll back one transaction and commit another.
+    Expect: only the committed id is served, and the LRU bound holds.
+    """
+    cache = AuthorIdCache(max_size=2)
+    session = SimpleNamespace(info={})
+
+    cache.stage(session, "Herbert", 1)
+    assert cache.get("Herbert") is None
+    cache.discard(session)
+    cache.publish(session)
+    assert cache.get("Herbert") is None
+
+    cache.stage(session, "Herbert", 1)
+    cache.publish(session)
+    assert cache.get("HERBERT") == 1
+
+    cache.put("Austen", 2)
+    cache.put("Sagan", 3)
+    assert len(cache) == 2
+    assert cache.get("Herbert") is None
+
+
+@pytest.mark.asyncio
+async def test_renamed_author_is_not_served_from_cache(client, auth_token, monkeypatch):
+    """
+    Create a book (caching its author), rename the author out of band, then
+    create and update books with the old name, with the token cache cold.
+    Expect: both writes go to an author with the old name, not the renamed one,
+    and stay within their query budgets.
+    """
+    from app.core.security import token_cache
+
+    monkeypatch.setattr(settings, "QUERY_BUDGET_ENFORCE", True)
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    book = {"title": "Kindred", "genre": "Fiction", "published_year": 1979}
+    resp = await client.post(
+        "/api/books", headers=headers, json={**book, "author": "Octavia Butler"}
+    )
+    first = resp.json()["id"]
+    assert author_ids.get("octavia butler") is not None
+
+    def rename(new_name):
+        with sync_engine.begin() as conn:
+            conn.execute(
+                text(
+                    "UPDATE authors SET name = :new WHERE lower(name) = 'octavia butler'"
+                ),
+                {"new": new_name},
+            )
+
+    rename("O. E. Butler")
+    token_cache.clear()
+    resp = await client.post(
+        "/api/books", headers=headers, json={**book, "author": "Octavia Butler"}
+    )
+    assert resp.status_code == 200
+    second = resp.json()["id"]
+    resp = await client.get(f"/api/books/{second}")
+    assert resp.json()["author"] == "Octavia Butler"
+
+    rename("Octavia E. Butler")
+    token_cache.clear()
+    resp = await client.put(
+        f"/api/books/{first}", headers=headers, json={"author": "Octavia Butler"}
+    )
+    assert resp.status_code == 200
+    assert resp.json()["author"] == "Octavia Butler"
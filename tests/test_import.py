@@ -1,6 +1,10 @@
 import pytest
 import io
 
+from app.core.metrics import import_rows
+from app.services import books_service
+from app.services.books_service import record_ok, records_ok
+
 
 @pytest.mark.asyncio
 async def test_import_books_json_success(client, auth_token):
@@ -83,6 +87,111 @@ async def test_import_books_invalid_csv(client, auth_token):
     assert "errors" in data and len(data["errors"]) > 0
 
 
+def test_records_ok_matches_record_ok():
+    """
+    Validate records with every kind of genre and year value, batched.
+    Expect: records_ok gives record_ok's verdict for each record, also when
+    a column holds unhashable values; a non-dict record raises the same error.
+    """
+    genres = ["Fiction", "History", "fiction", " Science", "", None, 3, ["Fiction"]]
+    years = [
+        *("1999", " 2001\n", "+1850", "1_999", "\u0661\u0669\u0669\u0669"),
+        *("1799", "-1999", "1999.0", "", "abc", "9" * 30),
+        *(1999, 1800, 1799, 1999.9, 1799.9, True, float("nan"), None, [1999]),
+    ]
+    records = [
+        {"title": "T", "author": "A", "genre": genre, "published_year": year}
+        for genre in genres
+        for year in years
+    ]
+    records += [
+        {"title": "T", "genre": "Fiction", "published_year": 1999},
+        {"author": "A", "genre": "Fiction", "published_year": 1999},
+        {"title": "T", "author": "A", "published_year": 1999},
+        {"title": "T", "author": "A", "genre": "Fiction"},
+        {"title": None, "author": "A", "genre": "Fiction", "published_year": "1999"},
+    ]
+    expected = [record_ok(rec) for rec in records]
+    assert records_ok(records).tolist() == expected
+    assert 0 < sum(expected) < len(records)
+    hashable = [
+        rec
+        for rec in records
+        if not any(isinstance(value, list) for value in rec.values())
+    ]
+    assert records_ok(hashable).tolist() == [record_ok(rec) for rec in hashable]
+
+    with pytest.raises(AttributeError) as batch:
+        records_ok(records[:3] + [["T", "A", "Fiction", 1999]])
+    with pytest.raises(AttributeError) as single:
+        record_ok(["T", "A", "Fiction", 1999])
+    assert str(batch.value) == str(single.value)
+
+
+@pytest.mark.asyncio
+async def test_resent_imports_skip_chunks_imported_before(
+    client, auth_token, monkeypatch
+):
+    """
+    Import a CSV twice, then with rows appended; import a JSON file with a
+    row the database rejects twice. Chunks of 2 rows.
+    Expect: an identical file returns the first response, adds no books and
+    counts all its rows as skipped,
+    an appended file imports only its new chunk (row numbers as in the
+    file), and a rejected row leaves its chunk and file recorded.
+    """
+    monkeypatch.setattr(books_service, "IMPORT_CHUNK_ROWS", 2)
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    async def upload(name, content):
+        resp = await client.post(
+            "/api/books/import",
+            headers=headers,
+            files={"file": (name, io.BytesIO(content), "text/plain")},
+        )
+        assert resp.status_code == 200
+        return resp.json()
+
+    async def total_books():
+        return (await client.get("/api/books/stats")).json()["total_books"]
+
+    first = (
+        b"title,author,genre,published_year\n"
+        b"Kindred,Octavia Butler,Fiction,1979\n"
+        b"Dawn,Octavia Butler,Fiction,1987\n"
+        b"Ubik,Philip K. Dick,Poetry,1969\n"
+        b"Valis,Philip K. Dick,Fiction,1981\n"
+    )
+    data = await upload("books.csv", first)
+    assert data["imported"] == 3 and data["skipped"] == 0
+    assert data["errors"] == ["row 3: invalid record"]
+    skipped = import_rows.get("csv", "skipped")
+    assert await upload("books.csv", first) == data
+    assert import_rows.get("csv", "skipped") == skipped + 4
+    assert await total_books() == 3
+
+    data = await upload(
+        "books.csv",
+        first + b"Emma,Jane Austen,Fiction,1815\nPersuasion,Jane Austen,Fiction,1700\n",
+    )
+    assert data["imported"] == 1 and data["skipped"] == 4
+    assert data["errors"] == ["row 6: invalid record"]
+    assert await total_books() == 4
+
+    rejected = (
+        b'[{"title": "Beloved", "author": "Toni Morrison", "genre": "Fiction",'
+        b' "published_year": 1987},'
+        b' {"title": null, "author": "Toni Morrison", "genre": "Fiction",'
+        b' "published_year": 1992},'
+        b' {"title": "Sula", "author": "Toni Morrison", "genre": "Fiction",'
+        b' "published_year": 1973}]'
+    )
+    data = await upload("books.json", rejected)
+    assert data["imported"] == 2 and data["errors"][0].startswith("row 2: ")
+    assert await upload("books.json", rejected) == data
+    assert await total_books() == 6
+
+
 @pytest.mark.asyncio
 async def test_export_books_json(client, auth_token):
     """
@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+import pytest
+
+from app import lambda_handler
+
+
+def _event(path: str) -> dict:
+    return {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": path,
+        "rawQueryString": "page_size=1",
+        "headers": {"host": "lambda"},
+        "requestContext": {
+            "http": {
+                "method": "GET",
+                "path": path,
+                "protocol": "HTTP/1.1",
+                "sourceIp": "203.0.113.7",
+            },
+            "stage": "$default",
+        },
+        "isBase64Encoded": False,
+    }
+
+
+@pytest.fixture
+def lambda_loop():
+    # Mangum drives each invocation on the thread's current event loop.
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    asyncio.set_event_loop(None)
+    loop.close()
+
+
+def test_handler_serves_api_gateway_events(lambda_loop):
+    """
+    Invoke the handler with an HTTP API event for GET /api/books.
+    Expect: the app answers through Mangum with the usual JSON page.
+    """
+    response = lambda_handler.handler(_event("/api/books"), None)
+    assert response["statusCode"] == 200, response["body"]
+    assert json.loads(response["body"])["items"] == []
+
+
+def test_warm_up_pings_only_without_pooled_connection(lambda_loop, monkeypatch):
+    """
+    Send two scheduled warm-up events, with no pooled connection and then one.
+    Expect: only the first pings the database; neither reaches the app.
+    """
+    pings = []
+    pooled = []
+
+    class Pool:
+        def checkedin(self):
+            return len(pooled)
+
+    class Engine:
+        pool = Pool()
+
+    async def ping_db():
+        pings.append(1)
+        pooled.append(1)
+        return True
+
+    monkeypatch.setattr(lambda_handler, "get_engine", lambda: Engine())
+    monkeypatch.setattr(lambda_handler, "ping_db", ping_db)
+
+    warm_up = {"source": "aws.events", "detail-type": "Scheduled Event"}
+    assert lambda_handler.handler(warm_up, None) == {"warm": True}
+    assert lambda_handler.handler(warm_up, None) == {"warm": True}
+    assert len(pings) == 1
@@ -0,0 +1,62 @@
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_metrics_use_templated_route_labels(client):
+    """
+    Request a missing book, then scrape /metrics.
+    Expect: latency and status metrics labelled by the templated path,
+    and DB queries attributed to the repository function.
+    """
+    resp = await client.get("/api/books/424242")
+    assert resp.status_code == 404
+
+    resp = await client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    body = resp.text
+
+    assert (
+        'http_requests_total{method="GET",route="/api/books/{book_id}",status="404"}'
+        in body
+    )
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/api/books/{book_id}"}'
+        in body
+    )
+    assert "/api/books/424242" not in body
+    assert 'db_queries_total{function="repo_books.get_book_by_id"}' in body
+    assert "http_requests_in_flight 1" in body
+    assert 'db_pool_connections{state="capacity"}' in body
+    assert "# TYPE db_pool_checkout_timeouts_total counter" in body
+
+
+@pytest.mark.asyncio
+async def test_metrics_count_imported_rows(client, auth_token):
+    """
+    Import a CSV with one valid and one invalid row.
+    Expect: both outcomes are counted in books_import_rows_total.
+    """
+    from app.core.metrics import import_rows
+
+    before_ok = import_rows.get("csv", "imported")
+    before_failed = import_rows.get("csv", "failed")
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    resp = await client.post(
+        "/api/books/import",
+        headers=headers,
+        files={
+            "file": (
+                "books.csv",
+                b"title,author,genre,published_year\n"
+                b"Metrics Book,Metrics Author,Fiction,2001\n"
+                b"Bad Book,Metrics Author,Poetry,2001\n",
+                "text/csv",
+            )
+        },
+    )
+    assert resp.status_code == 200
+
+    assert import_rows.get("csv", "imported") == before_ok + 1
+    assert import_rows.get("csv", "failed") == before_failed + 1
@@ -0,0 +1,261 @@
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from tests.conftest import sync_engine
+
+SCHEMA = "partition_test"
+MIGRATION = (
+    Path(__file__).resolve().parents[1]
+    / "alembic"
+    / "versions"
+    / "0005_partition_books.py"
+)
+
+# public.authors/books as left by migrations 0001-0004.
+PRE_MIGRATION = [
+    f"""
+    CREATE TABLE {SCHEMA}.authors (
+        id BIGSERIAL PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL
+    )
+    """,
+    f"""
+    CREATE TABLE {SCHEMA}.books (
+        id BIGSERIAL NOT NULL,
+        title TEXT NOT NULL,
+        author_id BIGINT NOT NULL,
+        genre TEXT NOT NULL,
+        published_year INTEGER NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+        PRIMARY KEY (id),
+        CONSTRAINT books_genre_check
+            CHECK (genre IN ('Fiction','Non-Fiction','Science','History')),
+        CONSTRAINT books_year_check CHECK (
+            published_year BETWEEN 1800 AND EXTRACT(YEAR FROM CURRENT_DATE)::INT
+        ),
+        FOREIGN KEY(author_id) REFERENCES {SCHEMA}.authors (id) ON DELETE RESTRICT
+    )
+    """,
+    f"CREATE INDEX idx_books_lower_title ON {SCHEMA}.books (lower(title))",
+    f"CREATE INDEX idx_books_published_year ON {SCHEMA}.books (published_year)",
+    f"CREATE INDEX idx_books_author_id ON {SCHEMA}.books (author_id)",
+    f"""
+    ALTER TABLE {SCHEMA}.books
+    ADD COLUMN title_norm TEXT GENERATED ALWAYS AS (lower(title)) STORED
+    """,
+    f"""
+    CREATE UNIQUE INDEX uniq_books_title_author_year
+    ON {SCHEMA}.books (title_norm, author_id, published_year)
+    """,
+]
+
+
+def _load_migration():
+    spec = importlib.util.spec_from_file_location("partition_books", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="module")
+def migrated():
+    """
+    A copy of the pre-0005 schema holding 2000 books across 1800-2024,
+    upgraded by the migration's own statements.
+    """
+    migration = _load_migration()
+    with sync_engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        for statement in PRE_MIGRATION:
+            conn.execute(text(statement))
+        conn.execute(
+            text(
+                f"""
+                INSERT INTO {SCHEMA}.authors(name)
+                SELECT 'author ' || i FROM generate_series(1, 50) i;
+                INSERT INTO {SCHEMA}.books(title, author_id, genre, published_year)
+                SELECT 'book ' || i,
+                       (SELECT min(id) FROM {SCHEMA}.authors) + i % 50,
+                       (ARRAY['Fiction','Non-Fiction','Science','History'])[i % 4 + 1],
+                       1800 + i % 225
+                FROM generate_series(1, 2000) i
+                """
+            )
+        )
+        for statement in migration.upgrade_statements(SCHEMA):
+            conn.execute(text(statement))
+        conn.execute(text(f"ANALYZE {SCHEMA}.books"))
+    yield migration
+    with sync_engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+
+def _scanned_partitions(plan: dict) -> set[str]:
+    found = set()
+    if "Relation Name" in plan:
+        found.add(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found |= _scanned_partitions(child)
+    return found
+
+
+def _explain(conn, sql: str, **params) -> dict:
+    row = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), params).scalar_one()
+    plan = row if isinstance(row, list) else json.loads(row)
+    return plan[0]["Plan"]
+
+
+def test_migration_keeps_rows_and_partitions_by_decade(migrated):
+    """
+    Upgrade a populated books table.
+    Expect: every row survives in its decade partition, the default partition
+    is empty, and new ids continue the old sequence.
+    """
+    with sync_engine.begin() as conn:
+        assert conn.execute(text(f"SELECT count(*) FROM {SCHEMA}.books")).scalar() == (
+            2000
+        )
+        kind = conn.execute(
+            text("SELECT relkind FROM pg_class WHERE oid = CAST(:t AS regclass)"),
+            {"t": f"{SCHEMA}.books"},
+        ).scalar()
+        assert kind == "p"
+        counts = dict(
+            conn.execute(
+                text(
+                    f"SELECT tableoid::regclass::text, count(*) "
+                    f"FROM {SCHEMA}.books GROUP BY 1"
+                )
+            ).all()
+        )
+        assert f"{SCHEMA}.books_default" not in counts
+        assert counts[f"{SCHEMA}.books_p1800"] == sum(
+            1 for i in range(1, 2001) if (1800 + i % 225) < 1810
+        )
+        new_id = conn.execute(
+            text(
+                f"INSERT INTO {SCHEMA}.books(title, author_id, genre, published_year) "
+                f"SELECT 'fresh', min(id), 'Science', 2001 FROM {SCHEMA}.authors "
+                f"RETURNING id"
+            )
+        ).scalar_one()
+        old_max = conn.execute(
+            text(f"SELECT max(id) FROM {SCHEMA}.books WHERE title <> 'fresh'")
+        ).scalar()
+        assert new_id > old_max
+        conn.execute(text(f"DELETE FROM {SCHEMA}.books WHERE title = 'fresh'"))
+
+
+def test_year_range_query_prunes_partitions(migrated):
+    """
+    EXPLAIN a year-range filter as list_books issues it.
+    Expect: only the decades overlapping the range are scanned.
+    """
+    with sync_engine.begin() as conn:
+        plan = _explain(
+            conn,
+            f"SELECT id, title FROM {SCHEMA}.books "
+            f"WHERE published_year >= :y_from AND published_year <= :y_to",
+            y_from=1955,
+            y_to=1972,
+        )
+    scanned = _scanned_partitions(plan)
+    assert scanned == {"books_p1950", "books_p1960", "books_p1970"}
+
+
+def test_generic_plan_prunes_at_execution(migrated):
+    """
+    Run a prepared statement with a generic plan, as a pooled prepared query
+    would be after a few executions.
+    Expect: partitions outside the bound parameters are removed at run time.
+    """
+    with sync_engine.begin() as conn:
+        conn.execute(text("SET LOCAL plan_cache_mode = force_generic_plan"))
+        conn.execute(
+            text(
+                f"PREPARE by_year(int, int) AS SELECT count(*) FROM {SCHEMA}.books "
+                f"WHERE published_year BETWEEN $1 AND $2"
+            )
+        )
+        rows = conn.execute(
+            text("EXPLAIN (ANALYZE, COSTS OFF) EXECUTE by_year(1990, 1999)")
+        ).scalars()
+        plan = "\n".join(rows)
+        conn.execute(text("DEALLOCATE by_year"))
+    assert "Subplans Removed: 23" in plan
+    assert "books_p1990" in plan and "books_p1980" not in plan
+
+
+def test_constraints_survive_partitioning(migrated):
+    """
+    Insert a duplicate (title case-insensitive, author, year), an unknown
+    genre and an out-of-range year.
+    Expect: the unique index and both CHECK constraints reject them.
+    """
+    bad_rows = [
+        ("BOOK 1", "Science", 1801),
+        ("another", "Poetry", 1990),
+        ("another", "Science", 1700),
+    ]
+    for title, genre, year in bad_rows:
+        with pytest.raises(IntegrityError):
+            with sync_engine.begin() as conn:
+                author = conn.execute(
+                    text(f"SELECT author_id FROM {SCHEMA}.books WHERE title = 'book 1'")
+                ).scalar_one()
+                conn.execute(
+                    text(
+                        f"INSERT INTO {SCHEMA}.books"
+                        f"(title, author_id, genre, published_year) "
+                        f"VALUES (:t, :a, :g, :y)"
+                    ),
+                    {"t": title, "a": author, "g": genre, "y": year},
+                )
+
+
+def test_ensure_partitions_moves_rows_out_of_default(migrated):
+    """
+    Drop the 2020s partition, insert a 2024 book, then ensure partitions.
+    Expect: the row lands in books_default, and books_ensure_partitions
+    recreates books_p2020 and moves the row into it.
+    """
+    with sync_engine.begin() as conn:
+        conn.execute(text(f"DELETE FROM {SCHEMA}.books WHERE published_year >= 2020"))
+        conn.execute(text(f"DROP TABLE {SCHEMA}.books_p2020"))
+        conn.execute(
+            text(
+                f"INSERT INTO {SCHEMA}.books(title, author_id, genre, published_year) "
+                f"SELECT 'late', min(id), 'History', 2024 FROM {SCHEMA}.authors"
+            )
+        )
+        where = conn.execute(
+            text(
+                f"SELECT tableoid::regclass::text FROM {SCHEMA}.books WHERE title = 'late'"
+            )
+        ).scalar()
+        assert where == f"{SCHEMA}.books_default"
+
+        created = conn.execute(
+            text(f"SELECT {SCHEMA}.books_ensure_partitions(2027)")
+        ).scalar()
+        assert created == 1
+        where = conn.execute(
+            text(
+                f"SELECT tableoid::regclass::text FROM {SCHEMA}.books WHERE title = 'late'"
+            )
+        ).scalar()
+        assert where == f"{SCHEMA}.books_p2020"
+        assert (
+            conn.execute(
+                text(f"SELECT {SCHEMA}.books_ensure_partitions(2027)")
+            ).scalar()
+            == 0
+        )
@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.db.pool import (
+    AdaptivePoolSizer,
+    InstrumentedPool,
+    clamp_pool_limits,
+    worker_connection_cap,
+)
+
+
+class FakePool:
+    def __init__(self, size, max_overflow, in_use=0):
+        self._size = size
+        self.max_overflow = max_overflow
+        self.in_use = in_use
+
+    def size(self):
+        return self._size
+
+    def checkedout(self):
+        return self.in_use
+
+
+@pytest.mark.asyncio
+async def test_pool_records_checkouts_and_timeouts():
+    """
+    Hold the only connection of a size-1 pool and check out another.
+    Expect: the second checkout times out and both are counted.
+    """
+    engine = create_async_engine(
+        settings.TEST_DB_URL,
+        poolclass=InstrumentedPool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.2,
+    )
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+
+        snap = engine.pool.snapshot()
+        assert snap["checkouts"] == 1
+        assert snap["timeouts"] == 1
+        assert snap["peak_in_use"] == 1
+        assert snap["in_use"] == 0
+        assert snap["wait"]["count"] == 1
+    finally:
+        await engine.dispose()
+
+
+def test_sizer_grows_on_timeouts_within_bounds():
+    pool = FakePool(size=5, max_overflow=0, in_use=5)
+    sizer = AdaptivePoolSizer(min_size=5, max_size=8, target_wait=0.05, interval=60)
+
+    sizer.observe(pool, None)
+    assert sizer.adjust(pool) == 6
+    assert pool.max_overflow == 1
+
+    for _ in range(5):
+        sizer.adjust(pool)
+    assert pool.size() + pool.max_overflow == 8
+
+
+def test_sizer_shrinks_when_idle_but_not_below_pool_size():
+    pool = FakePool(size=5, max_overflow=3, in_use=1)
+    sizer = AdaptivePoolSizer(min_size=5, max_size=20, target_wait=0.05, interval=60)
+
+    sizer.observe(pool, 0.001)
+    for _ in range(10):
+        sizer.adjust(pool)
+    assert pool.max_overflow == 0
+
+
+def test_worker_connection_cap_splits_budget():
+    assert worker_connection_cap(budget=90, workers=4, max_size=40) == 22
+    assert worker_connection_cap(budget=90, workers=1, max_size=40) == 40
+    assert worker_connection_cap(budget=2, workers=4, max_size=40) == 1
+
+
+def test_pool_limits_clamped_to_worker_cap(caplog):
+    """
+    Configure a pool larger than the per-worker cap.
+    Expect: size and overflow shrink to fit with a warning, and the sizer
+    keeps the cap rather than raising it to the pool size.
+    """
+    assert clamp_pool_limits(5, 10, cap=40) == (5, 10)
+    assert clamp_pool_limits(5, 10, cap=8) == (5, 3)
+    assert clamp_pool_limits(30, 10, cap=22) == (22, 0)
+    assert "clamping the pool" in caplog.text
+
+    sizer = AdaptivePoolSizer(min_size=30, max_size=22, target_wait=0.05, interval=60)
+    assert (sizer.min_size, sizer.max_size) == (22, 22)
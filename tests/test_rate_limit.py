@@ -1,5 +1,17 @@
+import asyncio
+import fcntl
+import multiprocessing
+
 import pytest
 
+from app.core.limiter import (
+    MemoryBackend,
+    Rate,
+    RedisBackend,
+    RespError,
+    SharedMemoryBackend,
+)
+
 
 @pytest.mark.asyncio
 async def test_rate_limit_exceeded(client, auth_token):
@@ -19,6 +31,7 @@ async def test_rate_limit_exceeded(client, auth_token):
     assert "error" in data
     assert data["error"]["code"] == 429
     assert "Too many requests" in data["error"]["message"]
+    assert 1 <= int(too_many.headers["Retry-After"]) <= 60
 
 
 @pytest.mark.asyncio
@@ -36,3 +49,241 @@ async def test_rate_limit_unauthorized(client):
     assert "error" in data
     assert data["error"]["code"] == 429
     assert "too many requests" in data["error"]["message"].lower()
+
+
+async def _token(client, email: str) -> str:
+    creds = {"email": email, "password": "password123"}
+    await client.post("/api/auth/register", json=creds)
+    resp = await client.post("/api/auth/login", json=creds)
+    return resp.json()["access_token"]
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_keyed_on_jwt_subject(client):
+    """
+    Exhaust the list quota as one user, from the same address as others.
+    Expect: a second user and anonymous requests keep their own quotas.
+    """
+    first = {"Authorization": f"Bearer {await _token(client, 'quota1@example.com')}"}
+    second = {"Authorization": f"Bearer {await _token(client, 'quota2@example.com')}"}
+
+    statuses = [
+        (await client.get("/api/books", headers=first)).status_code for _ in range(31)
+    ]
+    assert statuses[:30] == [200] * 30
+    assert statuses[30] == 429
+
+    assert (await client.get("/api/books", headers=second)).status_code == 200
+    assert (await client.get("/api/books")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_weights_previous_window():
+    """
+    Fill a 10/minute window, then move halfway into the next one.
+    Expect: half of the previous window still counts, so 5 more hits pass.
+    """
+    backend = MemoryBackend(max_keys=10)
+    rate = Rate(10, 60)
+    start = 6000.0
+
+    results = [(await backend.hit("k", rate, start))[0] for _ in range(11)]
+    assert results == [True] * 10 + [False]
+
+    results = [(await backend.hit("k", rate, start + 90))[0] for _ in range(6)]
+    assert results == [True] * 5 + [False]
+    assert (await backend.hit("k", rate, start + 90))[1] >= 1
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_evicts_least_recently_used_keys():
+    """
+    Hit more distinct keys than the backend may hold.
+    Expect: size stays bounded and the oldest key is the one evicted.
+    """
+    backend = MemoryBackend(max_keys=3)
+    rate = Rate(1, 60)
+    for key in ("a", "b", "c"):
+        await backend.hit(key, rate, 60.0)
+    await backend.hit("a", rate, 61.0)
+    await backend.hit("d", rate, 62.0)
+
+    assert len(backend) == 3
+    assert (await backend.hit("b", rate, 63.0))[0] is True
+    assert (await backend.hit("a", rate, 63.0))[0] is False
+
+
+def _hit_shared(path: str) -> int:
+    backend = SharedMemoryBackend(path, slots=64)
+
+    async def run():
+        return sum(
+            [
+                (await backend.hit("shared", Rate(100, 3600), 7200.0))[0]
+                for _ in range(50)
+            ]
+        )
+
+    return asyncio.run(run())
+
+
+def test_shared_memory_backend_enforces_limit_across_processes(tmp_path):
+    """
+    Four processes hit the same key 50 times each against a limit of 100.
+    Expect: exactly 100 hits are allowed in total.
+    """
+    path = str(tmp_path / "ratelimit")
+    SharedMemoryBackend(path, slots=64)
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        allowed = pool.map(_hit_shared, [path] * 4)
+    assert sum(allowed) == 100
+
+
+def _hold_bucket(path: str, key: str, locked, release) -> None:
+    backend = SharedMemoryBackend(path, slots=64)
+    bucket_len = backend.WAYS * backend.SLOT.size
+    base = (backend._hash(key) % backend.buckets) * bucket_len
+    fcntl.lockf(backend._fd, fcntl.LOCK_EX, bucket_len, base)
+    locked.set()
+    release.wait(10)
+
+
+@pytest.mark.asyncio
+async def test_shared_memory_backend_waits_for_lock_without_blocking_loop(tmp_path):
+    """
+    Another process holds the key's bucket lock while this one calls hit.
+    Expect: the event loop keeps running other tasks until the lock is
+    released, then the hit is counted.
+    """
+    path = str(tmp_path / "ratelimit")
+    backend = SharedMemoryBackend(path, slots=64)
+    ctx = multiprocessing.get_context("fork")
+    locked, release = ctx.Event(), ctx.Event()
+    holder = ctx.Process(target=_hold_bucket, args=(path, "busy", locked, release))
+    holder.start()
+    try:
+        assert locked.wait(10)
+        hit = asyncio.ensure_future(backend.hit("busy", Rate(1, 60), 0.0))
+        await asyncio.sleep(0.05)
+        assert not hit.done()
+        release.set()
+        assert await asyncio.wait_for(hit, 5) == (True, 0)
+    finally:
+        release.set()
+        holder.join(5)
+
+
+async def _fake_redis(reader, writer):
+    """Minimal RESP server supporting the commands used by RedisBackend."""
+    store = _fake_redis.store
+    password = getattr(_fake_redis, "password", None)
+    authed = password is None
+    while True:
+        header = await reader.readline()
+        if not header:
+            break
+        args = []
+        for _ in range(int(header[1:])):
+            length = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(length + 2))[:-2].decode())
+        cmd, key = args[0].upper(), args[1]
+        if cmd in ("AUTH", "SELECT"):
+            # Slow setup replies give other callers time to race the connect.
+            await asyncio.sleep(0.01)
+            if cmd == "AUTH" and key != password:
+                writer.write(b"-WRONGPASS invalid password\r\n")
+            else:
+                authed = authed or cmd == "AUTH"
+                writer.write(b"+OK\r\n")
+        elif not authed:
+            writer.write(b"-NOAUTH Authentication required.\r\n")
+        elif cmd in ("INCR", "DECR"):
+            store[key] = int(store.get(key, 0)) + (1 if cmd == "INCR" else -1)
+            writer.write(b":%d\r\n" % store[key])
+        elif cmd == "PEXPIRE":
+            writer.write(b":1\r\n")
+        elif cmd == "GET":
+            value = store.get(key)
+            if value is None:
+                writer.write(b"$-1\r\n")
+            else:
+                data = str(value).encode()
+                writer.write(b"$%d\r\n%s\r\n" % (len(data), data))
+        await writer.drain()
+    writer.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_shares_counts_between_workers():
+    """
+    Two backends (two workers) share a Redis-protocol server.
+    Expect: their combined hits are capped at the limit.
+    """
+    _fake_redis.store = {}
+    server = await asyncio.start_server(_fake_redis, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    workers = [RedisBackend(f"redis://127.0.0.1:{port}/0") for _ in range(2)]
+    rate = Rate(10, 60)
+
+    results = await asyncio.gather(
+        *(workers[i % 2].hit("user:1", rate, 600.0) for i in range(16))
+    )
+    server.close()
+
+    assert sum(allowed for allowed, _ in results) == 10
+    assert all(retry >= 1 for allowed, retry in results if not allowed)
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_authenticates_before_sharing_connection():
+    """
+    Hit a password-protected server concurrently from a fresh backend, then
+    connect with a wrong password.
+    Expect: every concurrent hit waits for AUTH/SELECT and succeeds; the
+    wrong password raises and leaves no half-open connection behind.
+    """
+    _fake_redis.store = {}
+    _fake_redis.password = "s3cret"
+    server = await asyncio.start_server(_fake_redis, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        backend = RedisBackend(f"redis://:s3cret@127.0.0.1:{port}/2")
+        results = await asyncio.gather(
+            *(backend.hit("user:1", Rate(10, 60), 600.0) for _ in range(5))
+        )
+        assert all(allowed for allowed, _ in results)
+        assert list(_fake_redis.store.values()) == [5]
+
+        wrong = RedisBackend(f"redis://:nope@127.0.0.1:{port}/2")
+        with pytest.raises(RespError):
+            await wrong.hit("user:2", Rate(10, 60), 600.0)
+        assert wrong._writer is None and wrong._reader is None
+    finally:
+        _fake_redis.password = None
+        server.close()
+
+
+@pytest.mark.asyncio
+async def test_rejected_request_skips_handler_and_unlimited_routes_skip_limiter(
+    client,
+):
+    """
+    Exhaust the list quota, then send one more request and hit /metrics.
+    Expect: the rejected request runs no SQL, is counted under its route,
+    and the unlimited route never creates a limiter key.
+    """
+    from app.core.limiter import limiter
+    from app.core.metrics import db_queries, rate_limit_rejections
+
+    for _ in range(30):
+        assert (await client.get("/api/books")).status_code == 200
+    queries = db_queries.get("repo_books.list_books")
+    rejections = rate_limit_rejections.get("/api/books")
+
+    assert (await client.get("/api/books")).status_code == 429
+    assert db_queries.get("repo_books.list_books") == queries
+    assert rate_limit_rejections.get("/api/books") == rejections + 1
+
+    keys = len(limiter.backend)
+    assert (await client.get("/metrics")).status_code == 200
+    assert len(limiter.backend) == keys
@@ -0,0 +1,82 @@
+import pytest
+
+from app.core.config import settings
+from app.core.request_timing import QueryBudgetExceeded
+from app.core.security import token_cache
+from app.main import app
+
+
+def _route(path: str, method: str):
+    return next(
+        r
+        for r in app.routes
+        if getattr(r, "path", None) == path and method in r.methods
+    )
+
+
+@pytest.fixture
+def server_timing(monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_TIMING_ENABLED", True)
+
+
+@pytest.mark.asyncio
+async def test_server_timing_header(client, auth_token, server_timing):
+    """
+    Update a book with Server-Timing enabled.
+    Expect: handler, auth and DB timings plus the statement count.
+    """
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    resp = await client.post(
+        "/api/books",
+        json={
+            "title": "Timed",
+            "author": "Clock",
+            "genre": "Science",
+            "published_year": 2001,
+        },
+        headers=headers,
+    )
+    book_id = resp.json()["id"]
+    token_cache.clear()  # make the auth lookup hit the database
+
+    resp = await client.put(
+        f"/api/books/{book_id}", json={"title": "Timed Again"}, headers=headers
+    )
+    assert resp.status_code == 200
+    timing = resp.headers["server-timing"]
+    entries = {part.split(";")[0].strip(): part for part in timing.split(",")}
+    assert set(entries) == {"app", "auth", "db"}
+    assert 'desc="3 queries"' in entries["db"]
+
+
+@pytest.mark.asyncio
+async def test_server_timing_disabled_by_default(client):
+    resp = await client.get("/api/books")
+    assert "server-timing" not in resp.headers
+
+
+@pytest.mark.asyncio
+async def test_query_budget_exceeded_fails(client, monkeypatch):
+    """
+    Shrink the budget of GET /api/books below its two statements.
+    Expect: QueryBudgetExceeded surfaces to the caller.
+    """
+    route = _route("/api/books", "GET")
+    monkeypatch.setattr(route.endpoint, "__query_budget__", 1)
+
+    with pytest.raises(QueryBudgetExceeded, match="issued 2 SQL statements"):
+        await client.get("/api/books")
+
+
+@pytest.mark.asyncio
+async def test_query_budget_only_logged_when_not_enforced(client, monkeypatch, caplog):
+    """
+    Shrink the budget of GET /api/books with enforcement off, as outside tests.
+    Expect: the request still succeeds and the overrun is logged.
+    """
+    route = _route("/api/books", "GET")
+    monkeypatch.setattr(route.endpoint, "__query_budget__", 1)
+    monkeypatch.setattr(settings, "QUERY_BUDGET_ENFORCE", False)
+
+    assert (await client.get("/api/books")).status_code == 200
+    assert "issued 2 SQL statements, budget is 1" in caplog.text
@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+def _counting(flights: SingleFlight):
+    calls = []
+    release = asyncio.Event()
+
+    @flights.coalesce()
+    async def fetch(session, book_id):
+        calls.append(book_id)
+        call = len(calls)
+        await release.wait()
+        return {"id": book_id, "call": call}
+
+    return fetch, calls, release
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_execution():
+    """
+    Ten concurrent calls with the same arguments, one with different ones.
+    Expect: two executions; the ten callers all receive the same result.
+    """
+    fetch, calls, release = _counting(SingleFlight())
+    tasks = [asyncio.create_task(fetch(object(), 1)) for _ in range(10)]
+    other = asyncio.create_task(fetch(object(), 2))
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert calls == [1, 2]
+    assert all(r is results[0] for r in results)
+    assert (await other)["id"] == 2
+
+
+@pytest.mark.asyncio
+async def test_call_after_completed_write_does_not_join_older_flight():
+    """
+    Start a call, complete a write (bump the generation), call again.
+    Expect: the second caller gets its own execution.
+    """
+    flights = SingleFlight()
+    fetch, calls, release = _counting(flights)
+    before = asyncio.create_task(fetch(object(), 1))
+    await asyncio.sleep(0)
+    flights.invalidate()
+    after = asyncio.create_task(fetch(object(), 1))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert (await before)["call"] == 1
+    assert (await after)["call"] == 2
+    assert calls == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_cancelled_leader_hands_over():
+    """
+    A shared call fails, then a shared call's leader is cancelled.
+    Expect: followers see the error; after the cancellation they run
+    the call themselves.
+    """
+    flights = SingleFlight()
+    attempts = 0
+    gate = asyncio.Event()
+
+    @flights.coalesce()
+    async def fetch(session, fail):
+        nonlocal attempts
+        attempts += 1
+        await gate.wait()
+        if fail:
+            raise LookupError("boom")
+        return "ok"
+
+    tasks = [asyncio.create_task(fetch(None, True)) for _ in range(3)]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert attempts == 1
+    assert all(isinstance(r, LookupError) for r in results)
+
+    gate.clear()
+    leader = asyncio.create_task(fetch(None, False))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(fetch(None, False))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    gate.set()
+    assert await follower == "ok"
+    assert attempts == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_coalesce_until_a_write(client, auth_token):
+    """
+    Fire concurrent GETs for one book, update it, fire them again.
+    Expect: fewer queries than requests, and no response after the
+    update shows the old title.
+    """
+    from app.core.metrics import db_queries
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    resp = await client.post(
+        "/api/books",
+        json={
+            "title": "Herd",
+            "author": "Herd Author",
+            "genre": "Fiction",
+            "published_year": 2005,
+        },
+        headers=headers,
+    )
+    book_id = resp.json()["id"]
+
+    before = db_queries.get("repo_books.get_book_by_id")
+    responses = await asyncio.gather(
+        *(client.get(f"/api/books/{book_id}") for _ in range(12))
+    )
+    assert all(r.status_code == 200 for r in responses)
+    assert db_queries.get("repo_books.get_book_by_id") - before < 12
+
+    resp = await client.put(
+        f"/api/books/{book_id}", json={"title": "Herd Again"}, headers=headers
+    )
+    assert resp.json()["title"] == "Herd Again"
+    responses = await asyncio.gather(
+        *(client.get(f"/api/books/{book_id}") for _ in range(12))
+    )
+    assert {r.json()["title"] for r in responses} == {"Herd Again"}
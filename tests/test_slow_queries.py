@@ -0,0 +1,127 @@
+import pytest
+from sqlalchemy import text
+
+from app.db.instrumentation import slow_query_log
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def log_every_query():
+    """Treat every statement as slow and capture every plan."""
+    threshold, rate = slow_query_log.threshold_ms, slow_query_log.sample_rate
+    slow_query_log.threshold_ms, slow_query_log.sample_rate = 0, 1.0
+    slow_query_log.entries.clear()
+    yield slow_query_log
+    slow_query_log.threshold_ms, slow_query_log.sample_rate = threshold, rate
+    slow_query_log.entries.clear()
+
+
+@pytest.mark.asyncio
+async def test_slow_list_query_is_logged_with_plan(
+    client, admin_token, log_every_query
+):
+    """
+    List books with a genre filter while every statement counts as slow.
+    Expect: the list query is recorded with its repo function, normalized
+    SQL, parameter types and an EXPLAIN ANALYZE plan.
+    """
+    resp = await client.get("/api/books?genre=Fiction&title=abc")
+    assert resp.status_code == 200
+
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    resp = await client.get("/api/admin/slow-queries?with_plan=true", headers=headers)
+    assert resp.status_code == 200
+    items = resp.json()["items"]
+
+    listed = [e for e in items if e["function"] == "repo_books.list_books"]
+    assert listed
+    entry = listed[-1]
+    assert "Fiction" not in entry["sql"] and "abc" not in entry["sql"]
+    assert "str" in entry["params"]
+    assert "actual time" in entry["plan"]
+
+
+@pytest.mark.asyncio
+async def test_writes_are_logged_without_plan(client, auth_token, log_every_query):
+    """
+    Create a book while every statement counts as slow.
+    Expect: the INSERT is logged but never re-executed under EXPLAIN ANALYZE.
+    """
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    resp = await client.post(
+        "/api/books",
+        json={
+            "title": "Slow Insert",
+            "author": "Logger",
+            "genre": "History",
+            "published_year": 1999,
+        },
+        headers=headers,
+    )
+    assert resp.status_code == 200
+
+    inserts = [
+        e
+        for e in log_every_query.entries
+        if e["function"] == "repo_books.create_book" and "INSERT INTO books" in e["sql"]
+    ]
+    assert inserts and all(e["plan"] is None for e in inserts)
+
+    resp = await client.get("/api/books?title=Slow Insert")
+    assert resp.json()["total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_requires_auth(client):
+    resp = await client.get("/api/admin/slow-queries")
+    assert resp.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_forbidden_for_non_admins(client, auth_token, admin_token):
+    """
+    Read the slow-query log as a user not listed in ADMIN_EMAILS.
+    Expect: 403, while the listed user gets 200.
+    """
+    resp = await client.get(
+        "/api/admin/slow-queries", headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    assert resp.status_code == 403
+    resp = await client.get(
+        "/api/admin/slow-queries", headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert resp.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_plan_capture_never_runs_side_effects(log_every_query):
+    """
+    Run reads calling nextval() and set_config() while every statement counts
+    as slow and gets a plan.
+    Expect: nextval() is planned without being executed again, and the
+    set_config() re-run under EXPLAIN ANALYZE is rolled back.
+    """
+    async with TestingSessionLocal() as session:
+        await session.execute(text("CREATE TEMP SEQUENCE explain_probe"))
+        await session.execute(text("SELECT nextval('explain_probe')"))
+        assert (
+            await session.execute(text("SELECT nextval('explain_probe')"))
+        ).scalar() == 2
+        [entry] = [e for e in log_every_query.entries if "nextval" in e["sql"]][-1:]
+        assert entry["plan"] and "actual time" not in entry["plan"]
+
+        await session.execute(text("SET app.explain_probe = 'before'"))
+        conn = await session.connection()
+        plan = await conn.run_sync(
+            lambda sync_conn: slow_query_log._explain(
+                sync_conn,
+                "SELECT set_config('app.explain_probe', 'after', true)",
+                (),
+                analyze=True,
+            )
+        )
+        assert "actual time" in plan
+        assert (
+            await session.execute(text("SELECT current_setting('app.explain_probe')"))
+        ).scalar() == "before"
+        await session.rollback()
@@ -0,0 +1,120 @@
+import pytest
+from sqlalchemy import text
+
+from app.db.instrumentation import slow_query_log
+from tests.conftest import sync_engine
+
+SORTS = [
+    ("title", "asc", "Index Only Scan using ix_books_genre_title"),
+    ("title", "desc", "Index Only Scan using ix_books_genre_title_desc"),
+    ("author", "asc", "Index Only Scan using ix_books_genre_author"),
+    ("author", "desc", "Index Only Scan using ix_books_genre_author_desc"),
+    ("published_year", "asc", "Index Only Scan using ix_books_genre_year"),
+    ("published_year", "desc", "Index Only Scan using ix_books_genre_year_desc"),
+]
+
+
+@pytest.fixture
+def seeded_catalog():
+    """4000 books by 200 authors, vacuumed so index-only scans need no heap."""
+    with sync_engine.begin() as conn:
+        conn.execute(
+            text(
+                """
+                INSERT INTO authors(name)
+                SELECT 'Author ' || lpad(i::text, 3, '0')
+                FROM generate_series(1, 200) i;
+                INSERT INTO books(title, author_id, genre, published_year)
+                SELECT 'Book ' || md5(i::text),
+                       (SELECT min(id) FROM authors) + i % 200,
+                       (enum_range(NULL::book_genre))[i % 4 + 1],
+                       1900 + i % 120
+                FROM generate_series(1, 4000) i
+                """
+            )
+        )
+    with sync_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE books"))
+    yield
+
+
+@pytest.fixture
+def capture_plans():
+    threshold, rate = slow_query_log.threshold_ms, slow_query_log.sample_rate
+    slow_query_log.threshold_ms, slow_query_log.sample_rate = 0, 1.0
+    slow_query_log.entries.clear()
+    yield slow_query_log
+    slow_query_log.threshold_ms, slow_query_log.sample_rate = threshold, rate
+    slow_query_log.entries.clear()
+
+
+@pytest.mark.asyncio
+async def test_genre_filtered_sorts_use_ordered_index_only_scans(
+    client, seeded_catalog, capture_plans
+):
+    """
+    List page 3 of Fiction books under each of the six sort orders.
+    Expect: the page query is a forward index-only scan of the matching
+    (genre, sort key, id) or (genre, sort key DESC, id) index, with no Sort
+    node and no heap fetches, and rows come back in sort-key order with ties
+    in ascending id order.
+    """
+    for sort_by, sort_order, scan in SORTS:
+        capture_plans.entries.clear()
+        resp = await client.get(
+            f"/api/books?genre=Fiction&sort_by={sort_by}&sort_order={sort_order}"
+            "&page=3&page_size=10"
+        )
+        assert resp.status_code == 200
+        items = resp.json()["items"]
+        assert len(items) == 10
+        keys = [(item[sort_by], item["id"]) for item in items]
+        by_id = sorted(keys, key=lambda k: k[1])
+        assert keys == sorted(by_id, key=lambda k: k[0], reverse=sort_order == "desc")
+        if sort_by != "title":
+            assert len({k[0] for k in keys}) < len(keys)
+
+        (plan,) = [
+            e["plan"]
+            for e in capture_plans.entries
+            if e["function"] == "repo_books.list_books" and "ORDER BY" in e["sql"]
+        ]
+        assert scan in plan, plan
+        assert "Sort Key" not in plan and "authors" not in plan
+        assert "Heap Fetches: 0" in plan
+
+
+@pytest.mark.asyncio
+async def test_author_sort_follows_author_changes(client, auth_token):
+    """
+    Create a book, move it to another author, then rename that author
+    outside the API.
+    Expect: the book's author field and author sort key track each change.
+    """
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    resp = await client.post(
+        "/api/books",
+        json={
+            "title": "Sorted",
+            "author": "Zed",
+            "genre": "History",
+            "published_year": 1990,
+        },
+        headers=headers,
+    )
+    book_id = resp.json()["id"]
+
+    resp = await client.put(
+        f"/api/books/{book_id}", json={"author": "Amy"}, headers=headers
+    )
+    assert resp.json()["author"] == "Amy"
+
+    with sync_engine.begin() as conn:
+        conn.execute(text("UPDATE authors SET name = 'Amelia' WHERE name = 'Amy'"))
+        author_sort = conn.execute(
+            text("SELECT author_sort FROM books WHERE id = :id"), {"id": book_id}
+        ).scalar_one()
+    assert author_sort == "Amelia"
+
+    resp = await client.get("/api/books?sort_by=author&fields=author")
+    assert resp.json()["items"] == [{"author": "Amelia"}]
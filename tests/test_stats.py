@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy import text
+
+from app.db import repo_stats
+from tests.conftest import TestingSessionLocal
+
+
+async def _create(client, headers, title, author, genre, year):
+    resp = await client.post(
+        "/api/books",
+        json={
+            "title": title,
+            "author": author,
+            "genre": genre,
+            "published_year": year,
+        },
+        headers=headers,
+    )
+    assert resp.status_code == 200, resp.text
+    return resp.json()["id"]
+
+
+@pytest.mark.asyncio
+async def test_stats_follow_creates_updates_and_deletes(client, auth_token):
+    """
+    Create three books, move one to another genre, year and author, delete one.
+    Expect: totals, genre/year/decade counts and top authors match the catalog,
+    the summary table agrees with a full recount, and per-author counts are
+    kept only in authors.book_count.
+    """
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    await _create(client, headers, "Dune", "Herbert", "Fiction", 1965)
+    moved = await _create(client, headers, "Children", "Herbert", "Fiction", 1976)
+    gone = await _create(client, headers, "Cosmos", "Sagan", "Science", 1980)
+
+    resp = await client.put(
+        f"/api/books/{moved}",
+        json={"genre": "History", "published_year": 1969, "author": "Someone"},
+        headers=headers,
+    )
+    assert resp.status_code == 200
+    resp = await client.delete(f"/api/books/{gone}", headers=headers)
+    assert resp.status_code == 200
+
+    resp = await client.get("/api/books/stats")
+    assert resp.status_code == 200
+    stats = resp.json()
+    assert stats["total_books"] == 2
+    assert stats["total_authors"] == 3
+    assert stats["by_genre"] == {"Fiction": 1, "History": 1}
+    assert stats["by_year"] == {"1965": 1, "1969": 1}
+    assert stats["by_decade"] == {"1960": 2}
+    assert [(a["name"], a["book_count"]) for a in stats["top_authors"]] == [
+        ("Herbert", 1),
+        ("Someone", 1),
+    ]
+
+    async with TestingSessionLocal() as session:
+        assert await repo_stats.check_stats(session) == []
+        kinds = await session.execute(text("SELECT DISTINCT kind FROM book_stats"))
+        assert "author" not in set(kinds.scalars())
+
+
+@pytest.mark.asyncio
+async def test_stats_check_detects_and_rebuild_repairs_drift(client, auth_token):
+    """
+    Insert a book behind the application's back.
+    Expect: the check reports the drifted counters and a rebuild fixes them.
+    """
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    await _create(client, headers, "Emma", "Austen", "Fiction", 1815)
+
+    async with TestingSessionLocal() as session:
+        author_id = (
+            await session.execute(text("SELECT id FROM authors WHERE name = 'Austen'"))
+        ).scalar_one()
+        await session.execute(
+            text(
+                "INSERT INTO books(title, author_id, genre, published_year) "
+                "VALUES ('Persuasion', :a, 'Fiction', 1817)"
+            ),
+            {"a": author_id},
+        )
+        await session.commit()
+
+        diffs = await repo_stats.check_stats(session)
+        assert ("total", "books", 1, 2) in diffs
+        assert ("year", "1817", 0, 1) in diffs
+        assert ("book_count", str(author_id), 1, 2) in diffs
+
+        await repo_stats.rebuild_stats(session)
+        assert await repo_stats.check_stats(session) == []
+
+    stats = (await client.get("/api/books/stats")).json()
+    assert stats["total_books"] == 2
+    assert stats["by_decade"] == {"1810": 2}
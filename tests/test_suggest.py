@@ -0,0 +1,189 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from app.db.suggestions import PrefixIndex, load_suggestions, suggestions
+from tests.conftest import TestingSessionLocal, sync_engine
+
+
+def test_prefix_index_ranks_by_book_count_and_tracks_changes():
+    """
+    Load keys sharing a prefix, then add, bump and remove keys.
+    Expect: matches are case- and whitespace-insensitive, ranked by count
+    then name, and cached rankings of busy prefixes follow every change.
+    """
+    index = PrefixIndex()
+    index.load(
+        [(f"Author {i:03d}", 1) for i in range(300)]
+        + [("Bradbury", 2), ("  author   007 ", 4)]
+    )
+    assert len(index) == 301
+    assert index.suggest("AUTHOR 00", 3) == [
+        ("Author 007", 5),
+        ("Author 000", 1),
+        ("Author 001", 1),
+    ]
+
+    assert index.suggest("a", 1) == [("Author 007", 5)]
+    index.add("Author 150", 9)
+    assert index.suggest("a", 1) == [("Author 150", 10)]
+    index.add("Author 150", -10)
+    assert index.suggest("au", 1) == [("Author 007", 5)]
+    assert index.suggest("author 150", 5) == []
+
+    index.add("Asimov", 1)
+    assert index.suggest("as", 5) == [("Asimov", 1)]
+    assert index.suggest("x", 5) == [] and index.suggest("  ", 5) == []
+
+
+@pytest.mark.asyncio
+async def test_suggest_follows_committed_book_writes(client, auth_token):
+    """
+    Create, rename, re-author and delete books.
+    Expect: author and title suggestions reflect each write.
+    """
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    async def suggest(kind, q):
+        resp = await client.get(f"/api/books/suggest?kind={kind}&q={q}")
+        assert resp.status_code == 200
+        return [(s["value"], s["book_count"]) for s in resp.json()["items"]]
+
+    book = {"author": "Le Guin", "genre": "Fiction", "published_year": 1969}
+    first = await client.post(
+        "/api/books", json={**book, "title": "The Left Hand"}, headers=headers
+    )
+    await client.post(
+        "/api/books", json={**book, "title": "The Lathe"}, headers=headers
+    )
+    assert await suggest("author", "le") == [("Le Guin", 2)]
+    assert await suggest("title", "the l") == [("The Lathe", 1), ("The Left Hand", 1)]
+
+    book_id = first.json()["id"]
+    await client.put(
+        f"/api/books/{book_id}",
+        json={"title": "Tehanu", "author": "Lessing"},
+        headers=headers,
+    )
+    assert await suggest("author", "le") == [("Le Guin", 1), ("Lessing", 1)]
+    assert await suggest("title", "t") == [("Tehanu", 1), ("The Lathe", 1)]
+
+    await client.delete(f"/api/books/{book_id}", headers=headers)
+    assert await suggest("author", "le") == [("Le Guin", 1)]
+
+    resp = await client.get("/api/books/suggest?kind=genre&q=f")
+    assert resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_load_suggestions_reads_current_catalog(client, auth_token):
+    """
+    Create books, empty the in-memory indexes, then load them from the
+    database; stage a change in a transaction that rolls back.
+    Expect: the loaded indexes match the catalog and the rolled back change
+    is never applied.
+    """
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for title in ("Dune", "Dune Messiah"):
+        await client.post(
+            "/api/books",
+            json={
+                "title": title,
+                "author": "Herbert",
+                "genre": "Fiction",
+                "published_year": 1965,
+            },
+            headers=headers,
+        )
+    suggestions.clear()
+    assert suggestions.suggest("title", "dune", 10) == []
+
+    async with TestingSessionLocal() as session:
+        assert await load_suggestions(session) == {"author": 1, "title": 2}
+        suggestions.stage(session, "title", "Dune Unwritten", 1)
+        await session.rollback()
+        await session.commit()
+    assert suggestions.suggest("author", "her", 10) == [("Herbert", 2)]
+    assert suggestions.suggest("title", "dune", 10) == [
+        ("Dune", 1),
+        ("Dune Messiah", 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_first_suggest_loads_indexes_once(client, auth_token, monkeypatch):
+    """
+    Create books, empty the indexes as if startup never ran (Lambda), then
+    send several /suggest requests at once.
+    Expect: a single load serves all of them with the current catalog.
+    """
+    from app.db import suggestions as module
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for title in ("Dune", "Dune Messiah"):
+        await client.post(
+            "/api/books",
+            json={
+                "title": title,
+                "author": "Herbert",
+                "genre": "Fiction",
+                "published_year": 1965,
+            },
+            headers=headers,
+        )
+    suggestions.clear()
+
+    loads = []
+
+    async def counted(session):
+        loads.append(1)
+        return await load_suggestions(session)
+
+    monkeypatch.setattr(module, "load_suggestions", counted)
+    responses = await asyncio.gather(
+        *(client.get("/api/books/suggest?q=dune") for _ in range(5))
+    )
+    assert len(loads) == 1
+    for resp in responses:
+        assert [s["value"] for s in resp.json()["items"]] == ["Dune", "Dune Messiah"]
+    await client.get("/api/books/suggest?q=dune")
+    assert len(loads) == 1
+
+
+@pytest.mark.asyncio
+async def test_suggest_reloads_after_refresh_interval(client, auth_token, monkeypatch):
+    """
+    Load the indexes, add a book as another worker would (no local commit
+    hook), then let the indexes age past the refresh interval.
+    Expect: the book is suggested only after the interval has passed.
+    """
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    resp = await client.post(
+        "/api/books",
+        json={
+            "title": "Dune",
+            "author": "Herbert",
+            "genre": "Fiction",
+            "published_year": 1965,
+        },
+        headers=headers,
+    )
+    monkeypatch.setattr(suggestions, "refresh", 60)
+
+    async def titles():
+        resp = await client.get("/api/books/suggest?q=dune")
+        return [s["value"] for s in resp.json()["items"]]
+
+    assert await titles() == ["Dune"]
+    with sync_engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO books(title, author_id, genre, published_year) "
+                "SELECT 'Dune Messiah', author_id, genre, 1969 FROM books"
+            )
+        )
+    assert await titles() == ["Dune"]
+
+    suggestions.loaded_at -= 61
+    assert await titles() == ["Dune", "Dune Messiah"]
@@ -0,0 +1,158 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from app.core.security import token_cache
+from app.core.tracing import (
+    BatchSpanProcessor,
+    FileSpanExporter,
+    MemorySpanExporter,
+    OTLPHttpExporter,
+    tracer,
+)
+
+
+@pytest.fixture
+def trace_all(monkeypatch):
+    """Sample every request into an in-memory exporter."""
+    exporter = MemorySpanExporter()
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+    monkeypatch.setattr(tracer, "processor", BatchSpanProcessor(exporter))
+    return exporter
+
+
+async def _create_book(client, token):
+    resp = await client.post(
+        "/api/books",
+        json={
+            "title": "Traced",
+            "author": "Span Author",
+            "genre": "History",
+            "published_year": 1990,
+        },
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    return resp.json()["id"]
+
+
+@pytest.mark.asyncio
+async def test_request_trace_covers_auth_repo_and_sql(client, auth_token, trace_all):
+    """
+    Update a book with every request sampled.
+    Expect: one trace rooted at the templated route, with auth and repo
+    spans and SQL statement spans (with row counts) under the repo span.
+    """
+    book_id = await _create_book(client, auth_token)
+    tracer.processor.flush()
+    trace_all.spans.clear()
+    token_cache.clear()  # make the auth lookup hit the database
+
+    resp = await client.put(
+        f"/api/books/{book_id}",
+        json={"title": "Traced Again"},
+        headers={"Authorization": f"Bearer {auth_token}"},
+    )
+    assert resp.status_code == 200
+    tracer.processor.flush()
+
+    spans = trace_all.spans
+    root = next(s for s in spans if s.parent_id is None)
+    assert root.name == "PUT /api/books/{book_id}"
+    assert root.attributes["http.status_code"] == 200
+    assert {s.trace_id for s in spans} == {root.trace_id}
+
+    by_name = {s.name: s for s in spans}
+    assert by_name["security.get_current_user"].parent_id == root.span_id
+    repo = by_name["repo_books.update_book"]
+    assert repo.parent_id == root.span_id
+
+    sql = [s for s in spans if s.name == "db.query"]
+    assert len(sql) == 3
+    children = [
+        s for s in sql if s.attributes["code.function"] != "security.get_current_user"
+    ]
+    assert all(
+        s.parent_id in (repo.span_id, by_name["repo_books.get_book_by_id"].span_id)
+        for s in children
+    )
+    select = next(s for s in sql if "FROM books b" in s.attributes["db.statement"])
+    assert select.attributes["db.rows"] == 1
+
+
+@pytest.mark.asyncio
+async def test_incoming_traceparent_is_continued(client, trace_all):
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    resp = await client.get(
+        "/api/books", headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"}
+    )
+    assert resp.status_code == 200
+    tracer.processor.flush()
+
+    root = next(s for s in trace_all.spans if s.parent_id == "00f067aa0ba902b7")
+    assert root.trace_id == trace_id
+
+
+@pytest.mark.asyncio
+async def test_unsampled_requests_produce_no_spans(client, trace_all, monkeypatch):
+    monkeypatch.setattr(tracer, "sample_rate", 0.0)
+    await client.get("/api/books")
+    tracer.processor.flush()
+    assert trace_all.spans == []
+
+
+def test_file_exporter_writes_json_lines(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    processor = BatchSpanProcessor(FileSpanExporter(str(path)))
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+    monkeypatch.setattr(tracer, "processor", processor)
+
+    root = tracer.start_trace("job")
+    tracer.finish_trace(root)
+    processor.flush()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert lines[0]["name"] == "job"
+    assert lines[0]["traceId"] == root.trace_id
+
+
+def test_otlp_exporter_posts_to_collector(monkeypatch):
+    """
+    Export a trace to a local stand-in OTLP/HTTP collector.
+    Expect: one resourceSpans payload with the span and its attributes.
+    """
+    received = []
+
+    class Collector(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers["Content-Length"])
+            received.append((self.path, json.loads(self.rfile.read(length))))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Collector)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        endpoint = f"http://127.0.0.1:{server.server_port}/v1/traces"
+        processor = BatchSpanProcessor(OTLPHttpExporter(endpoint, "books-test"))
+        monkeypatch.setattr(tracer, "sample_rate", 1.0)
+        monkeypatch.setattr(tracer, "processor", processor)
+
+        root = tracer.start_trace("GET /api/books")
+        root.set_attribute("http.status_code", 200)
+        tracer.finish_trace(root)
+        processor.flush()
+    finally:
+        server.shutdown()
+
+    path, payload = received[0]
+    assert path == "/v1/traces"
+    span = payload["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert span["traceId"] == root.trace_id
+    assert {"key": "http.status_code", "value": {"intValue": "200"}} in span[
+        "attributes"
+    ]
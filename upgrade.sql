@@ -69,5 +69,244 @@ CREATE UNIQUE INDEX uniq_books_title_author_year ON public.books (title_norm, au
 
 UPDATE public.alembic_version SET version_num='0002_dedupe_books' WHERE public.alembic_version.version_num = '0001_create_core';
 
+-- Running upgrade 0002_dedupe_books -> 0003_revoked_tokens
+
+CREATE TABLE public.revoked_tokens (
+    token_hash CHAR(64) NOT NULL, 
+    user_id BIGINT NOT NULL, 
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL, 
+    revoked_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL, 
+    PRIMARY KEY (token_hash)
+);
+
+CREATE INDEX ix_revoked_tokens_expires_at ON public.revoked_tokens (expires_at);
+
+UPDATE public.alembic_version SET version_num='0003_revoked_tokens' WHERE public.alembic_version.version_num = '0002_dedupe_books';
+
+-- Running upgrade 0003_revoked_tokens -> 0004_book_stats
+
+CREATE TABLE public.book_stats (
+    kind TEXT NOT NULL, 
+    key TEXT NOT NULL, 
+    count BIGINT NOT NULL, 
+    PRIMARY KEY (kind, key)
+);
+
+CREATE INDEX ix_book_stats_kind_count ON public.book_stats (kind, count);
+
+INSERT INTO public.book_stats(kind, key, count)
+        SELECT 'total', 'books', COUNT(*) FROM public.books
+        UNION ALL
+        SELECT 'total', 'authors', COUNT(*) FROM public.authors
+        UNION ALL
+        SELECT 'genre', genre, COUNT(*) FROM public.books GROUP BY genre
+        UNION ALL
+        SELECT 'year', published_year::text, COUNT(*)
+        FROM public.books GROUP BY published_year
+        UNION ALL
+        SELECT 'decade', (published_year / 10 * 10)::text, COUNT(*)
+        FROM public.books GROUP BY published_year / 10
+        UNION ALL
+        SELECT 'author', author_id::text, COUNT(*)
+        FROM public.books GROUP BY author_id;
+
+UPDATE public.alembic_version SET version_num='0004_book_stats' WHERE public.alembic_version.version_num = '0003_revoked_tokens';
+
+-- Running upgrade 0004_book_stats -> 0005_partition_books
+
+ALTER TABLE public.books RENAME TO books_unpartitioned;
+
+ALTER TABLE public.books_unpartitioned DROP CONSTRAINT books_pkey;
+
+DROP INDEX public.idx_books_lower_title;
+
+DROP INDEX public.idx_books_published_year;
+
+DROP INDEX public.idx_books_author_id;
+
+DROP INDEX public.uniq_books_title_author_year;
+
+CREATE TABLE public.books (
+            id BIGINT NOT NULL DEFAULT nextval('public.books_id_seq'),
+            title TEXT NOT NULL,
+            author_id BIGINT NOT NULL,
+            genre TEXT NOT NULL,
+            published_year INTEGER NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+            title_norm TEXT GENERATED ALWAYS AS (lower(title)) STORED,
+            CONSTRAINT books_pkey PRIMARY KEY (id, published_year),
+            CONSTRAINT books_author_id_fkey FOREIGN KEY (author_id)
+                REFERENCES public.authors (id) ON DELETE RESTRICT,
+            CONSTRAINT books_genre_check
+                CHECK (genre IN ('Fiction','Non-Fiction','Science','History')),
+            CONSTRAINT books_year_check CHECK (
+                published_year BETWEEN 1800 AND EXTRACT(YEAR FROM CURRENT_DATE)::INT
+            )
+        ) PARTITION BY RANGE (published_year);
+
+CREATE TABLE public.books_default PARTITION OF public.books DEFAULT;
+
+CREATE OR REPLACE FUNCTION public.books_ensure_partitions(p_until_year INT)
+        RETURNS INT AS $$
+        DECLARE
+            v_decade INT;
+            v_name TEXT;
+            v_created INT := 0;
+        BEGIN
+            FOR v_decade IN SELECT generate_series(1800, p_until_year / 10 * 10, 10)
+            LOOP
+                v_name := 'books_p' || v_decade;
+                CONTINUE WHEN to_regclass('public.' || v_name) IS NOT NULL;
+
+                -- A new range may not overlap rows held by the default partition,
+                -- so park them in a temp table while the partition is attached.
+                CREATE TEMP TABLE books_moved AS
+                SELECT id, title, author_id, genre, published_year, created_at, updated_at FROM public.books_default WITH NO DATA;
+                WITH moved AS (
+                    DELETE FROM public.books_default
+                    WHERE published_year >= v_decade
+                      AND published_year < v_decade + 10
+                    RETURNING id, title, author_id, genre, published_year, created_at, updated_at
+                )
+                INSERT INTO books_moved SELECT * FROM moved;
+                EXECUTE format(
+                    'CREATE TABLE public.%%I PARTITION OF public.books '
+                    'FOR VALUES FROM (%%s) TO (%%s)',
+                    v_name, v_decade, v_decade + 10
+                );
+                INSERT INTO public.books (id, title, author_id, genre, published_year, created_at, updated_at)
+                SELECT id, title, author_id, genre, published_year, created_at, updated_at FROM books_moved;
+                DROP TABLE books_moved;
+                v_created := v_created + 1;
+            END LOOP;
+            RETURN v_created;
+        END;
+        $$ LANGUAGE plpgsql;
+
+SELECT public.books_ensure_partitions(
+            EXTRACT(YEAR FROM CURRENT_DATE)::INT + 1
+        );
+
+CREATE INDEX idx_books_lower_title ON public.books (lower(title));
+
+CREATE INDEX idx_books_published_year ON public.books (published_year);
+
+CREATE INDEX idx_books_author_id ON public.books (author_id);
+
+CREATE UNIQUE INDEX uniq_books_title_author_year
+        ON public.books (title_norm, author_id, published_year);
+
+INSERT INTO public.books (id, title, author_id, genre, published_year, created_at, updated_at)
+        SELECT id, title, author_id, genre, published_year, created_at, updated_at FROM public.books_unpartitioned;
+
+ALTER SEQUENCE public.books_id_seq OWNED BY public.books.id;
+
+DROP TABLE public.books_unpartitioned;
+
+UPDATE public.alembic_version SET version_num='0005_partition_books' WHERE public.alembic_version.version_num = '0004_book_stats';
+
+-- Running upgrade 0005_partition_books -> 0006_sort_indexes
+
+ALTER TABLE public.books ADD COLUMN author_sort TEXT;
+
+UPDATE public.books b SET author_sort = a.name
+        FROM public.authors a WHERE a.id = b.author_id;
+
+ALTER TABLE public.books ALTER COLUMN author_sort SET NOT NULL;
+
+CREATE OR REPLACE FUNCTION public.books_set_author_sort()
+        RETURNS trigger AS $$
+        BEGIN
+            SELECT name INTO NEW.author_sort
+            FROM public.authors WHERE id = NEW.author_id;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+CREATE TRIGGER books_author_sort
+        BEFORE INSERT OR UPDATE OF author_id ON public.books
+        FOR EACH ROW EXECUTE FUNCTION public.books_set_author_sort();
+
+CREATE OR REPLACE FUNCTION public.authors_sync_book_sort()
+        RETURNS trigger AS $$
+        BEGIN
+            UPDATE public.books SET author_sort = NEW.name
+            WHERE author_id = NEW.id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+CREATE TRIGGER authors_sync_book_sort
+        AFTER UPDATE OF name ON public.authors
+        FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE FUNCTION public.authors_sync_book_sort();
+
+CREATE INDEX ix_books_genre_title ON public.books (genre, title, id) INCLUDE (author_sort, published_year, created_at, updated_at);
+
+CREATE INDEX ix_books_genre_author ON public.books (genre, author_sort, id) INCLUDE (title, published_year, created_at, updated_at);
+
+CREATE INDEX ix_books_genre_year ON public.books (genre, published_year, id) INCLUDE (title, author_sort, created_at, updated_at);
+
+ANALYZE public.books;
+
+UPDATE public.alembic_version SET version_num='0006_sort_indexes' WHERE public.alembic_version.version_num = '0005_partition_books';
+
+-- Running upgrade 0006_sort_indexes -> 0007_genre_enum
+
+CREATE TYPE public.book_genre AS ENUM ('Fiction', 'Non-Fiction', 'Science', 'History');
+
+ALTER TABLE public.books DROP CONSTRAINT books_genre_check;
+
+ALTER TABLE public.books
+        ALTER COLUMN genre TYPE public.book_genre
+        USING genre::public.book_genre;
+
+ANALYZE public.books;
+
+UPDATE public.alembic_version SET version_num='0007_genre_enum' WHERE public.alembic_version.version_num = '0006_sort_indexes';
+
+-- Running upgrade 0007_genre_enum -> 0008_author_book_count
+
+ALTER TABLE public.authors ADD COLUMN book_count BIGINT DEFAULT '0' NOT NULL;
+
+UPDATE public.authors a SET book_count = c.n
+        FROM (
+            SELECT author_id, COUNT(*) AS n FROM public.books GROUP BY author_id
+        ) c
+        WHERE a.id = c.author_id;
+
+CREATE INDEX ix_authors_book_count ON public.authors (book_count, id);
+
+UPDATE public.alembic_version SET version_num='0008_author_book_count' WHERE public.alembic_version.version_num = '0007_genre_enum';
+
+-- Running upgrade 0008_author_book_count -> 0009_import_chunks
+
+CREATE TABLE public.import_chunks (
+    digest CHAR(64) NOT NULL, 
+    rows INTEGER NOT NULL, 
+    result JSONB, 
+    imported_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL, 
+    PRIMARY KEY (digest)
+);
+
+UPDATE public.alembic_version SET version_num='0009_import_chunks' WHERE public.alembic_version.version_num = '0008_author_book_count';
+
+-- Running upgrade 0009_import_chunks -> 0010_drop_author_stats
+
+DELETE FROM public.book_stats WHERE kind = 'author';
+
+UPDATE public.alembic_version SET version_num='0010_drop_author_stats' WHERE public.alembic_version.version_num = '0009_import_chunks';
+
+-- Running upgrade 0010_drop_author_stats -> 0011_desc_sort_indexes
+
+CREATE INDEX ix_books_genre_title_desc ON public.books (genre, title DESC, id) INCLUDE (author_sort, published_year, created_at, updated_at);
+
+CREATE INDEX ix_books_genre_author_desc ON public.books (genre, author_sort DESC, id) INCLUDE (title, published_year, created_at, updated_at);
+
+CREATE INDEX ix_books_genre_year_desc ON public.books (genre, published_year DESC, id) INCLUDE (title, author_sort, created_at, updated_at);
+
+UPDATE public.alembic_version SET version_num='0011_desc_sort_indexes' WHERE public.alembic_version.version_num = '0010_drop_author_stats';
+
 COMMIT;
 